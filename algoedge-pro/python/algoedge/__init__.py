@@ -1,6 +1,8 @@
 __all__ = [
     "strategy_dsl",
     "backtester",
+    "portfolio",
+    "live",
     "optimizer",
     "indicators",
     "ict",
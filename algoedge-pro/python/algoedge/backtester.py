@@ -1,6 +1,7 @@
 from __future__ import annotations
+import operator
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
@@ -8,7 +9,8 @@ import pandas as pd
 from . import indicators as I
 from . import metrics as M
 from . import data as Data
-from .strategy_dsl import normalize_strategy
+from .cache import IndicatorCache, frame_fingerprint, indicator_cache
+from .strategy_dsl import INDICATOR_PARAMS, Condition, IndicatorSpec, Params, StrategyPlan, compile_strategy
 
 
 @dataclass
@@ -18,54 +20,447 @@ class BacktestResult:
     metrics: Dict[str, float]
 
 
-def _resolve_indicator(df: pd.DataFrame, node: Dict[str, Any]) -> pd.Series | pd.DataFrame:
-    name = node.get("indicator", "").upper()
-    params = node.get("params", {})
-    if name == "EMA":
-        return I.ema(df, **{k: v for k, v in params.items() if k in {"length", "source"}})
-    if name == "SMA":
-        return I.sma(df, **{k: v for k, v in params.items() if k in {"length", "source"}})
-    if name == "RSI":
-        return I.rsi(df, **{k: v for k, v in params.items() if k in {"length", "source"}})
-    if name == "MACD":
-        return I.macd(df, **{k: v for k, v in params.items() if k in {"fast", "slow", "signal", "source"}})
-    if name in {"BBANDS", "BOLLINGER", "BOLLINGER BANDS"}:
-        return I.bollinger_bands(df, **{k: v for k, v in params.items() if k in {"length", "std", "source"}})
-    if name == "VWAP":
-        return I.vwap(df)
-    # Unknown -> passthrough
-    return pd.Series(index=df.index, dtype=float)
-
-
-def _evaluate_logic_row(row: pd.Series, logic: List[Dict[str, Any]], values: Dict[str, Any]) -> bool:
-    for cond in logic:
-        op = cond.get("op")
-        a = cond.get("a")
-        b = cond.get("b")
+_INDICATORS: Dict[str, Callable[..., Any]] = {
+    "EMA": I.ema,
+    "SMA": I.sma,
+    "RSI": I.rsi,
+    "MACD": I.macd,
+    "BBANDS": I.bollinger_bands,
+    "VWAP": I.vwap,
+}
+
+
+def _resolve_indicator(
+    df: pd.DataFrame,
+    name: str,
+    params: Params,
+    cache: Optional[IndicatorCache] = None,
+) -> pd.Series | pd.DataFrame:
+    func = _INDICATORS.get(name)
+    if func is None:
+        # Unknown -> passthrough
+        return pd.Series(index=df.index, dtype=float)
+    if cache is None:
+        return func(df, **dict(params))
+    # Params are canonical (defaults filled in), so equivalent blocks share one cache entry per backend
+    key = (frame_fingerprint(df), name, params, I.get_backend())
+    return cache.get_or_compute(key, lambda: func(df, **dict(params)))
+
+
+_BATCH_INDICATORS: Dict[str, Callable[..., Any]] = {
+    "EMA": I.ema_batch,
+    "SMA": I.sma_batch,
+    "RSI": I.rsi_batch,
+    # BBANDS stays per call: an exact windowed variance costs O(bars x length), more than pandas' rolling std
+}
+
+
+Node = Tuple[str, Params]
+
+
+def _macd_inputs(params: Params) -> Tuple[Node, ...]:
+    p = dict(params)
+    return tuple(
+        ("EMA", (("length", length), ("source", p["source"]))) for length in sorted((p["fast"], p["slow"]))
+    )
+
+
+def _macd_combine(params: Params, fast_ma: pd.Series, slow_ma: pd.Series) -> pd.DataFrame:
+    p = dict(params)
+    fast, slow = sorted((p["fast"], p["slow"]))
+    return I.macd_from_ema(fast_ma, slow_ma, fast, slow, p["signal"])
+
+
+# Composite indicator -> (nodes it is built from, combine(params, *input values))
+_COMPOSITES: Dict[str, Tuple[Callable[[Params], Tuple[Node, ...]], Callable[..., Any]]] = {
+    "MACD": (_macd_inputs, _macd_combine),
+}
+
+
+def _indicator_graph(specs: Sequence[IndicatorSpec]) -> Tuple[List[Node], set]:
+    """Distinct indicator computations in dependency order, plus the nodes that feed a composite.
+
+    Blocks with the same canonical (name, params) collapse into one node, and a composite such as
+    MACD depends on EMA nodes it shares with any EMA block of the same length.
+    """
+    order: Dict[Node, None] = {}
+    inputs: set = set()
+
+    def visit(node: Node) -> None:
+        if node in order:
+            return
+        composite = _COMPOSITES.get(node[0])
+        if composite is not None:
+            for dep in composite[0](node[1]):
+                inputs.add(dep)
+                visit(dep)
+        order[node] = None
+
+    for spec in specs:
+        visit((spec.name, spec.params))
+    return list(order), inputs
+
+
+def _batch_groups(specs: Sequence[IndicatorSpec]) -> Dict[Tuple[str, Params], set]:
+    # Indicators of one type that differ only in length are computed together in one batched pass.
+    # Composite inputs stay on the exact per-call path so composites match the per-call backend bit for bit.
+    nodes, inputs = _indicator_graph(specs)
+    groups: Dict[Tuple[str, Params], set] = {}
+    for name, params in nodes:
+        if name not in _BATCH_INDICATORS or (name, params) in inputs:
+            continue
+        rest = tuple(p for p in params if p[0] != "length")
+        groups.setdefault((name, rest), set()).add(dict(params)["length"])
+    return {k: v for k, v in groups.items() if len(v) > 1}
+
+
+def _resolve_batch(
+    df: pd.DataFrame,
+    name: str,
+    rest: Params,
+    lengths: set,
+    cache: Optional[IndicatorCache] = None,
+) -> Dict[Params, pd.Series | pd.DataFrame]:
+    kwargs = dict(rest)
+    fp = frame_fingerprint(df) if cache is not None else None
+
+    def params_for(length: int) -> Params:
+        return tuple((k, length if k == "length" else kwargs[k]) for k, _, _ in INDICATOR_PARAMS[name])
+
+    out: Dict[Params, pd.Series | pd.DataFrame] = {}
+    missing: List[int] = []
+    for length in sorted(lengths):
+        # Batched values match pandas_ta only to float tolerance, so they get their own cache slot
+        hit = cache.get((fp, name, params_for(length), "batch")) if cache is not None else None
+        if hit is None:
+            missing.append(length)
+        else:
+            out[params_for(length)] = hit
+    if not missing:
+        return out
+
+    if I.ensure_column(df, kwargs.get("source", "close")).isna().any():
+        # Kernels need a gap-free source; keep pandas_ta semantics for gappy data
+        for length in missing:
+            out[params_for(length)] = _resolve_indicator(df, name, params_for(length), cache)
+        return out
+
+    arr = _BATCH_INDICATORS[name](df, missing, **kwargs)
+    for j, length in enumerate(missing):
+        value = pd.Series(arr[:, j], index=df.index)
+        out[params_for(length)] = value
+        if cache is not None:
+            cache.put((fp, name, params_for(length), "batch"), value)
+    return out
+
+
+def prefetch_indicators(
+    df: pd.DataFrame,
+    strategies: List[Dict[str, Any] | StrategyPlan],
+    cache: IndicatorCache = indicator_cache,
+) -> None:
+    """Compute, in one batched pass per indicator type, every series the given strategies will request."""
+    merged: Dict[Tuple[str, Params], set] = {}
+    for strategy in strategies:
+        for key, lengths in _batch_groups(compile_strategy(strategy).indicators).items():
+            merged.setdefault(key, set()).update(lengths)
+    for (name, rest), lengths in merged.items():
+        _resolve_batch(df, name, rest, lengths, cache)
+
+
+# op -> (test on current values, test on previous-bar values or None); ops are validated at compile time
+_ROW_OPS = {
+    "gt": (operator.gt, None),
+    "lt": (operator.lt, None),
+    "cross_over": (operator.gt, operator.le),
+    "cross_under": (operator.lt, operator.ge),
+}
+_ARRAY_OPS = {
+    "gt": (np.greater, None),
+    "lt": (np.less, None),
+    "cross_over": (np.greater, np.less_equal),
+    "cross_under": (np.less, np.greater_equal),
+}
+
+
+def _evaluate_logic_row(row: pd.Series, logic: Sequence[Condition], values: Dict[str, Any]) -> bool:
+    for op, a, b in logic:
         a_val = values.get(a, row.get(a, a)) if isinstance(a, str) else a
         b_val = values.get(b, row.get(b, b)) if isinstance(b, str) else b
-        if op == "gt" and not (a_val > b_val):
-            return False
-        if op == "lt" and not (a_val < b_val):
+        now, prev = _ROW_OPS[op]
+        if not now(a_val, b_val):
             return False
-        if op == "cross_over" and not (a_val > b_val and row.get(f"{a}_prev", a_val) <= row.get(f"{b}_prev", b_val)):
-            return False
-        if op == "cross_under" and not (a_val < b_val and row.get(f"{a}_prev", a_val) >= row.get(f"{b}_prev", b_val)):
+        if prev is not None and not prev(row.get(f"{a}_prev", a_val), row.get(f"{b}_prev", b_val)):
             return False
     return True
 
 
-def run_backtest(
-    strategy: Dict[str, Any],
-    symbol: str = "BTC/USDT",
-    market: str = "crypto",
-    timeframe: str = "1h",
-    years: int = 2,
-    initial_cash: float = 10_000.0,
-) -> BacktestResult:
-    strategy = normalize_strategy(strategy)
-    df = Data.load_ohlcv(symbol=symbol, market=market, timeframe=timeframe, years=years)
+def _evaluate_logic_array(
+    logic: Sequence[Condition],
+    columns: Dict[str, np.ndarray],
+    shape: int | Tuple[int, ...],
+) -> np.ndarray:
+    # Same operand resolution as _evaluate_logic_row, one comparison per condition over whole columns
+    # (1-D per bar, or 2-D bars x symbols for portfolio runs)
+    mask = np.ones(shape, dtype=bool)
+    for op, a, b in logic:
+        a_val = columns.get(a, a) if isinstance(a, str) else a
+        b_val = columns.get(b, b) if isinstance(b, str) else b
+        now, prev = _ARRAY_OPS[op]
+        mask &= now(a_val, b_val)
+        if prev is not None:
+            mask &= prev(columns.get(f"{a}_prev", a_val), columns.get(f"{b}_prev", b_val))
+    return mask
+
+
+def _exit_fill(
+    bar_open: float,
+    high: float,
+    low: float,
+    close: float,
+    stop: float,
+    target: float,
+    signal: bool,
+    side: int = 1,
+) -> Optional[Tuple[float, str]]:
+    """Exit price and reason for an open position on one bar, or None to keep holding.
+
+    The stop and target trigger on the bar's low / high (a NaN or out-of-range wick falls back to
+    the close). A bar that opens through a level fills at the open; a bar whose range spans both
+    levels is assumed to hit the stop first. Signal exits fill at the close.
+    """
+    if side < 0:
+        # A short is a long in negated prices: its stop is above, its target below
+        fill = _exit_fill(-bar_open, -low, -high, -close, -stop, -target, signal)
+        return (-fill[0], fill[1]) if fill is not None else None
+    low = close if not low <= close else low
+    high = close if not high >= close else high
+    if low <= stop or high >= target:
+        if bar_open <= stop:
+            return float(bar_open), "stop_loss"
+        if bar_open >= target:
+            return float(bar_open), "take_profit"
+        return (float(stop), "stop_loss") if low <= stop else (float(target), "take_profit")
+    if signal:
+        return float(close), "signal"
+    return None
+
+
+def _bar_range(columns: Dict[str, np.ndarray], close: np.ndarray, stop_fill: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(open, high, low) the stops are checked against; the close itself for ``stop_fill="close"`` or close-only data."""
+    if stop_fill == "close" or "high" not in columns or "low" not in columns:
+        return close, close, close
+    bar_open = columns.get("open", np.full(close.shape, np.nan))
+    # Same clamping as _exit_fill, and no fills on bars without a close
+    high = np.where(np.isnan(close), np.nan, np.fmax(columns["high"], close))
+    low = np.where(np.isnan(close), np.nan, np.fmin(columns["low"], close))
+    return bar_open, high, low
+
+
+def _first_exit(
+    high: np.ndarray,
+    low: np.ndarray,
+    exit_mask: np.ndarray | None,
+    lower: float,
+    upper: float,
+    start: int,
+    chunk: int = 256,
+) -> int:
+    # Forward scan in growing chunks so each trade costs O(holding length), not O(bars)
+    n = len(high)
+    while start < n:
+        stop = min(n, start + chunk)
+        hit = (low[start:stop] <= lower) | (high[start:stop] >= upper)
+        if exit_mask is not None:
+            hit |= exit_mask[start:stop]
+        if hit.any():
+            return start + int(hit.argmax())
+        start = stop
+        chunk *= 2
+    return -1
+
+
+# Lot book: one row per position opened, in entry order. Prices are signal prices, before slippage.
+_LOTS = np.dtype([
+    ("side", np.int8),  # +1 long, -1 short
+    ("column", np.int32),  # symbol column in portfolio runs
+    ("entry", np.int64),  # bar
+    ("exit", np.int64),  # bar, -1 while open
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("reason", np.int8),  # index into _EXIT_REASONS
+])
+_EXIT_REASONS = ("signal", "stop_loss", "take_profit", "close")
+
+
+def _lot_book(n: int) -> np.ndarray:
+    lots = np.zeros(n, dtype=_LOTS)
+    lots["exit"] = -1
+    lots["exit_price"] = np.nan
+    return lots
+
+
+def _close_open_lots(lots: np.ndarray, bar: int, price: float) -> None:
+    still = lots["exit"] < 0
+    lots["exit"][still] = bar
+    lots["exit_price"][still] = price
+    lots["reason"][still] = _EXIT_REASONS.index("close")
+
+
+def _levels(price: float, side: int, sl_pct: float, tp_pct: float) -> Tuple[float, float]:
+    # (stop, target) of a lot entered at ``price``
+    return price * (1 - side * sl_pct), price * (1 + side * tp_pct)
+
+
+def _simulate_book(
+    close: np.ndarray,
+    sides: Sequence[Tuple[int, np.ndarray | None, np.ndarray | None]],
+    sl_pct: float,
+    tp_pct: float,
+    max_positions: int = 1,
+    bar_range: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """Lot book (``_LOTS``) for one price series, in a single pass for both sides.
+
+    ``sides`` holds (side, entry signal, exit signal), longs first. A side adds a lot on an entry
+    signal while it holds fewer than ``max_positions`` lots, the other side is flat and none of its own
+    lots closed on that bar. Each lot leaves on its own stop / target, checked against ``bar_range``
+    (open, high, low) as returned by ``_bar_range`` or the close when it is None, or on its side's exit
+    signal. A lot's exit is found when it opens, so the scan jumps from entry to entry and lots still
+    open at the end have ``exit == -1``.
+    """
+    valid = ~np.isnan(close)
+    bar_open, high, low = bar_range if bar_range is not None else (close, close, close)
+    n = len(close)
+    candidates = [
+        (side, np.flatnonzero(entry_sig & valid), exit_sig & valid if exit_sig is not None else None)
+        for side, entry_sig, exit_sig in sides
+        if entry_sig is not None
+    ]
+    book = _lot_book(64)
+    count = 0
+    held: Dict[int, List[int]] = {side: [] for side, _, _ in candidates}  # exit bars of open lots
+
+    def next_entry(bars: np.ndarray, cursor: int) -> int:
+        # First candidate bar at or after cursor (n when there is none)
+        k = int(bars.searchsorted(cursor))
+        return int(bars[k]) if k < len(bars) else n
+
+    upcoming = [next_entry(bars, 0) for _, bars, _ in candidates]
+    while upcoming and min(upcoming) < n:
+        b = min(upcoming)
+        for side in held:
+            # Keep lots closing on bar b: they block re-entry on it
+            held[side] = [x for x in held[side] if x < 0 or x >= b]
+
+        for c, (side, bars, exit_mask) in enumerate(candidates):
+            if upcoming[c] != b:
+                continue
+            other = [x for s, exits in held.items() if s != side for x in exits if x < 0 or x > b]
+            mine = held[side]
+            if other:
+                # The other side must go flat first; it may add lots meanwhile, so look again then
+                upcoming[c] = next_entry(bars, n if min(other) < 0 else max(other))
+                continue
+            if b in mine:
+                upcoming[c] = next_entry(bars, b + 1)
+                continue
+            if len(mine) >= max_positions:
+                ends = [x for x in mine if x >= 0]
+                upcoming[c] = next_entry(bars, min(ends) + 1) if ends else n
+                continue
+
+            price = float(close[b])
+            stop, target = _levels(price, side, sl_pct, tp_pct)
+            lower, upper = (stop, target) if side > 0 else (target, stop)
+            j = _first_exit(high, low, exit_mask, lower, upper, b + 1)
+            if count == len(book):
+                book = np.concatenate([book, _lot_book(len(book))])
+            if j >= 0:
+                signal = bool(exit_mask[j]) if exit_mask is not None else False
+                x_price, reason = _exit_fill(bar_open[j], high[j], low[j], close[j], stop, target, signal, side)
+                book[count] = (side, 0, b, j, price, x_price, _EXIT_REASONS.index(reason))
+            else:
+                book[count] = (side, 0, b, -1, price, np.nan, 0)
+            count += 1
+            mine.append(j)
+            upcoming[c] = next_entry(bars, b + 1)
+    return book[:count]
+
+
+def _sides(plan: StrategyPlan) -> Tuple[Tuple[int, Any, Any], ...]:
+    # (side, entry logic, exit logic), longs first
+    return (1, plan.entry, plan.exit), (-1, plan.entry_short, plan.exit_short)
+
 
+def _signals_loop(df_calc: pd.DataFrame, plan: StrategyPlan) -> np.ndarray:
+    # Reference row-by-row engine; kept for parity checks against the vectorized path
+    rows: List[List[Any]] = []  # [side, entry bar, exit bar, entry price, exit price, reason]
+    held: List[int] = []  # open rows
+    intrabar = plan.stop_fill == "intrabar" and {"high", "low"}.issubset(df_calc.columns)
+
+    for b, (ts, row) in enumerate(df_calc.iterrows()):
+        price = row.get("close")
+        if price is None or np.isnan(price):
+            continue
+        values = row.to_dict()
+
+        # Stop loss / take profit on the bar's range, then the exit logic at the close
+        closed = set()
+        if held:
+            signal = {side: logic is not None and _evaluate_logic_row(row, logic, values) for side, _, logic in _sides(plan)}
+            bar = (row.get("open", np.nan), row["high"], row["low"]) if intrabar else (price, price, price)
+            for k in list(held):
+                side, entry_price = rows[k][0], rows[k][3]
+                stop, target = _levels(entry_price, side, plan.stop_loss_pct, plan.take_profit_pct)
+                fill = _exit_fill(*bar, price, stop, target, signal[side], side)
+                if fill is not None:
+                    rows[k][2], rows[k][4], rows[k][5] = b, fill[0], _EXIT_REASONS.index(fill[1])
+                    held.remove(k)
+                    closed.add(side)
+
+        for side, logic, _ in _sides(plan):
+            if logic is None or side in closed:
+                continue
+            mine = sum(rows[k][0] == side for k in held)
+            if mine < len(held) or mine >= plan.max_positions:
+                continue
+            if _evaluate_logic_row(row, logic, values):
+                held.append(len(rows))
+                rows.append([side, b, -1, float(price), np.nan, 0])
+
+    lots = _lot_book(len(rows))
+    for field, column in zip(("side", "entry", "exit", "entry_price", "exit_price", "reason"), zip(*rows)):
+        lots[field] = column
+    # Close any open position at last price
+    if rows:
+        _close_open_lots(lots, len(df_calc) - 1, float(df_calc["close"].iloc[-1]))
+    return lots
+
+
+def _signals_vectorized(df_calc: pd.DataFrame, plan: StrategyPlan) -> np.ndarray:
+    if "close" not in df_calc.columns:
+        return _lot_book(0)
+    n = len(df_calc)
+    # iterrows upcasts every row to float64, so compare on float64 columns to stay bit-identical
+    columns = {k: df_calc[k].to_numpy(dtype=float) for k in df_calc.columns}
+    close = columns["close"]
+    signal = lambda logic: _evaluate_logic_array(logic, columns, n) if logic is not None else None
+    sides = [(side, signal(entry), signal(exit_)) for side, entry, exit_ in _sides(plan)]
+
+    bar_range = _bar_range(columns, close, plan.stop_fill)
+    lots = _simulate_book(close, sides, plan.stop_loss_pct, plan.take_profit_pct, plan.max_positions, bar_range)
+    _close_open_lots(lots, n - 1, float(close[n - 1]))
+    return lots
+
+
+_TRADE_COLUMNS = [
+    "entry_time", "entry_price", "exit_time", "exit_price", "qty", "pnl", "return_pct",
+    "entry_fee", "exit_fee", "exit_reason", "side",
+]
+
+
+def _indicator_values(df: pd.DataFrame, plan: StrategyPlan, cache: Optional[IndicatorCache]) -> Dict[str, Any]:
     values: Dict[str, Any] = {
         "open": df.get("open"),
         "high": df.get("high"),
@@ -74,113 +469,314 @@ def run_backtest(
         "volume": df.get("volume"),
     }
 
-    # Compute indicators
-    for node in strategy.get("blocks", []):
-        if node.get("type") == "indicator":
-            out = _resolve_indicator(df, node)
-            key = node.get("id") or node.get("indicator")
-            if isinstance(out, pd.Series):
-                values[key] = out
-            elif isinstance(out, pd.DataFrame):
-                for col in out.columns:
-                    values[f"{key}_{col}"] = out[col]
-
-    # Prepare signals
-    entry_node = next((b for b in strategy.get("blocks", []) if b.get("type") == "entry"), None)
-    exit_node = next((b for b in strategy.get("blocks", []) if b.get("type") == "exit"), None)
-    risk_node = next((b for b in strategy.get("blocks", []) if b.get("type") == "risk"), {"params": {}})
-    risk = risk_node.get("params", {})
-    sl_pct = float(risk.get("stop_loss_pct", 0.02))
-    tp_pct = float(risk.get("take_profit_pct", 0.04))
-    risk_per_trade_pct = float(risk.get("risk_per_trade_pct", 1.0))
-
-    df_calc = pd.DataFrame(index=df.index)
+    # Each distinct node is computed once; batched groups first, the rest on demand through the graph
+    nodes, _ = _indicator_graph(plan.indicators)
+    computed: Dict[Node, Any] = {}
+    for (name, rest), lengths in _batch_groups(plan.indicators).items():
+        for params, out in _resolve_batch(df, name, rest, lengths, cache).items():
+            computed[(name, params)] = out
+
+    def resolve(node: Node) -> Any:
+        if node not in computed:
+            composite = _COMPOSITES.get(node[0])
+            if composite is None:
+                computed[node] = _resolve_indicator(df, node[0], node[1], cache=cache)
+            else:
+                inputs, combine = composite
+                compute = lambda: combine(node[1], *(resolve(dep) for dep in inputs(node[1])))
+                # A cache hit on the composite skips its inputs entirely
+                computed[node] = compute() if cache is None else cache.get_or_compute(
+                    (frame_fingerprint(df), node[0], node[1], I.get_backend()), compute
+                )
+        return computed[node]
+
+    for node in nodes:
+        resolve(node)
+    for spec in plan.indicators:
+        out = computed[(spec.name, spec.params)]
+        if isinstance(out, pd.Series):
+            values[spec.key] = out
+        elif isinstance(out, pd.DataFrame):
+            for col in out.columns:
+                values[f"{spec.key}_{col}"] = out[col]
+    return values
+
+
+def _calc_frame(df: pd.DataFrame, values: Dict[str, Any], lagged: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    columns: Dict[str, pd.Series] = {}
     for k, v in values.items():
         if isinstance(v, (pd.Series, pd.DataFrame)):
-            df_calc[k] = v if isinstance(v, pd.Series) else v.iloc[:, 0]
+            columns[k] = v if isinstance(v, pd.Series) else v.iloc[:, 0]
 
-    # Add prev values for cross detection
-    for key in list(df_calc.columns):
-        df_calc[f"{key}_prev"] = df_calc[key].shift(1)
+    # Previous-bar values for cross detection, only for the columns the logic reads them from
+    # (all of them when ``lagged`` is None)
+    for key in list(columns) if lagged is None else [k for k in lagged if k in columns]:
+        columns[f"{key}_prev"] = columns[key].shift(1)
+    return pd.DataFrame(columns, index=df.index)
 
-    entries: List[Tuple[pd.Timestamp, float]] = []
-    exits: List[Tuple[pd.Timestamp, float]] = []
 
-    position_open = False
-    entry_price = 0.0
+def _equity_curve(
+    trades_records: List[Dict[str, Any]],
+    index: pd.Index,
+    close: np.ndarray,
+    initial_cash: float,
+) -> pd.Series:
+    # Mark-to-market equity per bar; the close is carried over missing bars while a position is open
+    close = pd.Series(np.asarray(close, dtype=float)).ffill().to_numpy()
+    bars = lambda key: index.get_indexer([r[key] for r in trades_records])
+    position, cash_flow = M.trade_positions(
+        len(index),
+        bars("entry_time"),
+        bars("exit_time"),
+        [r["qty"] for r in trades_records],
+        [r["entry_price"] for r in trades_records],
+        [r["exit_price"] for r in trades_records],
+        [r.get("entry_fee", 0.0) for r in trades_records],
+        [r.get("exit_fee", 0.0) for r in trades_records],
+    )
+    return pd.Series(M.mark_to_market(close, position, initial_cash, cash_flow), index=index)
 
-    for ts, row in df_calc.iterrows():
-        price = row.get("close")
-        if price is None or np.isnan(price):
-            continue
 
-        if not position_open and entry_node:
-            if _evaluate_logic_row(row, entry_node.get("logic", []), row.to_dict()):
-                entries.append((ts, float(price)))
-                position_open = True
-                entry_price = float(price)
-                continue
+def _metrics_table(
+    equity: np.ndarray,
+    pnl: np.ndarray,
+    initial_cash: float,
+    periods_per_year: float,
+) -> List[Dict[str, float]]:
+    # equity is (bars x runs), pnl (trades x runs) padded with NaN; one dict of metrics per run
+    table = M.batch_metrics(equity, pnl, periods_per_year)
+    final = equity[-1] if len(equity) else np.full(equity.shape[1], initial_cash)
+    num_trades = np.count_nonzero(~np.isnan(pnl), axis=0)
+    out = []
+    for j, row in enumerate(table):
+        metrics = dict(zip(M.BATCH_METRICS, map(float, row)))
+        metrics["num_trades"] = float(num_trades[j])
+        metrics["final_equity"] = float(final[j])
+        metrics["roi_pct"] = float((final[j] / initial_cash - 1) * 100)
+        out.append(metrics)
+    return out
 
-        if position_open:
-            # Stop loss / Take profit
-            if price <= entry_price * (1 - sl_pct) or price >= entry_price * (1 + tp_pct):
-                exits.append((ts, float(price)))
-                position_open = False
-                entry_price = 0.0
-                continue
 
-            if exit_node and _evaluate_logic_row(row, exit_node.get("logic", []), row.to_dict()):
-                exits.append((ts, float(price)))
-                position_open = False
-                entry_price = 0.0
-                continue
+def _summarize(
+    trades_records: List[Dict[str, Any]],
+    equity_series: pd.Series,
+    initial_cash: float,
+    periods_per_year: float,
+) -> BacktestResult:
+    trades_df = pd.DataFrame(trades_records, columns=_TRADE_COLUMNS)
+    pnl = trades_df["pnl"].to_numpy(dtype=float)[:, None]
+    metrics = _metrics_table(equity_series.to_numpy(dtype=float)[:, None], pnl, initial_cash, periods_per_year)[0]
+    return BacktestResult(equity_curve=equity_series, trades=trades_df, metrics=metrics)
 
-    # Close any open position at last price
-    if position_open:
-        last_ts = df_calc.index[-1]
-        last_price = float(df_calc.loc[last_ts, "close"])
-        exits.append((last_ts, last_price))
 
-    # Build trades
-    trades_records: List[Dict[str, Any]] = []
-    cash = initial_cash
-    equity_curve = []
-    eq_index = []
-
-    for i in range(min(len(entries), len(exits))):
-        e_ts, e_price = entries[i]
-        x_ts, x_price = exits[i]
-        risk_cash = cash * (risk_per_trade_pct / 100.0)
-        qty = risk_cash / e_price if e_price > 0 else 0
-        pnl = (x_price - e_price) * qty
-        cash += pnl
-        trades_records.append({
-            "entry_time": e_ts,
-            "entry_price": e_price,
-            "exit_time": x_ts,
-            "exit_price": x_price,
-            "qty": qty,
-            "pnl": pnl,
-            "return_pct": (x_price - e_price) / e_price if e_price else 0.0,
-        })
-        eq_index.append(x_ts)
-        equity_curve.append(cash)
-
-    if not eq_index:
-        eq_index = [df.index[0]]
-        equity_curve = [initial_cash]
-
-    equity_series = pd.Series(equity_curve, index=pd.Index(eq_index))
-    trades_df = pd.DataFrame(trades_records)
-
-    metrics = {
-        "win_rate": M.win_rate(trades_df),
-        "profit_factor": M.profit_factor(trades_df),
-        "max_drawdown": M.max_drawdown(equity_series),
-        "sharpe_ratio": M.sharpe_ratio(equity_series),
-        "num_trades": float(len(trades_df)),
-        "final_equity": float(equity_series.iloc[-1] if len(equity_series) else initial_cash),
-        "roi_pct": float(((equity_series.iloc[-1] / initial_cash) - 1) * 100 if len(equity_series) else 0.0),
+def _slipped(price: float, side: int, slippage: Tuple[str, float]) -> float:
+    # side is +1 for buys, -1 for sells; slippage always moves the fill against the trader
+    model, value = slippage
+    if not value:
+        return price
+    if model == "percent":
+        return price * (1 + side * value / 100.0)
+    return price + side * value
+
+
+def _commission(price: float, qty: float, commission: Tuple[str, float]) -> float:
+    model, value = commission
+    if model == "percent":
+        return abs(price * qty) * value / 100.0
+    if model == "per_unit":
+        return abs(qty) * value
+    return value
+
+
+def _exit_price(price: float, reason: str, slippage: Tuple[str, float], side: int = 1) -> float:
+    # Take-profits rest as limit orders and fill at their level (or the better gap open); the rest are market fills
+    return price if reason == "take_profit" else _slipped(price, -side, slippage)
+
+
+def _position_size(cash: float, price: float, signal_price: float, plan: StrategyPlan, side: int = 1) -> float:
+    """Units to buy (or sell short) at the slipped ``price`` with ``cash`` as equity.
+
+    ``sizing="notional"`` invests ``risk_per_trade_pct`` of equity; ``sizing="risk"`` trades what loses
+    that much if the stop (set off ``signal_price``) fills, without leverage; with no stop beyond the
+    entry the whole position is at risk, as in notional sizing.
+    """
+    if price <= 0:
+        return 0.0
+    budget = cash * (plan.risk_per_trade_pct / 100.0)
+    if plan.sizing == "risk":
+        per_unit = side * (price - _levels(signal_price, side, plan.stop_loss_pct, 0.0)[0])
+        return min(budget / per_unit, cash / price) if per_unit > 0 else budget / price
+    return budget / price
+
+
+def _trade_record(
+    e_ts: Any,
+    e_price: float,
+    x_ts: Any,
+    x_price: float,
+    qty: float,
+    reason: str,
+    plan: StrategyPlan,
+    side: int = 1,
+) -> Dict[str, Any]:
+    # qty carries the side's sign: negative for shorts
+    entry_fee = _commission(e_price, qty, plan.commission) if qty else 0.0
+    exit_fee = _commission(x_price, qty, plan.commission) if qty else 0.0
+    pnl = (x_price - e_price) * qty - entry_fee - exit_fee
+    return {
+        "entry_time": e_ts,
+        "entry_price": e_price,
+        "exit_time": x_ts,
+        "exit_price": x_price,
+        "qty": qty,
+        "pnl": pnl,
+        # Net of fees, on the capital the entry tied up
+        "return_pct": pnl / (e_price * abs(qty)) if qty else 0.0,
+        "entry_fee": entry_fee,
+        "exit_fee": exit_fee,
+        "exit_reason": reason,
+        "side": "long" if side > 0 else "short",
     }
 
-    return BacktestResult(equity_curve=equity_series, trades=trades_df, metrics=metrics)
\ No newline at end of file
+
+def _fill_lots(
+    lots: np.ndarray,
+    index: pd.Index,
+    initial_cash: float,
+    plan: StrategyPlan,
+    keep_unsized: bool = False,
+) -> Dict[int, Dict[str, Any]]:
+    """Size and cost a lot book against one cash pool; trade records by lot, in the order they closed.
+
+    Fills replay chronologically, exits before same-bar entries (except a lot force-closed on its own
+    entry bar). Each entry is sized off realized equity (``_position_size``) and capped by the cash
+    not committed to open lots; shorts commit their notional like longs. Entries fill at the signal
+    price plus slippage, exits at their fill price (``_exit_price``). Lots that cannot be sized are
+    dropped; with ``keep_unsized`` one entered while flat (a non-positive price, or no equity left)
+    is kept as a zero-quantity trade, as single-series backtests have always recorded them.
+    """
+    n = len(lots)
+    bars = np.concatenate([lots["entry"], lots["exit"]])
+    kinds = np.concatenate([np.ones(n, dtype=np.int8), np.where(lots["exit"] == lots["entry"], 2, 0).astype(np.int8)])
+    columns = np.tile(lots["column"], 2)
+    ids = np.tile(np.arange(n), 2)
+    order = np.lexsort((ids, columns, kinds, bars))
+    side = lots["side"].tolist()
+    entry_time, exit_time = list(index[lots["entry"]]), list(index[lots["exit"]])
+    entry_price, exit_price = lots["entry_price"].tolist(), lots["exit_price"].tolist()
+    reason = [_EXIT_REASONS[r] for r in lots["reason"].tolist()]
+
+    cash = initial_cash
+    committed = 0.0
+    held: Dict[int, Tuple[float, float]] = {}
+    records: Dict[int, Dict[str, Any]] = {}
+    ids, kinds = ids.tolist(), kinds.tolist()
+    for k in order.tolist():
+        t = ids[k]
+        if kinds[k] == 1:
+            e_price = _slipped(entry_price[t], side[t], plan.slippage)
+            qty = min(_position_size(cash, e_price, entry_price[t], plan, side[t]), (cash - committed) / e_price) if e_price > 0 else 0.0
+            if qty <= 0 and (held or not keep_unsized):
+                continue
+            qty = max(qty, 0.0)
+            held[t] = (qty, e_price)
+            committed += qty * e_price
+            continue
+        if t not in held:
+            continue
+        qty, e_price = held.pop(t)
+        # Reset rather than subtract once flat, so rounding never eats into the next entry
+        committed = committed - qty * e_price if held else 0.0
+        x_price = _exit_price(exit_price[t], reason[t], plan.slippage, side[t])
+        records[t] = _trade_record(entry_time[t], e_price, exit_time[t], x_price, side[t] * qty, reason[t], plan, side[t])
+        cash += records[t]["pnl"]
+    return records
+
+
+def _build_trades(lots: np.ndarray, index: pd.Index, initial_cash: float, plan: StrategyPlan) -> List[Dict[str, Any]]:
+    """Trade records of a single-series lot book, in entry order; every lot is a trade, even unsized."""
+    records = _fill_lots(lots, index, initial_cash, plan, keep_unsized=True)
+    return [records[t] for t in sorted(records)]
+
+
+def _simulate(
+    plan: StrategyPlan,
+    df: pd.DataFrame,
+    initial_cash: float,
+    engine: str,
+    use_cache: bool,
+    warmup: int,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    if engine not in ("vectorized", "loop"):
+        raise ValueError(f"Unknown backtest engine: {engine}")
+    values = _indicator_values(df, plan, indicator_cache if use_cache else None)
+    df_calc = _calc_frame(df, values, plan.lagged)
+    if warmup:
+        if not 0 < warmup < len(df_calc):
+            raise ValueError(f"warmup must be between 0 and {len(df_calc) - 1} bars")
+        df_calc = df_calc.iloc[warmup:]
+
+    signals = _signals_loop if engine == "loop" else _signals_vectorized
+    return df_calc, _build_trades(signals(df_calc, plan), df_calc.index, initial_cash, plan)
+
+
+def _close(df_calc: pd.DataFrame) -> np.ndarray:
+    if "close" in df_calc.columns:
+        return df_calc["close"].to_numpy(dtype=float)
+    return np.full(len(df_calc), np.nan)
+
+
+def run_backtest(
+    strategy: Dict[str, Any] | StrategyPlan,
+    symbol: str = "BTC/USDT",
+    market: str = "crypto",
+    timeframe: str = "1h",
+    years: int = 2,
+    initial_cash: float = 10_000.0,
+    ohlcv: Optional[pd.DataFrame] = None,
+    engine: str = "vectorized",
+    use_cache: bool = True,
+    warmup: int = 0,
+    periods_per_year: Optional[float] = None,
+) -> BacktestResult:
+    """Backtest ``strategy`` on ``ohlcv`` (or loaded data); the first ``warmup`` bars only seed indicators.
+
+    The equity curve is marked to market on every bar. Ratios are annualized with ``periods_per_year``,
+    by default the bar density of the data (``timeframe`` / ``market`` when it has no timestamps).
+    """
+    plan = compile_strategy(strategy)
+    df = ohlcv if ohlcv is not None else Data.load_ohlcv(symbol=symbol, market=market, timeframe=timeframe, years=years)
+    df_calc, trades_records = _simulate(plan, df, initial_cash, engine, use_cache, warmup)
+    ppy = periods_per_year or M.infer_periods_per_year(df.index, M.periods_per_year(timeframe, market))
+    equity = _equity_curve(trades_records, df_calc.index, _close(df_calc), initial_cash)
+    return _summarize(trades_records, equity, initial_cash, ppy)
+
+
+def run_backtest_batch(
+    strategies: Sequence[Dict[str, Any] | StrategyPlan],
+    symbol: str = "BTC/USDT",
+    market: str = "crypto",
+    timeframe: str = "1h",
+    years: int = 2,
+    initial_cash: float = 10_000.0,
+    ohlcv: Optional[pd.DataFrame] = None,
+    engine: str = "vectorized",
+    use_cache: bool = True,
+    warmup: int = 0,
+    periods_per_year: Optional[float] = None,
+) -> List[Dict[str, float]]:
+    """``run_backtest(...).metrics`` for every strategy on the same bars, scored in one ``batch_metrics`` call."""
+    df = ohlcv if ohlcv is not None else Data.load_ohlcv(symbol=symbol, market=market, timeframe=timeframe, years=years)
+    if not strategies:
+        return []
+    ppy = periods_per_year or M.infer_periods_per_year(df.index, M.periods_per_year(timeframe, market))
+    equity: List[np.ndarray] = []
+    pnl: List[List[float]] = []
+    for strategy in strategies:
+        df_calc, trades_records = _simulate(compile_strategy(strategy), df, initial_cash, engine, use_cache, warmup)
+        equity.append(_equity_curve(trades_records, df_calc.index, _close(df_calc), initial_cash).to_numpy())
+        pnl.append([r["pnl"] for r in trades_records])
+    padded = np.full((max(map(len, pnl)), len(pnl)), np.nan)
+    for j, p in enumerate(pnl):
+        padded[: len(p), j] = p
+    return _metrics_table(np.column_stack(equity), padded, initial_cash, ppy)
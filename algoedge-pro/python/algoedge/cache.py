@@ -0,0 +1,100 @@
+from __future__ import annotations
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# id(df) -> (weakref to df, fingerprint); frames are treated as immutable once fingerprinted
+_fingerprints: Dict[int, Tuple[weakref.ref, str]] = {}
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    cached = _fingerprints.get(id(df))
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fp = h.hexdigest()
+    key = id(df)
+    _fingerprints[key] = (weakref.ref(df, lambda _, key=key: _fingerprints.pop(key, None)), fp)
+    return fp
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(sum(value[c].to_numpy().nbytes for c in value.columns))
+    if isinstance(value, (pd.Series, np.ndarray)):
+        return int(value.nbytes)
+    return 0
+
+
+class IndicatorCache:
+    """Thread-safe LRU of computed indicator outputs, bounded by the total bytes of cached arrays."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._items[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._items:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.current_bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "bytes": self.current_bytes,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+indicator_cache = IndicatorCache(max_bytes=int(float(os.getenv("ALGOEDGE_INDICATOR_CACHE_MB", "256")) * 1024 * 1024))
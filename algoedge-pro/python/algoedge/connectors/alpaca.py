@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Optional
 
 try:
     import alpaca_trade_api as tradeapi  # type: ignore
@@ -8,13 +8,31 @@ except Exception:  # pragma: no cover
 
 
 class AlpacaConnector:
-    def __init__(self, api_key: str, api_secret: str, base_url: Optional[str] = None):
-        if tradeapi is None:
-            raise RuntimeError("alpaca-trade-api not available")
-        self.api = tradeapi.REST(api_key, api_secret, base_url or "https://paper-api.alpaca.markets")
+    thread_safe = True
+
+    def __init__(self, api_key: str, api_secret: str, base_url: Optional[str] = None, client: Any = None):
+        if client is None:
+            if tradeapi is None:
+                raise RuntimeError("alpaca-trade-api not available")
+            client = tradeapi.REST(api_key, api_secret, base_url or "https://paper-api.alpaca.markets")
+        self.api = client
+
+    def ping(self) -> None:
+        self.api.get_clock()
+
+    def close(self) -> None:
+        session = getattr(self.api, "_session", None)
+        if session is not None:
+            session.close()
 
     def get_account(self):
         return self.api.get_account()._raw
 
-    def submit_order(self, symbol: str, qty: float, side: str, type_: str = "market"):
-        return self.api.submit_order(symbol=symbol, qty=qty, side=side, type=type_)
\ No newline at end of file
+    def submit_order(self, symbol: str, qty: float, side: str, type_: str = "market", client_order_id: Optional[str] = None):
+        extra = {"client_order_id": client_order_id} if client_order_id else {}
+        return self.api.submit_order(symbol=symbol, qty=qty, side=side, type=type_, **extra)
+
+    @staticmethod
+    def is_duplicate(error: Exception) -> bool:
+        # 422 "client_order_id must be unique": an earlier attempt with this id was accepted
+        return "client_order_id must be unique" in str(error)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 try:
     import ccxt  # type: ignore
@@ -8,17 +8,69 @@ except Exception:  # pragma: no cover
 
 
 class BinanceConnector:
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
-        if ccxt is None:
-            raise RuntimeError("ccxt not available")
-        self.ex = ccxt.binance({
-            "apiKey": api_key or "",
-            "secret": api_secret or "",
-            "enableRateLimit": True,
-        })
+    thread_safe = True
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, client: Any = None):
+        if client is None:
+            if ccxt is None:
+                raise RuntimeError("ccxt not available")
+            client = ccxt.binance({
+                "apiKey": api_key or "",
+                "secret": api_secret or "",
+                "enableRateLimit": True,
+            })
+        self.ex = client
+        # Once per session: orders then resolve symbols from the warm markets cache
+        self.ex.load_markets()
+
+    def ping(self) -> None:
+        self.ex.fetch_time()
+
+    def close(self) -> None:
+        close = getattr(self.ex, "close", None)
+        if close is not None:
+            close()
 
     def fetch_balance(self):
         return self.ex.fetch_balance()
 
-    def create_order(self, symbol: str, side: str, type_: str, amount: float, price: Optional[float] = None):
-        return self.ex.create_order(symbol, type_, side, amount, price)
\ No newline at end of file
+    def create_order(
+        self,
+        symbol: str,
+        side: str,
+        type_: str,
+        amount: float,
+        price: Optional[float] = None,
+        client_order_id: Optional[str] = None,
+    ):
+        # The venue rejects a repeated clientOrderId, so a retried order cannot fill twice
+        params = {"clientOrderId": client_order_id} if client_order_id else {}
+        return self.ex.create_order(symbol, type_, side, amount, price, params)
+
+    @staticmethod
+    def is_duplicate(error: Exception) -> bool:
+        # -2010 "Duplicate order sent.": an earlier attempt with this clientOrderId was accepted
+        return "duplicate order" in str(error).lower()
+
+    def batchable(self, symbol: str) -> bool:
+        # Binance only takes batch orders on futures / perpetual markets, not spot
+        if not getattr(self.ex, "has", {}).get("createOrders"):
+            return False
+        try:
+            return bool(self.ex.market(symbol).get("contract"))
+        except Exception:
+            return False
+
+    def create_orders(self, orders: List[Dict[str, Any]]):
+        """Several orders in one request; each dict takes create_order's keyword arguments."""
+        return self.ex.create_orders([
+            {
+                "symbol": o["symbol"],
+                "type": o.get("type_", "market"),
+                "side": o["side"],
+                "amount": o["amount"],
+                "price": o.get("price"),
+                "params": {"clientOrderId": o["client_order_id"]} if o.get("client_order_id") else {},
+            }
+            for o in orders
+        ])
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# In-process stand-ins for the broker client libraries, injected through the connectors' ``client`` /
+# ``ib`` arguments. Each sleeps for configurable handshake and request latencies, records calls, and
+# can be made to fail, so session reuse, health checks and reconnects can be exercised offline.
+
+
+class _FakeBroker:
+    def __init__(self, connect_latency: float = 0.0, latency: float = 0.0):
+        self.connect_latency = connect_latency
+        self.latency = latency
+        self.calls: List[str] = []
+        self.orders: List[Dict[str, Any]] = []
+        self.down = False
+        self._ids = itertools.count(1)
+
+    def _request(self, name: str) -> None:
+        self.calls.append(name)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.down:
+            raise ConnectionError(f"{name}: connection lost")
+
+    def _handshake(self, name: str) -> None:
+        self.calls.append(name)
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        self.down = False
+
+    def _record(self, **order: Any) -> Dict[str, Any]:
+        order["id"] = str(next(self._ids))
+        self.orders.append(order)
+        return order
+
+
+class FakeExchange(_FakeBroker):
+    """ccxt-style exchange; ``load_markets`` is the expensive warm-up."""
+
+    def load_markets(self, reload: bool = False) -> Dict[str, Any]:
+        self._handshake("load_markets")
+        return {}
+
+    def fetch_time(self) -> int:
+        self._request("fetch_time")
+        return int(time.time() * 1000)
+
+    def market(self, symbol: str) -> Dict[str, Any]:
+        # ccxt's unified symbols carry the settle currency for contracts, e.g. BTC/USDT:USDT
+        contract = ":" in symbol
+        return {"symbol": symbol, "spot": not contract, "contract": contract, "swap": contract}
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: Optional[float] = None, params: Optional[Dict[str, Any]] = None):
+        self._request("create_order")
+        return self._record(symbol=symbol, type=type, side=side, amount=amount, price=price, **(params or {}))
+
+
+class FakeAlpacaREST(_FakeBroker):
+    def get_clock(self) -> SimpleNamespace:
+        self._request("get_clock")
+        return SimpleNamespace(is_open=True)
+
+    def submit_order(self, **order: Any) -> SimpleNamespace:
+        self._request("submit_order")
+        return SimpleNamespace(**self._record(**order))
+
+
+class FakeIB(_FakeBroker):
+    """ib_insync ``IB``; ``connect`` is the gateway handshake."""
+
+    connected = False
+
+    def connect(self, host: str = "127.0.0.1", port: int = 4002, clientId: int = 1, **kwargs: Any) -> "FakeIB":
+        self._handshake("connect")
+        self.connected = True
+        return self
+
+    def isConnected(self) -> bool:
+        return self.connected and not self.down
+
+    def disconnect(self) -> None:
+        self.connected = False
+
+    def placeOrder(self, contract: Any, order: Any) -> SimpleNamespace:
+        self._request("placeOrder")
+        self._record(symbol=contract.symbol, side=order.action, qty=order.totalQuantity)
+        return SimpleNamespace(orderStatus=SimpleNamespace(status="Submitted"))
+
+
+class RateLimitExceeded(ConnectionError):
+    """The venue throttled the request before it reached matching (safe to retry)."""
+
+
+class SimulatedExchange(FakeExchange):
+    """Thread-safe ccxt-style venue for throughput runs.
+
+    Requests are charged against a sliding ``window`` of ``weight_limit`` (rejected with
+    ``RateLimitExceeded`` once spent), batches of up to ``max_batch`` orders cost ``batch_weight``, and
+    orders are de-duplicated by ``clientOrderId``. With ``lost_ack_rate`` some accepted orders raise
+    ``ConnectionError`` as if the acknowledgement was lost, which is what idempotent retries are for.
+    """
+
+    has = {"createOrders": True}
+
+    def __init__(
+        self,
+        latency: float = 0.02,
+        weight_limit: int = 100,
+        window: float = 1.0,
+        order_weight: int = 1,
+        batch_weight: int = 1,
+        max_batch: int = 5,
+        lost_ack_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(latency=latency)
+        self.weight_limit = weight_limit
+        self.window = window
+        self.order_weight = order_weight
+        self.batch_weight = batch_weight
+        self.max_batch = max_batch
+        self.lost_ack_rate = lost_ack_rate
+        self.rejected = 0
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._charges: Deque[Tuple[float, int]] = deque()
+        self._by_client_id: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _charge(self, weight: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            while self._charges and self._charges[0][0] <= now - self.window:
+                self._charges.popleft()
+            if sum(w for _, w in self._charges) + weight > self.weight_limit:
+                self.rejected += 1
+                raise RateLimitExceeded("request weight limit exceeded")
+            self._charges.append((now, weight))
+            self.requests += 1
+
+    def _fill(self, symbol: str, type: str, side: str, amount: float, price: Optional[float], params: Dict[str, Any]) -> Dict[str, Any]:
+        client_id = params.get("clientOrderId")
+        with self._lock:
+            if client_id and client_id in self._by_client_id:
+                return self._by_client_id[client_id]
+            order = self._record(symbol=symbol, type=type, side=side, amount=amount, price=price, status="closed", **params)
+            if client_id:
+                self._by_client_id[client_id] = order
+            lost = self._rng.random() < self.lost_ack_rate
+        if lost:
+            raise ConnectionError("connection reset before the acknowledgement")
+        return order
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: Optional[float] = None, params: Optional[Dict[str, Any]] = None):
+        self._charge(self.order_weight)
+        time.sleep(self.latency)
+        return self._fill(symbol, type, side, amount, price, params or {})
+
+    def create_orders(self, orders: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None):
+        if len(orders) > self.max_batch:
+            raise ValueError(f"at most {self.max_batch} orders per batch")
+        self._charge(self.batch_weight)
+        time.sleep(self.latency)
+        return [self._fill(o["symbol"], o["type"], o["side"], o["amount"], o.get("price"), o.get("params") or {}) for o in orders]
@@ -1,21 +1,47 @@
 from __future__ import annotations
-from typing import Optional
+from types import SimpleNamespace
+from typing import Any, Optional
 
 try:
     from ib_insync import IB, Stock, MarketOrder  # type: ignore
 except Exception:  # pragma: no cover
     IB = None  # type: ignore
+    Stock = MarketOrder = None  # type: ignore
 
 
 class IBConnector:
-    def __init__(self, host: str = "127.0.0.1", port: int = 4002, client_id: int = 1):
-        if IB is None:
-            raise RuntimeError("ib_insync not available")
-        self.ib = IB()
+    # ib_insync drives one socket from one event loop; the registry serializes calls per session
+    thread_safe = False
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 4002, client_id: int = 1, ib: Any = None):
+        if ib is None:
+            if IB is None:
+                raise RuntimeError("ib_insync not available")
+            ib = IB()
+        self.ib = ib
         self.ib.connect(host, port, clientId=client_id)
 
-    def place_market_order(self, symbol: str, exchange: str = "SMART", currency: str = "USD", qty: float = 1.0, side: str = "BUY"):
-        contract = Stock(symbol, exchange, currency)
-        order = MarketOrder(side, qty)
+    def ping(self) -> None:
+        if not self.ib.isConnected():
+            raise ConnectionError("IB gateway disconnected")
+
+    def close(self) -> None:
+        self.ib.disconnect()
+
+    def place_market_order(
+        self,
+        symbol: str,
+        exchange: str = "SMART",
+        currency: str = "USD",
+        qty: float = 1.0,
+        side: str = "BUY",
+        order_ref: Optional[str] = None,
+    ):
+        if Stock is not None:
+            contract, order = Stock(symbol, exchange, currency), MarketOrder(side, qty, orderRef=order_ref or "")
+        else:
+            # Plain records for injected test doubles when ib_insync is not installed
+            contract = SimpleNamespace(symbol=symbol, exchange=exchange, currency=currency)
+            order = SimpleNamespace(action=side, totalQuantity=qty, orderType="MKT", orderRef=order_ref or "")
         trade = self.ib.placeOrder(contract, order)
-        return trade.orderStatus.status
\ No newline at end of file
+        return trade.orderStatus.status
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import contextlib
+import hashlib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .alpaca import AlpacaConnector
+from .binance import BinanceConnector
+from .ib import IBConnector
+
+# broker -> factory(**credentials) returning a connected connector
+DEFAULT_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "binance": BinanceConnector,
+    "alpaca": AlpacaConnector,
+    "ib": IBConnector,
+}
+
+
+@dataclass
+class Session:
+    broker: str
+    connector: Any
+    checked_at: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+@dataclass
+class BrokerStats:
+    connects: int = 0
+    reconnects: int = 0
+    health_failures: int = 0
+    orders: int = 0
+    errors: int = 0
+    # Recent (acquire, order) seconds per order
+    samples: Deque[Tuple[float, float]] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "health_failures": self.health_failures,
+            "orders": self.orders,
+            "errors": self.errors,
+        }
+        if self.samples:
+            acquire, order = (np.asarray(x) * 1e3 for x in zip(*self.samples))
+            out["acquire_ms_avg"] = float(acquire.mean())
+            out["order_ms_p50"] = float(np.percentile(order, 50))
+            out["order_ms_p99"] = float(np.percentile(order, 99))
+            out["order_ms_max"] = float(order.max())
+        return out
+
+
+class ConnectorRegistry:
+    """Long-lived broker sessions, one per broker and credential set.
+
+    A session is built once by its factory (the IB handshake, ccxt ``load_markets``) and reused by
+    every order. Sessions idle for more than ``health_interval`` seconds, or whose last order failed,
+    are pinged before use and rebuilt if the ping fails. Orders are never retried here: a failed
+    order may still have reached the broker.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[..., Any]]] = None, health_interval: float = 30.0):
+        self.factories = dict(DEFAULT_FACTORIES if factories is None else factories)
+        self.health_interval = health_interval
+        self._sessions: Dict[Tuple[str, str], Session] = {}
+        self._connect_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._stats: Dict[str, BrokerStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def register(self, broker: str, factory: Callable[..., Any]) -> None:
+        self.factories[broker] = factory
+
+    @staticmethod
+    def _key(broker: str, credentials: Dict[str, Any]) -> Tuple[str, str]:
+        # Keyed by a digest so secrets are not kept around as dict keys
+        return broker, hashlib.sha256(repr(sorted(credentials.items())).encode()).hexdigest()
+
+    def _broker_stats(self, broker: str) -> BrokerStats:
+        with self._lock:
+            return self._stats.setdefault(broker, BrokerStats())
+
+    def acquire(self, broker: str, **credentials: Any) -> Session:
+        """The broker's session for ``credentials``, connected and recently health-checked."""
+        if broker not in self.factories:
+            raise ValueError(f"Unknown broker: {broker}")
+        key = self._key(broker, credentials)
+        with self._lock:
+            session = self._sessions.get(key)
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        if session is not None and time.monotonic() - session.checked_at < self.health_interval:
+            return session
+        stats = self._broker_stats(broker)
+        with connect_lock:
+            # Another thread may have (re)connected while this one waited
+            with self._lock:
+                session = self._sessions.get(key)
+            if session is not None:
+                if time.monotonic() - session.checked_at < self.health_interval:
+                    return session
+                try:
+                    with self._guard(session):
+                        session.connector.ping()
+                    session.checked_at = time.monotonic()
+                    return session
+                except Exception:
+                    stats.health_failures += 1
+                self._close(session)
+                stats.reconnects += 1
+            session = Session(broker, self.factories[broker](**credentials), time.monotonic())
+            stats.connects += 1
+            with self._lock:
+                self._sessions[key] = session
+            return session
+
+    @contextlib.contextmanager
+    def order(self, broker: str, **credentials: Any) -> Iterator[Any]:
+        """Yield a connector for one order and record how long acquiring it and the order took.
+
+        The timings of the last order on this thread are in ``last_timing`` afterwards.
+        """
+        stats = self._broker_stats(broker)
+        start = time.perf_counter()
+        session = self.acquire(broker, **credentials)
+        with self._guard(session):
+            acquired = time.perf_counter()
+            try:
+                yield session.connector
+            except Exception:
+                # Check the connection before the next order rather than trusting it
+                session.checked_at = float("-inf")
+                stats.errors += 1
+                raise
+            finally:
+                done = time.perf_counter()
+                stats.orders += 1
+                stats.samples.append((acquired - start, done - acquired))
+                self._local.timing = {"acquire_ms": (acquired - start) * 1e3, "order_ms": (done - acquired) * 1e3}
+
+    @property
+    def last_timing(self) -> Dict[str, float]:
+        return getattr(self._local, "timing", {})
+
+    @staticmethod
+    def _guard(session: Session) -> Any:
+        # Connectors that are not thread-safe get one call at a time
+        return contextlib.nullcontext() if getattr(session.connector, "thread_safe", False) else session.lock
+
+    @staticmethod
+    def _close(session: Session) -> None:
+        try:
+            session.connector.close()
+        except Exception:
+            pass
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._close(session)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            open_sessions: Dict[str, int] = {}
+            for broker, _ in self._sessions:
+                open_sessions[broker] = open_sessions.get(broker, 0) + 1
+            stats = dict(self._stats)
+        return {broker: {"sessions": open_sessions.get(broker, 0), **s.to_dict()} for broker, s in stats.items()}
@@ -1,10 +1,11 @@
 from __future__ import annotations
-import datetime as dt
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .store import Fetcher, OHLCVStore, to_ms
+
 try:
     import ccxt  # type: ignore
 except Exception:  # pragma: no cover - optional
@@ -38,6 +39,72 @@ def _synthetic_ohlcv(start: pd.Timestamp, periods: int, minutes: int = 60, seed:
     return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=dt_index)
 
 
+def _frame_from_rows(rows: List[List[float]]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"]).set_index("timestamp")
+    df.index = pd.to_datetime(df.index, unit="ms")
+    return df
+
+
+def _ccxt_fetcher(client: Any, symbol: str, timeframe: str, limit: int = 1000) -> Fetcher:
+    step_ms = TIMEFRAME_TO_MIN.get(timeframe, 60) * 60_000
+
+    def fetch(since_ms: int, until_ms: int) -> pd.DataFrame:
+        rows: List[List[float]] = []
+        cursor = since_ms
+        while cursor < until_ms:
+            batch = client.fetch_ohlcv(symbol, timeframe=timeframe, since=cursor, limit=limit)
+            if not batch:
+                break
+            rows.extend(r for r in batch if since_ms <= r[0] < until_ms)
+            last = int(batch[-1][0])
+            if last < cursor:
+                break
+            cursor = last + step_ms
+        return _frame_from_rows(rows)
+
+    return fetch
+
+
+def _yfinance_fetcher(symbol: str, timeframe: str) -> Fetcher:
+    def fetch(since_ms: int, until_ms: int) -> pd.DataFrame:
+        df = yf.download(
+            tickers=symbol,
+            interval=timeframe,
+            start=pd.Timestamp(since_ms, unit="ms").strftime("%Y-%m-%d"),
+            # yfinance takes whole days and ``end`` is exclusive, so ask through the day holding until_ms
+            end=(pd.Timestamp(until_ms, unit="ms") + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+            progress=False,
+        )
+        df = df.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"})
+        df = df[["open", "high", "low", "close", "volume"]]
+        ms = to_ms(df.index)
+        df = df[(ms >= since_ms) & (ms < until_ms)]
+        df.index = pd.to_datetime(to_ms(df.index), unit="ms")
+        return df
+
+    return fetch
+
+
+_default_store: Optional[OHLCVStore] = None
+
+
+def get_store() -> OHLCVStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore()
+    return _default_store
+
+
+def _window_ms(timeframe: str, years: int, start: Optional[pd.Timestamp] = None) -> Tuple[int, int, pd.Timestamp]:
+    minutes = TIMEFRAME_TO_MIN.get(timeframe, 60)
+    start = start or (pd.Timestamp.utcnow() - pd.Timedelta(days=years * 365))
+    step_ms = minutes * 60_000
+    start_ms = int(start.timestamp() * 1000) // step_ms * step_ms
+    # Only completed bars are synced; the in-progress candle is refetched once it closes
+    end_ms = int(pd.Timestamp.utcnow().timestamp() * 1000) // step_ms * step_ms
+    return start_ms, end_ms, start
+
+
 def load_ohlcv(
     symbol: str,
     market: str = "crypto",
@@ -45,20 +112,25 @@ def load_ohlcv(
     years: int = 2,
     exchange: str = "binance",
     start: Optional[pd.Timestamp] = None,
+    client: Any = None,
+    store: Optional[OHLCVStore] = None,
+    use_store: bool = True,
 ) -> pd.DataFrame:
     minutes = TIMEFRAME_TO_MIN.get(timeframe, 60)
     periods = int((years * 365 * 24 * 60) / minutes)
-    start = start or (pd.Timestamp.utcnow() - pd.Timedelta(days=years * 365))
+    start_ms, end_ms, start = _window_ms(timeframe, years, start)
+    store = store or get_store()
 
-    # Crypto via CCXT
-    if market == "crypto" and ccxt is not None:
+    # Crypto via CCXT (or any object exposing fetch_ohlcv)
+    if market == "crypto" and (client is not None or ccxt is not None):
         try:
-            ex = getattr(ccxt, exchange)()
-            since_ms = int(start.timestamp() * 1000)
-            batch = ex.fetch_ohlcv(symbol, timeframe=timeframe, since=since_ms, limit=min(1000, periods))
-            if batch:
-                df = pd.DataFrame(batch, columns=["timestamp", "open", "high", "low", "close", "volume"]).set_index("timestamp")
-                df.index = pd.to_datetime(df.index, unit="ms")
+            ex = client if client is not None else getattr(ccxt, exchange)()
+            fetch = _ccxt_fetcher(ex, symbol, timeframe)
+            if use_store:
+                df = store.sync(market, exchange, symbol, timeframe, start_ms, end_ms, fetch, step_ms=minutes * 60_000)
+            else:
+                df = fetch(start_ms, end_ms)
+            if not df.empty:
                 return df
         except Exception:
             pass
@@ -66,14 +138,16 @@ def load_ohlcv(
     # Stocks/Forex via yfinance
     if market in ("stocks", "forex") and yf is not None:
         try:
-            interval = timeframe
-            start_dt = (dt.datetime.utcnow() - dt.timedelta(days=years * 365)).strftime("%Y-%m-%d")
-            df = yf.download(tickers=symbol, interval=interval, start=start_dt, progress=False)
+            fetch = _yfinance_fetcher(symbol, timeframe)
+            if use_store:
+                df = store.sync(market, "yfinance", symbol, timeframe, start_ms, end_ms, fetch, step_ms=minutes * 60_000)
+            else:
+                df = fetch(start_ms, end_ms)
             if not df.empty:
-                df = df.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"})
-                return df[["open", "high", "low", "close", "volume"]]
+                return df
         except Exception:
             pass
 
     # Fallback to synthetic data
-    return _synthetic_ohlcv(start=start, periods=periods, minutes=minutes)
\ No newline at end of file
+    # Aligned to the bar window, so repeated loads return identical bars
+    return _synthetic_ohlcv(start=pd.Timestamp(start_ms, unit="ms", tz=start.tz), periods=periods, minutes=minutes)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .connectors.registry import ConnectorRegistry
+
+try:
+    import ccxt  # type: ignore
+
+    _TRANSIENT: Tuple[type, ...] = (OSError, TimeoutError, ccxt.NetworkError)
+except Exception:  # pragma: no cover
+    _TRANSIENT = (OSError, TimeoutError)
+
+"""
+Asynchronous order execution over the synchronous connectors.
+
+Orders for a broker share a concurrency limit and a token bucket sized to the venue's request
+weights; connector calls run on a thread pool so the event loop never blocks on a broker. Every order
+carries a client order id that is sent to the venue and reused on retries, so a retry after a lost
+acknowledgement cannot fill twice.
+"""
+
+
+@dataclass(frozen=True)
+class BrokerLimits:
+    concurrency: int = 4  # requests in flight
+    rate: float = 10.0  # weight replenished per second
+    burst: float = 10.0  # bucket size
+    order_weight: float = 1.0
+    batch_weight: float = 1.0
+    max_batch: int = 1  # orders per request where the venue has a batch endpoint
+    idempotent: bool = True  # the venue rejects or merges repeated client order ids, so retries are safe
+
+
+# burst + rate * window stays within each venue's limit, so a full bucket cannot overrun a window
+DEFAULT_LIMITS: Dict[str, BrokerLimits] = {
+    # 50 orders / 10s per account; batch endpoints (futures) take 5 orders at 5x the weight
+    "binance": BrokerLimits(concurrency=8, rate=4.0, burst=10.0, batch_weight=5.0, max_batch=5),
+    # 200 requests / minute
+    "alpaca": BrokerLimits(concurrency=4, rate=3.0, burst=20.0),
+    # 50 messages / second to the gateway, one socket; orderRef is not enforced unique, so never retried
+    "ib": BrokerLimits(concurrency=1, rate=40.0, burst=10.0, idempotent=False),
+}
+
+
+def client_order_id(*parts: Any) -> str:
+    """Deterministic id for an order intent, e.g. (strategy, symbol, bar time, side); 34 chars."""
+    return "ae" + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def new_client_order_id() -> str:
+    return "ae" + uuid.uuid4().hex
+
+
+@dataclass
+class OrderRequest:
+    broker: str
+    symbol: str
+    side: str  # buy | sell
+    qty: float
+    type: str = "market"
+    price: Optional[float] = None
+    client_order_id: str = field(default_factory=new_client_order_id)
+
+
+@dataclass
+class OrderResult:
+    client_order_id: str
+    broker: str
+    ok: bool
+    response: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    batched: bool = False
+    throttled_ms: float = 0.0
+    latency_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class TokenBucket:
+    """Weighted token bucket; waiters are served in arrival order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, weight: float = 1.0) -> float:
+        """Take ``weight`` tokens, sleeping until they are available; returns the seconds waited."""
+        weight = min(weight, self.capacity)
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return now - start
+                await asyncio.sleep((weight - self.tokens) / self.rate)
+
+
+@dataclass
+class _Stats:
+    orders: int = 0
+    filled: int = 0
+    failed: int = 0
+    requests: int = 0
+    batched_orders: int = 0
+    retries: int = 0
+    duplicates: int = 0
+    in_flight: int = 0
+    throttled: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {k: v for k, v in self.__dict__.items() if k != "latencies"}
+        out["throttled_ms"] = out.pop("throttled") * 1e3
+        if self.latencies:
+            ms = np.asarray(self.latencies) * 1e3
+            out["latency_ms_p50"] = float(np.percentile(ms, 50))
+            out["latency_ms_p99"] = float(np.percentile(ms, 99))
+        return out
+
+
+def _place(conn: Any, order: OrderRequest) -> Any:
+    # By method rather than class, so connectors imported under another package path still match
+    if hasattr(conn, "create_order"):  # ccxt
+        return conn.create_order(order.symbol, order.side, order.type, order.qty, order.price, client_order_id=order.client_order_id)
+    if hasattr(conn, "submit_order"):  # Alpaca
+        placed = conn.submit_order(order.symbol, order.qty, order.side, order.type, client_order_id=order.client_order_id)
+        return {"id": str(getattr(placed, "id", "")), "client_order_id": order.client_order_id}
+    if hasattr(conn, "place_market_order"):  # IB
+        return {"status": conn.place_market_order(order.symbol, qty=order.qty, side=order.side.upper(), order_ref=order.client_order_id)}
+    raise ValueError(f"No order mapping for {type(conn).__name__}")
+
+
+class ExecutionService:
+    """Submits orders through a ``ConnectorRegistry`` without blocking the event loop.
+
+    Per broker, at most ``limits.concurrency`` requests are in flight and each request first takes
+    its weight from a token bucket, so bursts queue here instead of being rejected by the venue.
+    ``submit_many`` groups orders by broker and, where the connector has a batch endpoint, sends
+    ``max_batch`` orders per request. Transient errors are retried with backoff under the same client
+    order ids, and an id seen before returns the earlier outcome instead of sending again.
+    """
+
+    def __init__(
+        self,
+        registry: ConnectorRegistry,
+        credentials: Callable[[str], Dict[str, Any]] = lambda broker: {},
+        limits: Optional[Dict[str, BrokerLimits]] = None,
+        retries: int = 2,
+        backoff: float = 0.05,
+        remember: int = 10_000,
+    ):
+        self.registry = registry
+        self.credentials = credentials
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.retries = retries
+        self.backoff = backoff
+        self.remember = remember
+        threads = max(4, sum(l.concurrency for l in self.limits.values()))
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="orders")
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._batching: Dict[Tuple[str, str], bool] = {}
+        self._done: "OrderedDict[str, OrderResult]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[OrderResult]"] = {}
+        self._stats: Dict[str, _Stats] = {}
+
+    def _limits(self, broker: str) -> BrokerLimits:
+        return self.limits.get(broker, BrokerLimits())
+
+    def _broker_state(self, broker: str) -> Tuple[TokenBucket, asyncio.Semaphore, _Stats]:
+        if broker not in self._buckets:
+            limits = self._limits(broker)
+            self._buckets[broker] = TokenBucket(limits.rate, limits.burst)
+            self._semaphores[broker] = asyncio.Semaphore(limits.concurrency)
+            self._stats[broker] = _Stats()
+        return self._buckets[broker], self._semaphores[broker], self._stats[broker]
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _batchable(self, broker: str, symbols: List[str]) -> Dict[str, bool]:
+        # Whether the venue's batch endpoint takes each symbol (e.g. Binance: futures markets only)
+        if self._limits(broker).max_batch <= 1:
+            return {symbol: False for symbol in symbols}
+        unknown = [symbol for symbol in symbols if (broker, symbol) not in self._batching]
+        if unknown:
+            session = await self._run(lambda: self.registry.acquire(broker, **self.credentials(broker)))
+            check = getattr(session.connector, "batchable", None)
+            for symbol in unknown:
+                self._batching[broker, symbol] = bool(check is not None and check(symbol))
+        return {symbol: self._batching[broker, symbol] for symbol in symbols}
+
+    def _call(self, broker: str, orders: List[OrderRequest], retry: bool) -> List[Any]:
+        with self.registry.order(broker, **self.credentials(broker)) as conn:
+            if len(orders) > 1:
+                return list(conn.create_orders([
+                    {"symbol": o.symbol, "side": o.side, "type_": o.type, "amount": o.qty, "price": o.price, "client_order_id": o.client_order_id}
+                    for o in orders
+                ]))
+            try:
+                return [_place(conn, orders[0])]
+            except Exception as e:
+                is_duplicate = getattr(conn, "is_duplicate", None)
+                if retry and is_duplicate is not None and is_duplicate(e):
+                    # The attempt whose acknowledgement was lost went through
+                    return [{"client_order_id": orders[0].client_order_id, "duplicate": True}]
+                raise
+
+    async def _send(self, broker: str, orders: List[OrderRequest]) -> None:
+        limits = self._limits(broker)
+        bucket, semaphore, stats = self._broker_state(broker)
+        weight = limits.batch_weight if len(orders) > 1 else limits.order_weight
+        retries = self.retries if limits.idempotent else 0
+        start = time.perf_counter()
+        throttled, attempts = 0.0, 0
+        responses: Optional[List[Any]] = None
+        error: Optional[str] = None
+        async with semaphore:
+            stats.in_flight += 1
+            while True:
+                throttled += await bucket.acquire(weight)
+                attempts += 1
+                stats.requests += 1
+                try:
+                    responses = await self._run(self._call, broker, orders, attempts > 1)
+                    break
+                except _TRANSIENT as e:
+                    if attempts > retries:
+                        error = f"{type(e).__name__}: {e}"
+                        break
+                    stats.retries += 1
+                    await asyncio.sleep(self.backoff * 2 ** (attempts - 1))
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    break
+            stats.in_flight -= 1
+        latency = time.perf_counter() - start
+        stats.throttled += throttled
+        for i, order in enumerate(orders):
+            result = OrderResult(
+                client_order_id=order.client_order_id,
+                broker=broker,
+                ok=responses is not None,
+                response=responses[i] if responses is not None else None,
+                error=error,
+                attempts=attempts,
+                batched=len(orders) > 1,
+                throttled_ms=throttled * 1e3,
+                latency_ms=latency * 1e3,
+            )
+            stats.orders += 1
+            stats.filled += result.ok
+            stats.failed += not result.ok
+            stats.batched_orders += result.batched
+            stats.latencies.append(latency)
+            self._finish(result)
+
+    def _finish(self, result: OrderResult) -> None:
+        future = self._inflight.pop(result.client_order_id, None)
+        if result.ok:
+            # Failed ids are forgotten, so the same intent can be submitted again
+            self._done[result.client_order_id] = result
+            while len(self._done) > self.remember:
+                self._done.popitem(last=False)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def submit(self, order: OrderRequest) -> OrderResult:
+        return (await self.submit_many([order]))[0]
+
+    async def submit_many(self, orders: List[OrderRequest]) -> List[OrderResult]:
+        """Send ``orders`` concurrently (batched per broker where possible); results are in input order."""
+        loop = asyncio.get_running_loop()
+        outcomes: List["asyncio.Future[OrderResult]"] = []
+        fresh: Dict[str, List[OrderRequest]] = {}
+        for order in orders:
+            cid = order.client_order_id
+            done = self._done.get(cid)
+            if done is not None or cid in self._inflight:
+                self._broker_state(order.broker)[2].duplicates += 1
+                if done is not None:
+                    future = loop.create_future()
+                    future.set_result(done)
+                else:
+                    future = self._inflight[cid]
+                outcomes.append(future)
+                continue
+            future = self._inflight[cid] = loop.create_future()
+            outcomes.append(future)
+            fresh.setdefault(order.broker, []).append(order)
+
+        sends = []
+        for broker, pending in fresh.items():
+            try:
+                batchable = await self._batchable(broker, sorted({o.symbol for o in pending}))
+            except Exception:
+                batchable = {}  # the session failed to connect; each order reports the error
+            size = self._limits(broker).max_batch
+            batched = [o for o in pending if batchable.get(o.symbol)]
+            sends.extend(self._send(broker, batched[i:i + size]) for i in range(0, len(batched), size))
+            sends.extend(self._send(broker, [o]) for o in pending if not batchable.get(o.symbol))
+        await asyncio.gather(*sends)
+        return [await future for future in outcomes]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {broker: stats.to_dict() for broker, stats in self._stats.items()}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
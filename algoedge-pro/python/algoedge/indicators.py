@@ -1,6 +1,40 @@
 from __future__ import annotations
+import os
+from typing import Any, Dict, Sequence
+
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+
+from . import kernels as K
+from . import native as N
+
+# "pandas_ta" (reference) or "native" (algoedge.native: NumPy / numba arrays, pandas_ta never imported)
+BACKENDS = ("pandas_ta", "native")
+_backend = os.getenv("ALGOEDGE_INDICATOR_BACKEND", "pandas_ta")
+if _backend not in BACKENDS:
+    raise ValueError(f"Unknown indicator backend: {_backend}")
+_ta_module: Any = None
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {name}")
+    _backend = name
+
+
+def _ta() -> Any:
+    # pandas_ta is slow to import; load it on first use so native-backend workers never pay for it
+    global _ta_module
+    if _ta_module is None:
+        import pandas_ta
+
+        _ta_module = pandas_ta
+    return _ta_module
 
 
 def ensure_column(df: pd.DataFrame, source: str) -> pd.Series:
@@ -10,34 +44,87 @@ def ensure_column(df: pd.DataFrame, source: str) -> pd.Series:
     return df[df.columns[0]] if df.columns else pd.Series(dtype=float)
 
 
+def _frame(columns: Dict[str, np.ndarray], suffix: str, index: pd.Index) -> pd.DataFrame:
+    return pd.DataFrame({f"{prefix}_{suffix}": col for prefix, col in columns.items()}, index=index)
+
+
 def ema(df: pd.DataFrame, length: int = 20, source: str = "close") -> pd.Series:
     s = ensure_column(df, source)
-    return ta.ema(s, length=length)
+    if _backend == "native":
+        return pd.Series(N.ema(s.to_numpy(dtype=float), length), index=s.index, name=f"EMA_{length}")
+    return _ta().ema(s, length=length)
 
 
 def sma(df: pd.DataFrame, length: int = 20, source: str = "close") -> pd.Series:
     s = ensure_column(df, source)
-    return ta.sma(s, length=length)
+    if _backend == "native":
+        return pd.Series(N.sma(s.to_numpy(dtype=float), length), index=s.index, name=f"SMA_{length}")
+    return _ta().sma(s, length=length)
 
 
 def rsi(df: pd.DataFrame, length: int = 14, source: str = "close") -> pd.Series:
     s = ensure_column(df, source)
-    return ta.rsi(s, length=length)
+    if _backend == "native":
+        return pd.Series(N.rsi(s.to_numpy(dtype=float), length), index=s.index, name=f"RSI_{length}")
+    return _ta().rsi(s, length=length)
 
 
 def macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9, source: str = "close") -> pd.DataFrame:
     s = ensure_column(df, source)
-    macd_df = ta.macd(s, fast=fast, slow=slow, signal=signal)
+    if _backend == "native":
+        if slow < fast:
+            fast, slow = slow, fast
+        return _frame(N.macd(s.to_numpy(dtype=float), fast, slow, signal), f"{fast}_{slow}_{signal}", s.index)
+    macd_df = _ta().macd(s, fast=fast, slow=slow, signal=signal)
     return macd_df
 
 
+def macd_from_ema(fast_ma: pd.Series, slow_ma: pd.Series, fast: int, slow: int, signal: int) -> pd.DataFrame:
+    # pandas_ta.macd's arithmetic on EMAs computed elsewhere, so an EMA block and a MACD can share them
+    suffix = f"{fast}_{slow}_{signal}"
+    if _backend == "native":
+        columns = N.macd_from_ema(fast_ma.to_numpy(dtype=float), slow_ma.to_numpy(dtype=float), signal)
+        return _frame(columns, suffix, fast_ma.index)
+    line = fast_ma - slow_ma
+    signal_ma = _ta().ema(line.loc[line.first_valid_index():], length=signal)
+    return pd.DataFrame({f"MACD_{suffix}": line, f"MACDh_{suffix}": line - signal_ma, f"MACDs_{suffix}": signal_ma})
+
+
 def bollinger_bands(df: pd.DataFrame, length: int = 20, std: float = 2.0, source: str = "close") -> pd.DataFrame:
     s = ensure_column(df, source)
-    bb = ta.bbands(s, length=length, std=std)
+    if _backend == "native":
+        return _frame(N.bbands(s.to_numpy(dtype=float), length, std), f"{length}_{float(std)}", s.index)
+    bb = _ta().bbands(s, length=length, std=std)
     return bb
 
 
 def vwap(df: pd.DataFrame) -> pd.Series:
     if {"high", "low", "close", "volume"}.issubset(df.columns):
-        return ta.vwap(high=df["high"], low=df["low"], close=df["close"], volume=df["volume"])
-    return pd.Series(index=df.index, dtype=float)
\ No newline at end of file
+        if _backend == "native":
+            # Daily anchor on wall-clock dates, as pandas_ta's to_period("D")
+            index = df.index.tz_localize(None) if getattr(df.index, "tz", None) is not None else df.index
+            groups = index.normalize().asi8 if isinstance(index, pd.DatetimeIndex) else np.zeros(len(df), dtype=np.int64)
+            values = N.vwap(*(df[c].to_numpy(dtype=float) for c in ("high", "low", "close", "volume")), groups)
+            return pd.Series(values, index=df.index, name="VWAP_D")
+        return _ta().vwap(high=df["high"], low=df["low"], close=df["close"], volume=df["volume"])
+    return pd.Series(index=df.index, dtype=float)
+
+# Batched variants: one pass over the source for many lengths, returning (bars x lengths) arrays.
+# The kernels assume a gap-free source; callers fall back to the per-call functions otherwise.
+
+def ema_batch(df: pd.DataFrame, lengths: Sequence[int], source: str = "close") -> np.ndarray:
+    return K.ema_batch(ensure_column(df, source).to_numpy(dtype=float), lengths)
+
+
+def sma_batch(df: pd.DataFrame, lengths: Sequence[int], source: str = "close") -> np.ndarray:
+    return K.sma_batch(ensure_column(df, source).to_numpy(dtype=float), lengths)
+
+
+def rsi_batch(df: pd.DataFrame, lengths: Sequence[int], source: str = "close") -> np.ndarray:
+    return K.rsi_batch(ensure_column(df, source).to_numpy(dtype=float), lengths)
+
+
+def bollinger_bands_batch(
+    df: pd.DataFrame, lengths: Sequence[int], std: float = 2.0, source: str = "close"
+) -> Dict[str, np.ndarray]:
+    return K.bbands_batch(ensure_column(df, source).to_numpy(dtype=float), lengths, std=std)
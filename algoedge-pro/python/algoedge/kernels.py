@@ -0,0 +1,202 @@
+from __future__ import annotations
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+# Rows per block. Fixed (not derived from the batch) so each column's result does not depend on
+# which other lengths it was batched with; 256 keeps decay**-256 finite for decay >= 1/3.
+_BLOCK = 256
+
+
+def _lengths(lengths: Sequence[int]) -> np.ndarray:
+    arr = np.asarray(lengths, dtype=np.int64).reshape(-1)
+    if arr.size and arr.min() < 1:
+        raise ValueError("indicator lengths must be >= 1")
+    return arr
+
+
+def _scan(
+    n: int,
+    decay: np.ndarray,
+    block_input: Callable[[int, int], np.ndarray],
+    block_output: Callable[[int, int, np.ndarray], None],
+) -> None:
+    """Solve y[t] = decay * y[t-1] + b[t] (y[-1] = 0) column-wise, one block of rows at a time.
+
+    Inside a block the recursion is a scaled cumsum, y = decay**i * cumsum(b * decay**-i), and the
+    block end is carried into the next block. ``block_input(lo, hi)`` builds b[lo:hi] and
+    ``block_output(lo, hi, y)`` consumes y[lo:hi], so no (bars x columns) temporary is materialized.
+    """
+    k = len(decay)
+    flat = decay == 0.0
+    d = np.where(flat, 1.0, decay)
+    m = min(n, _BLOCK)
+    i = np.arange(m, dtype=float)
+    # Powers are taken one column at a time: vectorized pow may round differently with array shape,
+    # which would make a column's values depend on the rest of the batch
+    grow = np.empty((m, k))
+    shrink = np.empty((m, k))
+    for j in range(k):
+        grow[:, j] = d[j] ** -i
+        shrink[:, j] = d[j] ** i
+    grow[:, flat] = 1.0
+    shrink[:, flat] = 1.0
+    carry = shrink * d
+    carry[:, flat] = 0.0
+    end = np.zeros(k)
+    for lo in range(0, n, m):
+        hi = min(n, lo + m)
+        w = hi - lo
+        b = block_input(lo, hi)
+        # decay == 0 columns are y = b; the cumsum is undone for them below
+        y = np.cumsum(b * grow[:w], axis=0) if not flat.any() else _flat_aware_cumsum(b * grow[:w], flat)
+        y *= shrink[:w]
+        y += carry[:w] * end
+        end = y[-1].copy()
+        block_output(lo, hi, y)
+
+
+def _flat_aware_cumsum(b: np.ndarray, flat: np.ndarray) -> np.ndarray:
+    y = np.cumsum(b, axis=0)
+    y[:, flat] = b[:, flat]
+    return y
+
+
+def _window_sums(v: np.ndarray, lengths: np.ndarray, out: np.ndarray) -> np.ndarray:
+    # Trailing-window sums of v for every length, block by block from one prefix sum
+    n = len(v)
+    cs = np.concatenate([[0.0], np.cumsum(v)])
+    for lo in range(0, n, _BLOCK):
+        hi = min(n, lo + _BLOCK)
+        t = np.arange(lo, hi)[:, None]
+        out[lo:hi] = cs[t + 1] - cs[np.maximum(t + 1 - lengths[None, :], 0)]
+    return out
+
+
+def _window_var(x: np.ndarray, mean: np.ndarray, length: int) -> np.ndarray:
+    # Two-pass population variance over sliding windows, a chunk of rows at a time
+    out = np.full(len(x), np.nan)
+    if len(x) < length:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, length)
+    step = max(1, (1 << 20) // length)
+    for lo in range(0, len(windows), step):
+        chunk = windows[lo : lo + step] - mean[length - 1 + lo : length - 1 + lo + step, None]
+        out[length - 1 + lo : length - 1 + lo + len(chunk)] = np.einsum("ij,ij->i", chunk, chunk) / length
+    return out
+
+
+def sma_batch(x: np.ndarray, lengths: Sequence[int]) -> np.ndarray:
+    """Rolling means for every length from one cumulative sum; NaN until a full window is available."""
+    x = np.asarray(x, dtype=float)
+    lengths = _lengths(lengths)
+    n = len(x)
+    out = np.empty((n, len(lengths)))
+    if n == 0:
+        return out
+    # Offset by the first value to keep the running sum small
+    base = x[0]
+    _window_sums(x - base, lengths, out)
+    out /= lengths
+    out += base
+    for j, length in enumerate(lengths):
+        out[: length - 1, j] = np.nan
+    return out
+
+
+def ema_batch(x: np.ndarray, lengths: Sequence[int]) -> np.ndarray:
+    """pandas_ta-style EMA (SMA seed at bar length-1, then adjust=False recursion) for many lengths."""
+    x = np.asarray(x, dtype=float)
+    lengths = _lengths(lengths)
+    n = len(x)
+    k = len(lengths)
+    out = np.empty((n, k))
+    if n == 0:
+        return out
+    alpha = 2.0 / (lengths + 1.0)
+    start = lengths - 1
+    cs = np.cumsum(x)
+    seed = np.where(lengths <= n, cs[np.minimum(start, n - 1)] / lengths, np.nan)
+
+    last_start = int(start.max())
+
+    # Masking is only needed in the warm-up blocks; later blocks take the plain path
+    def block_input(lo: int, hi: int) -> np.ndarray:
+        if lo > last_start:
+            return alpha * x[lo:hi, None]
+        t = np.arange(lo, hi)[:, None]
+        b = np.where(t > start, alpha * x[lo:hi, None], 0.0)
+        return np.where(t == start, seed, b)
+
+    def block_output(lo: int, hi: int, y: np.ndarray) -> None:
+        if lo >= last_start:
+            out[lo:hi] = y
+            return
+        t = np.arange(lo, hi)[:, None]
+        out[lo:hi] = np.where(t < start, np.nan, y)
+
+    _scan(n, 1.0 - alpha, block_input, block_output)
+    out[:, lengths > n] = np.nan
+    return out
+
+
+def rsi_batch(x: np.ndarray, lengths: Sequence[int]) -> np.ndarray:
+    """Wilder RSI (adjusted EWM with alpha=1/length on gains and losses) for many lengths."""
+    x = np.asarray(x, dtype=float)
+    lengths = _lengths(lengths)
+    n = len(x)
+    k = len(lengths)
+    out = np.empty((n, k))
+    if n == 0:
+        return out
+    diff = np.zeros(n)
+    diff[1:] = np.diff(x)
+    gains = np.maximum(diff, 0.0)
+    losses = np.minimum(diff, 0.0)
+    decay = 1.0 - 1.0 / lengths
+    warmup = int(lengths.max()) if k else 0
+
+    # Gains, losses and the EWM normalizer scan together as 3k columns
+    def block_input(lo: int, hi: int) -> np.ndarray:
+        w = hi - lo
+        b = np.empty((w, 3 * k))
+        b[:, :k] = gains[lo:hi, None]
+        b[:, k : 2 * k] = losses[lo:hi, None]
+        b[:, 2 * k :] = 1.0
+        if lo == 0:
+            # The first bar has no change; it carries no weight in the averages
+            b[0] = 0.0
+        return b
+
+    def block_output(lo: int, hi: int, y: np.ndarray) -> None:
+        norm = y[:, 2 * k :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_gain = y[:, :k] / norm
+            avg_loss = y[:, k : 2 * k] / norm
+            rsi = 100.0 * avg_gain / (avg_gain + np.abs(avg_loss))
+        if lo >= warmup:
+            out[lo:hi] = rsi
+            return
+        t = np.arange(lo, hi)[:, None]
+        out[lo:hi] = np.where(t < lengths, np.nan, rsi)
+
+    _scan(n, np.concatenate([decay, decay, decay]), block_input, block_output)
+    return out
+
+
+def bbands_batch(x: np.ndarray, lengths: Sequence[int], std: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger bands (population std) for many lengths; keys follow pandas_ta column prefixes."""
+    x = np.asarray(x, dtype=float)
+    lengths = _lengths(lengths)
+    mid = sma_batch(x, lengths)
+    dev = np.empty_like(mid)
+    for j, length in enumerate(lengths):
+        dev[:, j] = _window_var(x, mid[:, j], int(length))
+    np.sqrt(dev, out=dev)
+    lower = mid - std * dev
+    upper = mid + std * dev
+    width = upper - lower
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bandwidth = 100.0 * width / mid
+        percent = (x[:, None] - lower) / width
+    return {"BBL": lower, "BBM": mid, "BBU": upper, "BBB": bandwidth, "BBP": percent}
@@ -0,0 +1,531 @@
+from __future__ import annotations
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import metrics as M
+from .backtester import (
+    BacktestResult,
+    _build_trades,
+    _close,
+    _equity_curve,
+    _evaluate_logic_array,
+    _EXIT_REASONS,
+    _exit_fill,
+    _levels,
+    _lot_book,
+    _sides,
+    _summarize,
+)
+from .strategy_dsl import StrategyPlan, compile_strategy
+
+"""
+Incremental strategy runtime.
+
+Every indicator keeps O(1) state per bar and reproduces the pandas / pandas_ta arithmetic operation
+for operation (EWM weights, Kahan-compensated rolling sums, Welford rolling variance), so a strategy
+fed bar by bar emits the same signals ``run_backtest`` finds over the full history.
+"""
+
+_NAN = float("nan")
+_OHLCV = ("open", "high", "low", "close", "volume")
+_DIRECTIONS = {1: "long", -1: "short"}
+
+
+def _div(a: float, b: float) -> float:
+    # numpy division semantics (x/0 -> +-inf, 0/0 -> nan) without raising
+    if b == 0:
+        if a != a or a == 0:
+            return _NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _EWM:
+    """pandas ``Series.ewm(com=...).mean()`` one observation at a time."""
+
+    def __init__(self, com: float, adjust: bool, min_periods: int = 0):
+        alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = min_periods
+        self.weighted = _NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    def update(self, cur: float) -> float:
+        is_observation = cur == cur
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    if self.weighted != cur:
+                        self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                        self.weighted /= self.old_wt + self.new_wt
+                    self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+            elif is_observation:
+                self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else _NAN
+
+
+class _EMA:
+    """pandas_ta EMA: SMA of the first ``length`` values as seed, then ``ewm(span=length, adjust=False)``."""
+
+    def __init__(self, length: int):
+        self.length = int(length) if length and length > 0 else 10
+        self.ewm = _EWM(com=(self.length - 1) / 2.0, adjust=False)
+        self.head: List[float] = []
+
+    def update(self, x: float) -> float:
+        if len(self.head) < self.length:
+            self.head.append(x)
+            if len(self.head) < self.length:
+                return self.ewm.update(_NAN)
+            # Same reduction pandas_ta uses for the seed (Series.mean skips NaN)
+            x = float(pd.Series(self.head, dtype=float).mean())
+            self.head = [_NAN] * self.length
+        return self.ewm.update(x)
+
+
+class _RollingMean:
+    """pandas ``rolling(length).mean()``: Kahan-compensated running sum over a fixed window."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window: Deque[float] = deque()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev_value = _NAN
+
+    def _add(self, val: float) -> None:
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            self.same = self.same + 1 if val == self.prev_value else 1
+            self.prev_value = val
+
+    def _remove(self, val: float) -> None:
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, x: float) -> float:
+        if not self.window or self.length <= 1:
+            # pandas re-seeds when the new window does not overlap the previous one
+            self.window.clear()
+            self._reset()
+            self.prev_value = x
+            self.same = 0
+        elif len(self.window) == self.length:
+            self._remove(self.window.popleft())
+        self.window.append(x)
+        self._add(x)
+        if self.nobs < self.length or self.nobs == 0:
+            return _NAN
+        if self.same >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _RollingVar:
+    """pandas ``rolling(length).var(ddof)``: Welford updates with Kahan compensation."""
+
+    def __init__(self, length: int, ddof: int = 0):
+        self.length = length
+        self.ddof = ddof
+        self.window: Deque[float] = deque()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev_value = _NAN
+
+    def _add(self, val: float) -> None:
+        if val != val:
+            return
+        self.same = self.same + 1 if val == self.prev_value else 1
+        self.prev_value = val
+        self.nobs += 1
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        self.mean_x = self.mean_x + t / self.nobs if self.nobs else 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val: float) -> None:
+        if val != val:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.comp_remove
+            y = val - self.comp_remove
+            t = y - self.mean_x
+            self.comp_remove = t + self.mean_x - y
+            self.mean_x = self.mean_x - t / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def update(self, x: float) -> float:
+        if not self.window or self.length <= 1:
+            self.window.clear()
+            self._reset()
+            self.prev_value = x
+        elif len(self.window) == self.length:
+            self._remove(self.window.popleft())
+        self.window.append(x)
+        self._add(x)
+        if self.nobs < self.length or self.nobs <= self.ddof:
+            return _NAN
+        if self.nobs == 1 or self.same >= self.nobs:
+            return 0.0
+        return self.ssqdm_x / (self.nobs - self.ddof)
+
+
+class _Indicator:
+    """One DSL indicator block; ``update`` returns the operand columns it contributes for this bar."""
+
+    def __init__(self, key: str, source: str = "close"):
+        self.key = key
+        self.source = source
+
+    def value(self, bar: Mapping[str, float]) -> float:
+        if self.source in bar:
+            return float(bar[self.source])
+        # Same fallback as indicators.ensure_column: first available column
+        return float(next(iter(bar.values()))) if bar else _NAN
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        raise NotImplementedError
+
+
+class _EMAIndicator(_Indicator):
+    def __init__(self, key: str, length: int = 20, source: str = "close"):
+        super().__init__(key, source)
+        self.ema = _EMA(length)
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        return {self.key: self.ema.update(self.value(bar))}
+
+
+class _SMAIndicator(_Indicator):
+    def __init__(self, key: str, length: int = 20, source: str = "close"):
+        super().__init__(key, source)
+        length = int(length) if length and length > 0 else 10
+        self.mean = _RollingMean(length)
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        return {self.key: self.mean.update(self.value(bar))}
+
+
+class _RSIIndicator(_Indicator):
+    def __init__(self, key: str, length: int = 14, source: str = "close"):
+        super().__init__(key, source)
+        length = int(length) if length and length > 0 else 14
+        alpha = 1.0 / length
+        # rma() passes alpha; pandas turns it into a center of mass before computing weights
+        self.gains = _EWM(com=1.0 / alpha - 1.0, adjust=True, min_periods=length)
+        self.losses = _EWM(com=1.0 / alpha - 1.0, adjust=True, min_periods=length)
+        self.prev = _NAN
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        x = self.value(bar)
+        diff = x - self.prev
+        self.prev = x
+        positive = 0.0 if diff < 0 else diff
+        negative = 0.0 if diff > 0 else diff
+        avg_gain = self.gains.update(positive)
+        avg_loss = self.losses.update(negative)
+        return {self.key: _div(100 * avg_gain, avg_gain + abs(avg_loss))}
+
+
+class _MACDIndicator(_Indicator):
+    def __init__(self, key: str, fast: int = 12, slow: int = 26, signal: int = 9, source: str = "close"):
+        super().__init__(key, source)
+        fast = int(fast) if fast and fast > 0 else 12
+        slow = int(slow) if slow and slow > 0 else 26
+        signal = int(signal) if signal and signal > 0 else 9
+        if slow < fast:
+            fast, slow = slow, fast
+        self.fast, self.slow, self.signal = _EMA(fast), _EMA(slow), _EMA(signal)
+        suffix = f"{fast}_{slow}_{signal}"
+        self.columns = (f"{key}_MACD_{suffix}", f"{key}_MACDh_{suffix}", f"{key}_MACDs_{suffix}")
+        self.seen_valid = False
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        x = self.value(bar)
+        macd = self.fast.update(x) - self.slow.update(x)
+        # The signal EMA starts at MACD's first valid value, like pandas_ta's first_valid_index slice
+        self.seen_valid = self.seen_valid or macd == macd
+        signal = self.signal.update(macd) if self.seen_valid else _NAN
+        return dict(zip(self.columns, (macd, macd - signal, signal)))
+
+
+class _BBandsIndicator(_Indicator):
+    def __init__(self, key: str, length: int = 20, std: float = 2.0, source: str = "close"):
+        super().__init__(key, source)
+        length = int(length) if length and length > 0 else 5
+        self.std = float(std) if std and std > 0 else 2.0
+        self.mean = _RollingMean(length)
+        self.var = _RollingVar(length, ddof=0)
+        self.columns = tuple(f"{key}_{p}_{length}_{self.std}" for p in ("BBL", "BBM", "BBU", "BBB", "BBP"))
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        x = self.value(bar)
+        var = self.var.update(x)
+        dev = self.std * (math.sqrt(var) if var >= 0 else _NAN)
+        mid = self.mean.update(x)
+        lower = mid - dev
+        upper = mid + dev
+        width = upper - lower
+        return dict(zip(self.columns, (lower, mid, upper, _div(100 * width, mid), _div(x - lower, width))))
+
+
+class _KahanSum:
+    # Compensated running sum, as used by pandas' groupby cumsum
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, val: float) -> float:
+        if val == val:
+            y = val - self.compensation
+            t = self.total + y
+            self.compensation = t - self.total - y
+            self.total = t
+        return self.total
+
+
+class _VWAPIndicator(_Indicator):
+    def __init__(self, key: str, anchor: str = "D"):
+        super().__init__(key)
+        self.anchor = anchor
+        self.period_ns = (0, 0)
+        self.wp = _KahanSum()
+        self.volume = _KahanSum()
+
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        if not {"high", "low", "close", "volume"}.issubset(bar.keys()):
+            return {self.key: _NAN}
+        # Cumulative sums restart every anchor period (calendar day by default), as in pandas_ta
+        ts = pd.Timestamp(ts)
+        # Wall-clock periods, like DatetimeIndex.to_period on a tz-aware index (minus the warning)
+        wall = ts.tz_localize(None) if ts.tz is not None else ts
+        start, end = self.period_ns
+        if not start <= wall.value < end:
+            period = wall.to_period(self.anchor)
+            self.period_ns = (period.start_time.value, (period + 1).start_time.value)
+            self.wp, self.volume = _KahanSum(), _KahanSum()
+        typical = (bar["high"] + bar["low"] + bar["close"]) / 3
+        return {self.key: _div(self.wp.add(typical * bar["volume"]), self.volume.add(bar["volume"]))}
+
+
+_LIVE_INDICATORS = {
+    "EMA": _EMAIndicator,
+    "SMA": _SMAIndicator,
+    "RSI": _RSIIndicator,
+    "MACD": _MACDIndicator,
+    "BBANDS": _BBandsIndicator,
+    "VWAP": _VWAPIndicator,
+}
+
+
+@dataclass
+class Signal:
+    time: Any
+    side: str  # entry | exit
+    price: float  # fill price before slippage: the close, or the stop / target level (open on a gap)
+    reason: str  # signal | stop_loss | take_profit | close
+    direction: str = "long"  # long | short
+    lot: int = 0  # pairs an exit with its entry when several lots are open
+
+
+class LiveStrategy:
+    """Runs a DSL strategy one bar at a time with the position rules of ``run_backtest``.
+
+    ``on_bar`` takes a timestamp and a mapping with open/high/low/close/volume, updates every
+    indicator in O(1) and returns the signals fired on that bar: exits of open lots first, then
+    entries (longs before shorts).
+    """
+
+    def __init__(self, strategy: Dict[str, Any] | StrategyPlan):
+        self.plan = compile_strategy(strategy)
+        self.sl_pct = self.plan.stop_loss_pct
+        self.tp_pct = self.plan.take_profit_pct
+        self.indicators: List[_Indicator] = []
+        for spec in self.plan.indicators:
+            if spec.name not in _LIVE_INDICATORS:
+                # Unknown indicators are empty columns in the backtester too
+                self.indicators.append(_Constant(spec.key))
+                continue
+            self.indicators.append(_LIVE_INDICATORS[spec.name](spec.key, **dict(spec.params)))
+        self.prev: Dict[str, float] = {}
+        self._sides = _sides(self.plan)
+        self.lots: Dict[int, Tuple[int, float]] = {}  # open lot -> (side, entry price)
+        self._next_lot = 0
+        self.last: Optional[Tuple[Any, float]] = None
+
+    def _columns(self, bar: Mapping[str, Any], ts: Any) -> Dict[str, float]:
+        raw = {k: float(v) for k, v in bar.items() if isinstance(v, (int, float, np.number))}
+        # Operands are the OHLCV fields plus indicator outputs, as in the backtester's calc frame
+        current: Dict[str, float] = {k: raw[k] for k in _OHLCV if k in raw}
+        for ind in self.indicators:
+            current.update(ind.update(raw, ts))
+        return current
+
+    def on_bar(self, ts: Any, bar: Mapping[str, Any]) -> List[Signal]:
+        current = self._columns(bar, ts)
+        # Cross operators compare against the previous bar, like the backtester's shift(1) columns
+        columns = {k: np.float64(v) for k, v in current.items()}
+        for k in current:
+            columns[f"{k}_prev"] = np.float64(self.prev.get(k, _NAN))
+        self.prev = current
+
+        price = current.get("close", _NAN)
+        if price != price:
+            return []
+        self.last = (ts, price)
+        signals: List[Signal] = []
+        closed = set()
+        if self.lots:
+            exit_now = {
+                side: bool(_evaluate_logic_array(logic, columns, ()))
+                for side, _, logic in self._sides
+                if logic is not None and any(s == side for s, _ in self.lots.values())
+            }
+            if self.plan.stop_fill == "intrabar" and "high" in current and "low" in current:
+                bar = (current.get("open", _NAN), current["high"], current["low"])
+            else:
+                bar = (price, price, price)
+            for lot, (side, entry_price) in list(self.lots.items()):
+                stop, target = _levels(entry_price, side, self.sl_pct, self.tp_pct)
+                fill = _exit_fill(*bar, price, stop, target, exit_now.get(side, False), side)
+                if fill is not None:
+                    del self.lots[lot]
+                    closed.add(side)
+                    signals.append(Signal(ts, "exit", *fill, _DIRECTIONS[side], lot))
+
+        for side, logic, _ in self._sides:
+            if logic is None or side in closed:
+                continue
+            if self.lots:
+                mine = sum(s == side for s, _ in self.lots.values())
+                if mine < len(self.lots) or mine >= self.plan.max_positions:
+                    continue
+            if bool(_evaluate_logic_array(logic, columns, ())):
+                self.lots[self._next_lot] = (side, price)
+                signals.append(Signal(ts, "entry", price, "signal", _DIRECTIONS[side], self._next_lot))
+                self._next_lot += 1
+        return signals
+
+    @property
+    def position_open(self) -> bool:
+        return bool(self.lots)
+
+    @property
+    def position(self) -> int:
+        """Signed number of open lots: positive long, negative short."""
+        return sum(side for side, _ in self.lots.values())
+
+    def reset_positions(self) -> None:
+        """Forget open lots without signalling (e.g. after warm-up bars)."""
+        self.lots.clear()
+
+    def close(self, ts: Any, price: float) -> List[Signal]:
+        """Flatten every open lot (end of session / replay)."""
+        signals = [Signal(ts, "exit", float(price), "close", _DIRECTIONS[side], lot) for lot, (side, _) in self.lots.items()]
+        self.lots.clear()
+        return signals
+
+
+class _Constant(_Indicator):
+    def update(self, bar: Mapping[str, float], ts: Any) -> Dict[str, float]:
+        return {self.key: _NAN}
+
+
+def replay(
+    strategy: Dict[str, Any] | StrategyPlan,
+    ohlcv: pd.DataFrame,
+    initial_cash: float = 10_000.0,
+    timeframe: str = "1h",
+    market: str = "crypto",
+    periods_per_year: Optional[float] = None,
+) -> Tuple[List[Signal], BacktestResult]:
+    """Feed historical bars through ``LiveStrategy`` and size the fills exactly like ``run_backtest``.
+
+    An open position is closed on the final bar, as the backtester does, and ratios are annualized the
+    same way (``periods_per_year``, else the bar density of ``ohlcv``, else ``timeframe`` / ``market``), so
+    the returned ``BacktestResult`` can be compared field for field with ``run_backtest`` on the same bars.
+    """
+    live = LiveStrategy(strategy)
+    columns = [c for c in ohlcv.columns]
+    signals: List[Signal] = []
+    bars: List[int] = []
+    for b, (ts, row) in enumerate(zip(ohlcv.index, ohlcv.itertuples(index=False, name=None))):
+        fired = live.on_bar(ts, dict(zip(columns, row)))
+        signals.extend(fired)
+        bars.extend([b] * len(fired))
+    if len(ohlcv):
+        fired = live.close(ohlcv.index[-1], float(ohlcv["close"].iloc[-1]))
+        signals.extend(fired)
+        bars.extend([len(ohlcv) - 1] * len(fired))
+
+    # Lot ids count up from 0 in entry order, so they index the book directly
+    lots = _lot_book(live._next_lot)
+    for b, s in zip(bars, signals):
+        lot = lots[s.lot : s.lot + 1]
+        if s.side == "entry":
+            lot["side"], lot["entry"], lot["entry_price"] = 1 if s.direction == "long" else -1, b, s.price
+        else:
+            lot["exit"], lot["exit_price"], lot["reason"] = b, s.price, _EXIT_REASONS.index(s.reason)
+    trades = _build_trades(lots, ohlcv.index, initial_cash, live.plan)
+    equity = _equity_curve(trades, ohlcv.index, _close(ohlcv), initial_cash)
+    ppy = periods_per_year or M.infer_periods_per_year(ohlcv.index, M.periods_per_year(timeframe, market))
+    return signals, _summarize(trades, equity, initial_cash, ppy)
+
+
+def stream(strategy: Dict[str, Any] | StrategyPlan, bars: Iterable[Tuple[Any, Mapping[str, Any]]]) -> Iterable[Signal]:
+    """Generator form: yields signals as (timestamp, bar) pairs arrive."""
+    live = LiveStrategy(strategy)
+    for ts, bar in bars:
+        yield from live.on_bar(ts, bar)
@@ -1,7 +1,142 @@
 from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+
 import numpy as np
 import pandas as pd
 
+from .data import TIMEFRAME_TO_MIN
+
+# Bumped whenever metric definitions change, so stored results are recomputed
+METRICS_VERSION = 3
+
+# Column order of batch_metrics
+BATCH_METRICS = ("win_rate", "profit_factor", "max_drawdown", "sharpe_ratio", "sortino_ratio", "calmar_ratio")
+
+# Trading days per year and session hours per trading day
+_SESSIONS = {"crypto": (365, 24.0), "stocks": (252, 6.5), "forex": (260, 24.0)}
+
+
+def periods_per_year(timeframe: str, market: str = "crypto") -> float:
+    """Bars per year for ``timeframe`` bars, counting only the market's trading sessions."""
+    days, hours = _SESSIONS.get(market, _SESSIONS["crypto"])
+    minutes = TIMEFRAME_TO_MIN.get(timeframe, 60)
+    if minutes >= 1440:
+        return days * 1440 / minutes
+    return days * hours * 60 / minutes
+
+
+def infer_periods_per_year(index: pd.Index, default: float = 252.0) -> float:
+    """Bars per year observed in a timestamp index, so closed sessions and weekends are accounted for."""
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return default
+    years = (index[-1] - index[0]) / pd.Timedelta(days=365)
+    return (len(index) - 1) / years if years > 0 else default
+
+
+def trade_positions(
+    n_bars: int,
+    entry_bar: Sequence[int],
+    exit_bar: Sequence[int],
+    qty: Sequence[float],
+    entry_price: Sequence[float],
+    exit_price: Sequence[float],
+    entry_fee: Optional[Sequence[float]] = None,
+    exit_fee: Optional[Sequence[float]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Units held at the end of each bar and the cash each bar's fills (and their fees) move, from a list of trades.
+
+    ``qty`` is signed (negative for shorts), so the position vector is too.
+    """
+    entry_bar = np.asarray(entry_bar, dtype=np.int64)
+    exit_bar = np.asarray(exit_bar, dtype=np.int64)
+    qty = np.asarray(qty, dtype=float)
+    delta = np.zeros(n_bars + 1)
+    np.add.at(delta, entry_bar, qty)
+    np.add.at(delta, exit_bar, -qty)
+    cash_flow = np.zeros(n_bars)
+    np.add.at(cash_flow, entry_bar, -qty * np.asarray(entry_price, dtype=float))
+    np.add.at(cash_flow, exit_bar, qty * np.asarray(exit_price, dtype=float))
+    if entry_fee is not None:
+        np.add.at(cash_flow, entry_bar, -np.asarray(entry_fee, dtype=float))
+    if exit_fee is not None:
+        np.add.at(cash_flow, exit_bar, -np.asarray(exit_fee, dtype=float))
+    return np.cumsum(delta[:-1]), cash_flow
+
+
+def mark_to_market(
+    close: np.ndarray,
+    position: np.ndarray,
+    initial_cash: float,
+    cash_flow: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Equity at every bar: cash plus the open position valued at the close.
+
+    Without ``cash_flow`` position changes are filled at the close. Works column-wise on
+    (bars x curves) arrays; ``close`` may be NaN wherever the position is flat.
+    """
+    close = np.asarray(close, dtype=float)
+    position = np.asarray(position, dtype=float)
+    if cash_flow is None:
+        traded = np.diff(position, axis=0, prepend=np.zeros_like(position[:1]))
+        cash_flow = -np.where(traded != 0, traded * close, 0.0)
+    held = np.where(position != 0, position * close, 0.0)
+    return initial_cash + np.cumsum(cash_flow, axis=0) + held
+
+
+def _total(values: np.ndarray) -> np.ndarray:
+    return np.cumsum(values, axis=1)[:, -1] if values.shape[1] else np.zeros(len(values))
+
+
+def batch_metrics(
+    equity: np.ndarray,
+    pnl: Optional[np.ndarray] = None,
+    periods_per_year: float = 252.0,
+    risk_free_rate: float = 0.0,
+) -> np.ndarray:
+    """Metrics for many equity curves at once.
+
+    ``equity`` is (bars x curves) and ``pnl`` the matching per-trade P&L, (trades x curves) padded
+    with NaN. Returns (curves x len(BATCH_METRICS)); win rate and profit factor are NaN without ``pnl``.
+    """
+    equity = np.asarray(equity, dtype=float)
+    if equity.ndim == 1:
+        equity = equity[:, None]
+    # One contiguous row per curve, so every reduction runs in the same order as for a single curve
+    eq = np.ascontiguousarray(equity.T)
+    out = np.full((eq.shape[0], len(BATCH_METRICS)), np.nan)
+
+    if pnl is not None:
+        trades = np.ascontiguousarray(np.asarray(pnl, dtype=float).reshape(-1, eq.shape[0]).T)
+        counts = np.count_nonzero(~np.isnan(trades), axis=1)
+        # Sequential sums, so NaN padding (added as zeros) cannot change a curve's result
+        gains = _total(np.where(trades > 0, trades, 0.0))
+        losses = -_total(np.where(trades < 0, trades, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:, 0] = np.where(counts > 0, (trades > 0).sum(axis=1) / counts, 0.0)
+            out[:, 1] = np.where(losses > 0, gains / losses, np.where(gains > 0, np.inf, 0.0))
+
+    n = eq.shape[1]
+    if n == 0:
+        out[:, 2:] = 0.0
+        return out
+    peak = np.maximum.accumulate(eq, axis=1)
+    drawdown = ((eq - peak) / peak).min(axis=1)
+    out[:, 2] = drawdown
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        excess = eq[:, 1:] / eq[:, :-1] - 1 - risk_free_rate / periods_per_year
+        mean = excess.mean(axis=1) if n > 1 else np.zeros(len(eq))
+        std = excess.std(axis=1, ddof=1) if n > 2 else np.zeros(len(eq))
+        downside = np.sqrt((np.minimum(excess, 0.0) ** 2).mean(axis=1)) if n > 1 else np.zeros(len(eq))
+        root = np.sqrt(periods_per_year)
+        out[:, 3] = np.where(std > 0, root * mean / std, 0.0)
+        out[:, 4] = np.where(downside > 0, root * mean / downside, np.where(mean > 0, np.inf, 0.0))
+
+        growth = np.maximum(eq[:, -1] / eq[:, 0], 0.0)
+        cagr = growth ** (periods_per_year / max(n - 1, 1)) - 1
+        out[:, 5] = np.where(drawdown < 0, cagr / -drawdown, np.where(cagr > 0, np.inf, 0.0))
+    return out
+
 
 def compute_returns(equity_curve: pd.Series) -> pd.Series:
     return equity_curve.pct_change().fillna(0.0)
@@ -21,16 +156,22 @@ def profit_factor(trades: pd.DataFrame) -> float:
     return float(gains / losses)
 
 
+def _single(equity_curve: pd.Series, column: str, periods_per_year: float, risk_free_rate: float = 0.0) -> float:
+    values = batch_metrics(equity_curve.to_numpy(dtype=float), None, periods_per_year, risk_free_rate)
+    return float(values[0, BATCH_METRICS.index(column)])
+
+
 def max_drawdown(equity_curve: pd.Series) -> float:
-    cumulative_max = equity_curve.cummax()
-    drawdown = (equity_curve - cumulative_max) / cumulative_max
-    return float(drawdown.min())
+    return _single(equity_curve, "max_drawdown", 252.0)
 
 
-def sharpe_ratio(equity_curve: pd.Series, risk_free_rate: float = 0.0, periods_per_year: int = 252) -> float:
-    rets = compute_returns(equity_curve)
-    excess = rets - risk_free_rate / periods_per_year
-    std = excess.std()
-    if std == 0:
-        return 0.0
-    return float(np.sqrt(periods_per_year) * excess.mean() / std)
\ No newline at end of file
+def sharpe_ratio(equity_curve: pd.Series, risk_free_rate: float = 0.0, periods_per_year: float = 252.0) -> float:
+    return _single(equity_curve, "sharpe_ratio", periods_per_year, risk_free_rate)
+
+
+def sortino_ratio(equity_curve: pd.Series, risk_free_rate: float = 0.0, periods_per_year: float = 252.0) -> float:
+    return _single(equity_curve, "sortino_ratio", periods_per_year, risk_free_rate)
+
+
+def calmar_ratio(equity_curve: pd.Series, periods_per_year: float = 252.0) -> float:
+    return _single(equity_curve, "calmar_ratio", periods_per_year)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+
+from . import kernels as K
+
+"""
+Array-native indicators: contiguous float64 in, float64 out, no pandas or pandas_ta.
+
+The loops follow the pandas recurrences pandas_ta relies on (EWM weights, Kahan-compensated rolling
+sums, Welford rolling variance), so values agree with pandas_ta to float tolerance. With numba
+installed they are compiled; without it, gap-free inputs take the NumPy kernels and only sources
+containing NaN run the loops uncompiled.
+"""
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+
+def _jit(fn):
+    return numba.njit(cache=True, nogil=True)(fn) if numba is not None else fn
+
+
+def _as_array(x: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def _length(length: int, default: int) -> int:
+    # pandas_ta's coercion of missing / non-positive lengths
+    return int(length) if length and length > 0 else default
+
+
+def _use_loops(*arrays: np.ndarray) -> bool:
+    return HAVE_NUMBA or any(np.isnan(a).any() for a in arrays)
+
+
+@_jit
+def _ewm(x, com, adjust, min_periods, out):
+    # pandas ewm(...).mean() with ignore_na=False
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    n = len(x)
+    if n == 0:
+        return
+    weighted = x[0]
+    nobs = 1 if x[0] == x[0] else 0
+    old_wt = 1.0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    for i in range(1, n):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+                old_wt = old_wt + new_wt if adjust else 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+
+
+@_jit
+def _ema_loop(x, length, out):
+    n = len(x)
+    seeded = np.full(n, np.nan)
+    if n >= length:
+        # SMA seed over the first window, NaN-skipping like Series.mean
+        total = 0.0
+        count = 0
+        for i in range(length):
+            if x[i] == x[i]:
+                total += x[i]
+                count += 1
+        seeded[length - 1] = total / count if count else np.nan
+        seeded[length:] = x[length:]
+    _ewm(seeded, (length - 1) / 2.0, False, 0, out)
+
+
+@_jit
+def _rolling_mean_loop(x, length, out):
+    # Kahan-compensated running sum; the outgoing value is removed before the new one is added
+    nobs = 0
+    total = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    for i in range(len(x)):
+        if i >= length:
+            old = x[i - length]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                t = total + y
+                comp_remove = t - total - y
+                total = t
+        val = x[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = total + y
+            comp_add = t - total - y
+            total = t
+        out[i] = total / nobs if nobs >= length else np.nan
+
+
+@_jit
+def _rolling_var_loop(x, length, out):
+    # Population variance (ddof=0): Kahan-compensated Welford steps in pandas' roll_var order
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    for i in range(len(x)):
+        if i >= length:
+            old = x[i - length]
+            if old == old:
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean - comp_remove
+                    y = old - comp_remove
+                    t = y - mean
+                    comp_remove = t + mean - y
+                    mean = mean - t / nobs
+                    ssqdm -= (old - prev_mean) * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+        val = x[i]
+        if val == val:
+            nobs += 1
+            prev_mean = mean - comp_add
+            y = val - comp_add
+            t = y - mean
+            comp_add = t + mean - y
+            mean = mean + t / nobs
+            ssqdm += (val - prev_mean) * (val - mean)
+        if nobs < length:
+            out[i] = np.nan
+        else:
+            out[i] = max(ssqdm / nobs, 0.0) if nobs > 1 else 0.0
+
+
+@_jit
+def _vwap_loop(typical, volume, groups, out):
+    # Cumulative sums restart whenever the period id changes; NaN inputs yield NaN but keep the sums
+    wp_sum = 0.0
+    vol_sum = 0.0
+    for i in range(len(typical)):
+        if i == 0 or groups[i] != groups[i - 1]:
+            wp_sum = 0.0
+            vol_sum = 0.0
+        wp = typical[i] * volume[i]
+        if wp == wp:
+            wp_sum += wp
+        if volume[i] == volume[i]:
+            vol_sum += volume[i]
+        if wp != wp or volume[i] != volume[i]:
+            out[i] = np.nan
+        elif vol_sum == 0.0:
+            out[i] = np.nan if wp_sum == 0.0 else np.copysign(np.inf, wp_sum)
+        else:
+            out[i] = wp_sum / vol_sum
+
+
+def _window_sum(x: np.ndarray, length: int) -> np.ndarray:
+    # Trailing-window sums from prefix sums within length-sized blocks plus suffix sums of the block
+    # before, so partial sums never grow beyond one block (unlike a cumsum over the whole history)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < length:
+        return out
+    blocks = np.concatenate([x, np.zeros(-n % length)]).reshape(-1, length)
+    prefix = np.cumsum(blocks, axis=1).ravel()[:n]
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    t = np.arange(length - 1, n)
+    out[length - 1 :] = np.where(t % length == length - 1, prefix[t], suffix[t - length + 1] + prefix[t])
+    return out
+
+
+def ema(x: np.ndarray, length: int = 10) -> np.ndarray:
+    """pandas_ta EMA: SMA of the first ``length`` values as seed, then ``ewm(span=length, adjust=False)``."""
+    x = _as_array(x)
+    length = _length(length, 10)
+    if not _use_loops(x):
+        return K.ema_batch(x, [length])[:, 0]
+    out = np.empty(len(x))
+    _ema_loop(x, length, out)
+    return out
+
+
+def sma(x: np.ndarray, length: int = 10) -> np.ndarray:
+    x = _as_array(x)
+    length = _length(length, 10)
+    if not _use_loops(x):
+        return _window_sum(x, length) / length
+    out = np.empty(len(x))
+    _rolling_mean_loop(x, length, out)
+    return out
+
+
+def rsi(x: np.ndarray, length: int = 14) -> np.ndarray:
+    """Wilder RSI: adjusted EWM (alpha = 1/length) of gains and losses."""
+    x = _as_array(x)
+    length = _length(length, 14)
+    if not _use_loops(x):
+        return K.rsi_batch(x, [length])[:, 0]
+    diff = np.empty(len(x))
+    diff[:1] = np.nan
+    diff[1:] = np.diff(x)
+    gains = np.where(diff < 0, 0.0, diff)
+    losses = np.where(diff > 0, 0.0, diff)
+    avg_gain = np.empty(len(x))
+    avg_loss = np.empty(len(x))
+    com = length - 1.0
+    _ewm(gains, com, True, length, avg_gain)
+    _ewm(losses, com, True, length, avg_loss)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * avg_gain / (avg_gain + np.abs(avg_loss))
+
+
+def macd(x: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """MACD line, histogram and signal keyed by pandas_ta column prefix."""
+    x = _as_array(x)
+    fast, slow, signal = _length(fast, 12), _length(slow, 26), _length(signal, 9)
+    if slow < fast:
+        fast, slow = slow, fast
+    return macd_from_ema(ema(x, fast), ema(x, slow), signal)
+
+
+def macd_from_ema(fast_ma: np.ndarray, slow_ma: np.ndarray, signal: int = 9) -> Dict[str, np.ndarray]:
+    line = fast_ma - slow_ma
+    signal_ma = np.full(len(line), np.nan)
+    valid = np.flatnonzero(~np.isnan(line))
+    if len(valid):
+        # The signal EMA starts at the first valid MACD value, like pandas_ta's first_valid_index slice
+        signal_ma[valid[0]:] = ema(line[valid[0]:], _length(signal, 9))
+    return {"MACD": line, "MACDh": line - signal_ma, "MACDs": signal_ma}
+
+
+def bbands(x: np.ndarray, length: int = 5, std: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger bands (population std) keyed by pandas_ta column prefix."""
+    x = _as_array(x)
+    length = _length(length, 5)
+    std = float(std) if std and std > 0 else 2.0
+    mid = np.empty(len(x))
+    var = np.empty(len(x))
+    if _use_loops(x):
+        _rolling_mean_loop(x, length, mid)
+        _rolling_var_loop(x, length, var)
+    else:
+        mid = _window_sum(x, length) / length
+        var = K._window_var(x, mid, length)
+    dev = std * np.sqrt(var)
+    lower = mid - dev
+    upper = mid + dev
+    width = upper - lower
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"BBL": lower, "BBM": mid, "BBU": upper, "BBB": 100 * width / mid, "BBP": (x - lower) / width}
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Volume-weighted typical price, cumulated within runs of equal ``groups`` ids (anchor periods)."""
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3
+    volume = _as_array(volume)
+    groups = np.ascontiguousarray(groups, dtype=np.int64)
+    out = np.empty(len(typical))
+    if not len(out):
+        return out
+    if _use_loops(typical, volume):
+        _vwap_loop(typical, volume, groups, out)
+        return out
+    starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+    ends = np.append(starts[1:], len(out))
+    wp = typical * volume
+    cum_wp = np.empty(len(out))
+    cum_vol = np.empty(len(out))
+    # One cumsum per period keeps the sums period-sized rather than history-sized
+    for lo, hi in zip(starts, ends):
+        np.cumsum(wp[lo:hi], out=cum_wp[lo:hi])
+        np.cumsum(volume[lo:hi], out=cum_vol[lo:hi])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cum_wp / cum_vol
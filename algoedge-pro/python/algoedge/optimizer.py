@@ -1,24 +1,267 @@
 from __future__ import annotations
+import math
+import os
 import random
-from typing import Any, Dict, List, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from .backtester import run_backtest
+import pandas as pd
 
+from . import data as Data
+from . import shared
+from . import metrics as M
+from .backtester import BacktestResult, _summarize, prefetch_indicators, run_backtest, run_backtest_batch
+from .search import SEARCH_STRATEGIES, RandomSearch
 
-def _iter_param_candidates(param_spec: Dict[str, Any], num_samples: int = 20) -> List[Dict[str, Any]]:
-    candidates: List[Dict[str, Any]] = []
-    for _ in range(num_samples):
-        params = {}
-        for key, spec in param_spec.items():
-            if isinstance(spec, list):
-                params[key] = random.choice(spec)
-            elif isinstance(spec, dict) and {"min", "max"}.issubset(spec.keys()):
-                if spec.get("type") == "int":
-                    params[key] = random.randint(int(spec["min"]), int(spec["max"]))
-                else:
-                    params[key] = random.uniform(float(spec["min"]), float(spec["max"]))
-        candidates.append(params)
-    return candidates
+
+def _iter_param_candidates(
+    param_spec: Dict[str, Any],
+    num_samples: int = 20,
+    rng: Optional[random.Random] = None,
+) -> List[Dict[str, Any]]:
+    return RandomSearch(param_spec, rng).ask(num_samples)
+
+
+def _apply_params(strategy: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    trial = {**strategy}
+    trial_nodes = []
+    for n in strategy.get("blocks", []):
+        n2 = dict(n)
+        if n2.get("type") == "indicator" and n2.get("id") in params:
+            n2["params"] = {**n2.get("params", {}), **params[n2["id"]]}
+        trial_nodes.append(n2)
+    trial["blocks"] = trial_nodes
+    return trial
+
+
+# Per-process tail slices of the shared frame, so repeated windows keep their indicator cache entries
+_worker_windows: Dict[int, pd.DataFrame] = {}
+
+
+def _run_trial_in_worker(args: Tuple[Dict[str, Any], Optional[int], Dict[str, Any]]) -> Dict[str, float]:
+    trial, tail, kwargs = args
+    df = shared.worker_frame()
+    if tail is not None:
+        if tail not in _worker_windows:
+            _worker_windows[tail] = df.iloc[-tail:]
+        df = _worker_windows[tail]
+    return run_backtest(trial, ohlcv=df, **kwargs).metrics
+
+
+class _TrialRunner:
+    """Runs trial strategies on the loaded frame, or on its most recent ``tail`` bars.
+
+    With ``workers > 1`` the frame is copied into shared memory once and one process pool serves every
+    batch, so adaptive searches can submit small batches without respawning workers.
+    """
+
+    def __init__(self, df: pd.DataFrame, workers: int, **kwargs: Any):
+        self.df = df
+        self.workers = workers
+        self.kwargs = kwargs
+        self._windows: Dict[int, pd.DataFrame] = {}
+        self._frame: Optional[shared.SharedFrame] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "_TrialRunner":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._frame is not None:
+            self._frame.close()
+
+    def window(self, tail: Optional[int]) -> pd.DataFrame:
+        if tail is None:
+            return self.df
+        if tail not in self._windows:
+            self._windows[tail] = self.df.iloc[-tail:]
+        return self._windows[tail]
+
+    def run(self, trials: List[Dict[str, Any]], tail: Optional[int] = None) -> List[Dict[str, float]]:
+        if self.workers <= 1 or len(trials) <= 1:
+            df = self.window(tail)
+            # One batched pass per indicator type covers every trial's lengths up front
+            prefetch_indicators(df, trials)
+            return run_backtest_batch(trials, ohlcv=df, **self.kwargs)
+        if self._pool is None:
+            # Price data goes into shared memory once; tasks only carry the (small) trial strategy
+            self._frame = shared.SharedFrame.create(self.df)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=shared.init_worker, initargs=(self._frame.handle,)
+            )
+        chunksize = max(1, len(trials) // (self.workers * 4))
+        # map() yields in submission order, so results do not depend on scheduling
+        return list(self._pool.map(_run_trial_in_worker, [(t, tail, self.kwargs) for t in trials], chunksize=chunksize))
+
+
+class _Budget:
+    def __init__(self, max_trials: Optional[int] = None, time_budget: Optional[float] = None):
+        self.max_trials = max_trials
+        self.deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self.used = 0
+
+    def left(self) -> Optional[int]:
+        return None if self.max_trials is None else max(0, self.max_trials - self.used)
+
+    def exhausted(self) -> bool:
+        if self.max_trials is not None and self.used >= self.max_trials:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+# Trials proposed per round by adaptive (or time-bounded) searches
+_ASK_BATCH = 8
+
+
+def _score(metrics: Dict[str, float], objective: str) -> float:
+    value = metrics.get(objective, float("-inf"))
+    return float("-inf") if value is None or value != value else float(value)
+
+
+class _Progress:
+    """Tracks the best full-history trial and reports every completed trial to ``callback``.
+
+    The callback gets a dict with ``trial``, ``params``, ``metrics``, ``best_params`` and
+    ``best_metrics``; returning ``False`` stops the search after the current batch.
+    """
+
+    def __init__(self, strategy: Dict[str, Any], objective: str, callback: Optional[Callable[[Dict[str, Any]], Any]]):
+        self.objective = objective
+        self.callback = callback
+        self.best_strategy = strategy
+        self.best_params: Optional[Dict[str, Any]] = None
+        self.best_metrics: Dict[str, float] = {objective: float("-inf")}
+        self.completed = 0
+        self.stopped = False
+
+    def report(
+        self,
+        params: Dict[str, Any],
+        trial: Optional[Dict[str, Any]],
+        metrics: Dict[str, float],
+        **extra: Any,
+    ) -> None:
+        self.completed += 1
+        if trial is not None and _score(metrics, self.objective) > _score(self.best_metrics, self.objective):
+            self.best_strategy, self.best_params, self.best_metrics = trial, params, metrics
+        if self.callback is None:
+            return
+        event = {
+            "trial": self.completed,
+            "params": params,
+            "metrics": metrics,
+            "best_params": self.best_params,
+            "best_metrics": self.best_metrics if self.best_params is not None else None,
+            **extra,
+        }
+        if self.callback(event) is False:
+            self.stopped = True
+
+
+def _halving_rungs(samples: int, eta: int) -> List[int]:
+    sizes = [samples]
+    while sizes[-1] > 1:
+        sizes.append(int(math.ceil(sizes[-1] / eta)))
+    return sizes
+
+
+def _successive_halving(
+    runner: _TrialRunner,
+    strategy: Dict[str, Any],
+    param_space: Dict[str, Any],
+    objective: str,
+    samples: int,
+    eta: int,
+    min_bars: int,
+    rng: Optional[random.Random],
+    budget: _Budget,
+    progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    # Shrink the starting population until every rung fits in the trial budget
+    left = budget.left()
+    while left is not None and samples > 1 and sum(_halving_rungs(samples, eta)) > left:
+        samples -= 1
+    rungs = _halving_rungs(samples, eta)
+    bars = len(runner.df)
+    params = _iter_param_candidates(param_space, num_samples=samples, rng=rng)
+    trials = [_apply_params(strategy, p) for p in params]
+    tracker = _Progress(strategy, objective, progress)
+
+    for r, size in enumerate(rungs):
+        final = r == len(rungs) - 1 or budget.exhausted() or tracker.stopped
+        if final:
+            # Out of rungs or out of budget: the current leaders get the full history
+            params, trials = params[: max(1, size)], trials[: max(1, size)]
+            results = runner.run(trials)
+            budget.used += len(trials)
+            for p, trial, metrics in zip(params, trials, results):
+                tracker.report(p, trial, metrics, rung=r, window_bars=bars)
+            break
+        # Rung r sees the most recent bars/eta**(R-r) bars; only the top 1/eta move on
+        window = max(min_bars, int(math.ceil(bars / eta ** (len(rungs) - 1 - r))))
+        results = runner.run(trials, tail=window if window < bars else None)
+        budget.used += len(trials)
+        for p, metrics in zip(params, results):
+            # Short-window scores only rank candidates; they never become the returned best
+            tracker.report(p, None, metrics, rung=r, window_bars=min(window, bars))
+        order = sorted(range(len(trials)), key=lambda i: -_score(results[i], objective))
+        params = [params[i] for i in order[: rungs[r + 1]]]
+        trials = [trials[i] for i in order[: rungs[r + 1]]]
+
+    return tracker.best_strategy, tracker.best_metrics
+
+
+def _check_search(search: str, eta: int) -> str:
+    search = search.lower()
+    if search != "halving" and search not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy: {search}")
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+    return search
+
+
+def _search(
+    runner: _TrialRunner,
+    strategy: Dict[str, Any],
+    param_space: Dict[str, Any],
+    objective: str,
+    samples: int,
+    search: str,
+    rng: Optional[random.Random],
+    budget: _Budget,
+    eta: int,
+    min_bars: int,
+    time_budget: Optional[float],
+    progress: Optional[Callable[[Dict[str, Any]], Any]],
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    if search == "halving":
+        return _successive_halving(
+            runner, strategy, param_space, objective, samples, eta, min_bars, rng, budget, progress
+        )
+
+    tracker = _Progress(strategy, objective, progress)
+    sampler = SEARCH_STRATEGIES[search](param_space, rng)
+    # Plain random search can submit everything at once; adaptive, time-bounded or observed searches
+    # go in fixed-size batches so results feed back (and stop conditions are checked) between them.
+    # The batch size does not follow ``workers``, which keeps seeded runs identical across pool sizes.
+    batch = samples if search == "random" and time_budget is None and progress is None else _ASK_BATCH
+    done = 0
+    while done < samples and not budget.exhausted() and not tracker.stopped:
+        left = budget.left()
+        n = min(batch, samples - done, left if left is not None else samples)
+        params = sampler.ask(n)
+        trials = [_apply_params(strategy, p) for p in params]
+        results = runner.run(trials)
+        budget.used += n
+        done += n
+        for p, trial, metrics in zip(params, trials, results):
+            sampler.tell(p, _score(metrics, objective))
+            tracker.report(p, trial, metrics)
+    return tracker.best_strategy, tracker.best_metrics
 
 
 def optimize_strategy(
@@ -30,25 +273,187 @@ def optimize_strategy(
     timeframe: str = "1h",
     years: int = 2,
     samples: int = 25,
+    workers: Optional[int] = 1,
+    seed: Optional[int] = None,
+    search: str = "random",
+    max_trials: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    eta: int = 3,
+    min_bars: int = 500,
+    progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
 ) -> Tuple[Dict[str, Any], Dict[str, float]]:
-    best_strategy = strategy
-    best_metrics = {objective: float("-inf")}
-
-    nodes = strategy.get("blocks", [])
-    entry = next((n for n in nodes if n.get("type") == "entry"), None)
-
-    for params in _iter_param_candidates(param_space, num_samples=samples):
-        trial = {**strategy}
-        trial_nodes = []
-        for n in nodes:
-            n2 = dict(n)
-            if n2.get("type") == "indicator" and n2.get("id") in params:
-                n2["params"] = {**n2.get("params", {}), **params[n2["id"]]}
-            trial_nodes.append(n2)
-        trial["blocks"] = trial_nodes
-        result = run_backtest(trial, symbol=symbol, market=market, timeframe=timeframe, years=years)
-        if result.metrics.get(objective, float("-inf")) > best_metrics.get(objective, float("-inf")):
-            best_strategy = trial
-            best_metrics = result.metrics
-
-    return best_strategy, best_metrics
\ No newline at end of file
+    """Search ``param_space`` for the trial maximizing ``objective``.
+
+    ``search`` is "random", "tpe" (alias "bayesian") or "halving" (successive halving: every candidate
+    is scored on a short recent window and only the top 1/``eta`` are promoted to longer ones, ending
+    on the full history). ``max_trials`` caps the number of backtests and ``time_budget`` the wall-clock
+    seconds; either stops the search early with the best result found so far. ``progress`` is called
+    after every trial (see ``_Progress``) and can cancel the search by returning ``False``.
+    """
+    search = _check_search(search, eta)
+
+    # Load once so every trial shares the same frame (and its indicator cache entries)
+    df = Data.load_ohlcv(symbol=symbol, market=market, timeframe=timeframe, years=years)
+    rng = random.Random(seed) if seed is not None else None
+    workers = workers or os.cpu_count() or 1
+    budget = _Budget(max_trials, time_budget)
+
+    with _TrialRunner(df, workers, symbol=symbol, market=market, timeframe=timeframe, years=years) as runner:
+        return _search(
+            runner, strategy, param_space, objective, samples, search, rng, budget, eta, min_bars, time_budget, progress
+        )
+
+
+@dataclass
+class WalkForwardFold:
+    train_start: Any
+    test_start: Any
+    test_end: Any
+    best_strategy: Dict[str, Any]
+    train_metrics: Dict[str, float]
+    test_metrics: Dict[str, float]
+
+
+@dataclass
+class WalkForwardResult:
+    out_of_sample: BacktestResult  # test folds stitched end to end, compounding from initial_cash
+    folds: List[WalkForwardFold]
+
+
+def _fold_bounds(
+    bars: int,
+    folds: int,
+    train_bars: Optional[int],
+    test_bars: Optional[int],
+    anchored: bool,
+) -> List[Tuple[int, int, int]]:
+    # (train start, test start, test end) row offsets; test windows tile the end of the history
+    if folds < 1:
+        raise ValueError("folds must be >= 1")
+    test_bars = test_bars if test_bars is not None else bars // (folds + 1)
+    train_bars = train_bars if train_bars is not None else bars - folds * test_bars
+    if test_bars < 1 or train_bars < 1 or train_bars + folds * test_bars > bars:
+        raise ValueError(f"{bars} bars cannot hold {folds} folds of {train_bars} train + {test_bars} test bars")
+    bounds = []
+    for k in range(folds):
+        test_start = bars - (folds - k) * test_bars
+        bounds.append((0 if anchored else test_start - train_bars, test_start, test_start + test_bars))
+    return bounds
+
+
+def _walk_forward_fold(
+    df: pd.DataFrame,
+    bounds: Tuple[int, int, int],
+    strategy: Dict[str, Any],
+    param_space: Dict[str, Any],
+    objective: str,
+    seed: Optional[int],
+    initial_cash: float,
+    search_kwargs: Dict[str, Any],
+) -> Tuple[WalkForwardFold, BacktestResult]:
+    train_start, test_start, test_end = bounds
+    rng = random.Random(seed) if seed is not None else None
+    budget = _Budget(search_kwargs.pop("max_trials"), search_kwargs["time_budget"])
+    # Row slices of the loaded frame are views, so folds never copy or reload price data
+    with _TrialRunner(df.iloc[train_start:test_start], 1) as runner:
+        best, train_metrics = _search(
+            runner, strategy, param_space, objective, rng=rng, budget=budget, progress=None, **search_kwargs
+        )
+    # Indicators warm up over the fold's train window; trades only open inside the test window
+    test = run_backtest(
+        best, ohlcv=df.iloc[train_start:test_end], initial_cash=initial_cash, warmup=test_start - train_start
+    )
+    fold = WalkForwardFold(
+        train_start=df.index[train_start],
+        test_start=df.index[test_start],
+        test_end=df.index[test_end - 1],
+        best_strategy=best,
+        train_metrics=train_metrics,
+        test_metrics=test.metrics,
+    )
+    return fold, test
+
+
+def _walk_forward_fold_in_worker(args: Tuple[Any, ...]) -> Tuple[WalkForwardFold, BacktestResult]:
+    return _walk_forward_fold(shared.worker_frame(), *args)
+
+
+def _stitch(results: List[BacktestResult], initial_cash: float, periods_per_year: float) -> BacktestResult:
+    # Sizing is proportional to cash, so a fold started at initial_cash scales exactly to the equity
+    # the previous folds ended with: its trades and its whole equity curve are multiplied by one factor
+    # (fixed per-fill commissions excepted, which this scales along with the rest)
+    records: List[Dict[str, Any]] = []
+    curves: List[pd.Series] = []
+    cash = initial_cash
+    for res in results:
+        scale = cash / initial_cash
+        for rec in res.trades.to_dict("records"):
+            rec["qty"] *= scale
+            rec["pnl"] *= scale
+            rec["entry_fee"] *= scale
+            rec["exit_fee"] *= scale
+            records.append(rec)
+        curves.append(res.equity_curve * scale)
+        cash = float(curves[-1].iloc[-1])
+    equity = pd.concat(curves)
+    return _summarize(records, equity, initial_cash, periods_per_year)
+
+
+def walk_forward(
+    strategy: Dict[str, Any],
+    param_space: Dict[str, Any],
+    objective: str = "roi_pct",
+    symbol: str = "BTC/USDT",
+    market: str = "crypto",
+    timeframe: str = "1h",
+    years: int = 2,
+    folds: int = 5,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+    samples: int = 25,
+    workers: Optional[int] = 1,
+    seed: Optional[int] = None,
+    search: str = "random",
+    max_trials: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    eta: int = 3,
+    min_bars: int = 500,
+    initial_cash: float = 10_000.0,
+    ohlcv: Optional[pd.DataFrame] = None,
+) -> WalkForwardResult:
+    """Optimize on each train fold, then backtest the winner on the test fold that follows it.
+
+    The last ``folds * test_bars`` bars are cut into consecutive test windows (by default the history
+    is split into ``folds + 1`` equal parts). Each train window is the ``train_bars`` before its test
+    window, or every earlier bar when ``anchored``. Folds run concurrently on ``workers`` processes;
+    ``max_trials`` / ``time_budget`` apply per fold, and fold ``k`` is seeded with ``seed + k``.
+    """
+    search = _check_search(search, eta)
+    df = ohlcv if ohlcv is not None else Data.load_ohlcv(symbol=symbol, market=market, timeframe=timeframe, years=years)
+    bounds = _fold_bounds(len(df), folds, train_bars, test_bars, anchored)
+    search_kwargs = {
+        "samples": samples,
+        "search": search,
+        "eta": eta,
+        "min_bars": min_bars,
+        "max_trials": max_trials,
+        "time_budget": time_budget,
+    }
+    tasks = [
+        (b, strategy, param_space, objective, seed + k if seed is not None else None, initial_cash, dict(search_kwargs))
+        for k, b in enumerate(bounds)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        outcomes = [_walk_forward_fold(df, *t) for t in tasks]
+    else:
+        # Data goes into shared memory once; every fold slices its windows out of the same buffer
+        with shared.SharedFrame.create(df) as frame, ProcessPoolExecutor(
+            max_workers=workers, initializer=shared.init_worker, initargs=(frame.handle,)
+        ) as pool:
+            outcomes = list(pool.map(_walk_forward_fold_in_worker, tasks))
+
+    ppy = M.infer_periods_per_year(df.index, M.periods_per_year(timeframe, market))
+    out_of_sample = _stitch([test for _, test in outcomes], initial_cash, ppy)
+    return WalkForwardResult(out_of_sample=out_of_sample, folds=[fold for fold, _ in outcomes])
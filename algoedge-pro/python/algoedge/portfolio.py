@@ -0,0 +1,140 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+import pandas as pd
+
+from . import data as Data
+from . import metrics as M
+from .backtester import (
+    BacktestResult,
+    _bar_range,
+    _calc_frame,
+    _close,
+    _close_open_lots,
+    _equity_curve,
+    _evaluate_logic_array,
+    _fill_lots,
+    _indicator_values,
+    _sides,
+    _simulate_book,
+    _summarize,
+)
+from .cache import indicator_cache
+from .strategy_dsl import Condition, StrategyPlan, compile_strategy
+
+
+@dataclass
+class PortfolioResult:
+    aggregate: BacktestResult
+    per_symbol: Dict[str, BacktestResult]
+
+
+def _logic_keys(logics: Sequence[Optional[Sequence[Condition]]]) -> Set[str]:
+    # Operand columns the entry/exit logic can reference, including _prev for cross operators
+    keys = {"close"}
+    for logic in logics:
+        for op, a, b in logic or ():
+            for operand in (a, b):
+                if isinstance(operand, str):
+                    keys.add(operand)
+                    if op in ("cross_over", "cross_under"):
+                        keys.add(f"{operand}_prev")
+    return keys
+
+
+def _aligned_columns(
+    calc: Dict[str, pd.DataFrame],
+    symbols: List[str],
+    index: pd.Index,
+    keys: Set[str],
+) -> Dict[str, np.ndarray]:
+    # Columns are computed on each symbol's own bars, then aligned; missing bars become NaN (never traded)
+    aligned = {s: calc[s].reindex(index) for s in symbols}
+    present = set().union(*(set(f.columns) for f in aligned.values())) & keys
+    nan = np.full(len(index), np.nan)
+    return {
+        k: np.column_stack([aligned[s][k].to_numpy(dtype=float) if k in aligned[s].columns else nan for s in symbols])
+        for k in present
+    }
+
+
+def run_portfolio_backtest(
+    strategy: Dict[str, Any] | StrategyPlan,
+    symbols: Sequence[str],
+    market: str = "crypto",
+    timeframe: str = "1h",
+    years: int = 2,
+    initial_cash: float = 10_000.0,
+    ohlcv: Optional[Dict[str, pd.DataFrame]] = None,
+    use_cache: bool = True,
+) -> PortfolioResult:
+    """Run one strategy over many symbols with signals evaluated as a (bars x symbols) matrix.
+
+    Every entry is sized off realized portfolio equity (see ``risk_per_trade_pct`` / ``sizing``), capped
+    by the cash not already committed to open positions, so all symbols draw on a single cash pool.
+    Fills, fees, slippage, shorts and ``max_positions`` lots follow ``run_backtest``.
+    """
+    plan = compile_strategy(strategy)
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        raise ValueError("symbols must not be empty")
+    ohlcv = ohlcv or {}
+    frames = {
+        s: ohlcv[s] if s in ohlcv else Data.load_ohlcv(symbol=s, market=market, timeframe=timeframe, years=years)
+        for s in symbols
+    }
+    cache = indicator_cache if use_cache else None
+    calc = {s: _calc_frame(df, _indicator_values(df, plan, cache), plan.lagged) for s, df in frames.items()}
+    index = calc[symbols[0]].index
+    for s in symbols[1:]:
+        index = index.union(calc[s].index)
+
+    sl_pct = plan.stop_loss_pct
+    tp_pct = plan.take_profit_pct
+    ppy = M.periods_per_year(timeframe, market)
+
+    sides = _sides(plan)
+    keys = _logic_keys([logic for _, entry, exit_ in sides for logic in (entry, exit_)]) | {"open", "high", "low"}
+    columns = _aligned_columns(calc, symbols, index, keys)
+    shape = (len(index), len(symbols))
+    close = columns.get("close", np.full(shape, np.nan))
+    signal = lambda logic: _evaluate_logic_array(logic, columns, shape) if logic is not None else None
+    signals = [(side, signal(entry), signal(exit_)) for side, entry, exit_ in sides]
+
+    # Position timing per symbol does not depend on sizing, so each column runs independently
+    books: List[np.ndarray] = []
+    for j in range(len(symbols)):
+        col = close[:, j]
+        own = {k: columns[k][:, j] for k in ("open", "high", "low") if k in columns}
+        column_signals = [(side, None if e is None else e[:, j], None if x is None else x[:, j]) for side, e, x in signals]
+        lots = _simulate_book(col, column_signals, sl_pct, tp_pct, plan.max_positions, _bar_range(own, col, plan.stop_fill))
+        if len(lots):
+            # Close at the symbol's last traded bar
+            last = int(np.flatnonzero(~np.isnan(col))[-1])
+            _close_open_lots(lots, last, float(col[last]))
+        lots["column"] = j
+        books.append(lots)
+
+    # All symbols' lots replay against the shared cash pool
+    book = np.concatenate(books)
+    records = {t: {"symbol": symbols[book["column"][t]], **r} for t, r in _fill_lots(book, index, initial_cash, plan).items()}
+
+    per_symbol: Dict[str, BacktestResult] = {}
+    contributions: List[pd.Series] = []
+    for s in symbols:
+        own = [{k: v for k, v in r.items() if k != "symbol"} for r in records.values() if r["symbol"] == s]
+        own.sort(key=lambda r: r["exit_time"])
+        # Per-symbol equity is the pool's starting cash plus this symbol's marked-to-market contribution
+        own_index = frames[s].index
+        equity = _equity_curve(own, own_index, _close(frames[s]), initial_cash)
+        per_symbol[s] = _summarize(own, equity, initial_cash, M.infer_periods_per_year(own_index, ppy))
+        # Between the symbol's own bars its position stays valued at its last close
+        contributions.append(equity.reindex(index).ffill().fillna(initial_cash) - initial_cash)
+
+    aggregate_equity = initial_cash + sum(contributions)
+    aggregate = _summarize(list(records.values()), aggregate_equity, initial_cash, M.infer_periods_per_year(index, ppy))
+    aggregate.trades = aggregate.trades.assign(symbol=[r["symbol"] for r in records.values()])
+
+    return PortfolioResult(aggregate=aggregate, per_symbol=per_symbol)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _is_range(spec: Any) -> bool:
+    return isinstance(spec, dict) and {"min", "max"}.issubset(spec.keys())
+
+
+def draw(spec: Any, sampler: Any) -> Any:
+    """Draw one value from a param-space entry: a list of choices or a {"min", "max", "type"} range."""
+    if isinstance(spec, list):
+        return sampler.choice(spec)
+    if spec.get("type") == "int":
+        return sampler.randint(int(spec["min"]), int(spec["max"]))
+    return sampler.uniform(float(spec["min"]), float(spec["max"]))
+
+
+def dimensions(param_space: Dict[str, Any]) -> List[Tuple[str, Optional[str], Any]]:
+    """Flatten a param space into (block id, param name or None, spec) search dimensions.
+
+    Top-level lists/ranges are one dimension each; a nested dict such as
+    ``{"ema_fast": {"length": {"min": 5, "max": 50, "type": "int"}}}`` adds one dimension per param.
+    """
+    dims: List[Tuple[str, Optional[str], Any]] = []
+    for key, spec in param_space.items():
+        if isinstance(spec, list) or _is_range(spec):
+            dims.append((key, None, spec))
+        elif isinstance(spec, dict):
+            for sub, sub_spec in spec.items():
+                if isinstance(sub_spec, list) or _is_range(sub_spec):
+                    dims.append((key, sub, sub_spec))
+    return dims
+
+
+def assemble(dims: List[Tuple[str, Optional[str], Any]], values: List[Any]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    for (key, sub, _), value in zip(dims, values):
+        if sub is None:
+            params[key] = value
+        else:
+            params.setdefault(key, {})[sub] = value
+    return params
+
+
+class RandomSearch:
+    """Uniform sampling over the param space (the original optimizer behaviour)."""
+
+    def __init__(self, param_space: Dict[str, Any], rng: Optional[random.Random] = None):
+        self.param_space = param_space
+        # Fall back to the module-level generator so unseeded runs behave as before
+        self.sampler: Any = rng or random
+
+    def ask(self, n: int) -> List[Dict[str, Any]]:
+        candidates: List[Dict[str, Any]] = []
+        for _ in range(n):
+            params: Dict[str, Any] = {}
+            for key, spec in self.param_space.items():
+                if isinstance(spec, list) or _is_range(spec):
+                    params[key] = draw(spec, self.sampler)
+                elif isinstance(spec, dict):
+                    nested = {sub: draw(s, self.sampler) for sub, s in spec.items() if isinstance(s, list) or _is_range(s)}
+                    if nested:
+                        params[key] = nested
+            candidates.append(params)
+        return candidates
+
+    def tell(self, params: Dict[str, Any], value: float) -> None:
+        pass
+
+
+class TPESearch:
+    """Tree-structured Parzen Estimator over independent dimensions.
+
+    After ``n_startup`` random trials, observations are split into the top ``gamma`` fraction and the
+    rest; each dimension is then drawn from the good-trial density and the draw maximizing
+    l(x) / g(x) among ``n_candidates`` is kept.
+    """
+
+    def __init__(
+        self,
+        param_space: Dict[str, Any],
+        rng: Optional[random.Random] = None,
+        n_startup: int = 10,
+        gamma: float = 0.25,
+        n_candidates: int = 24,
+    ):
+        self.dims = dimensions(param_space)
+        rng = rng or random.Random()
+        self.np_rng = np.random.default_rng(rng.getrandbits(64))
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.observed: List[Tuple[List[Any], float]] = []
+        self._pending: Dict[int, List[Any]] = {}
+
+    def _random_value(self, spec: Any) -> Any:
+        if isinstance(spec, list):
+            return spec[int(self.np_rng.integers(len(spec)))]
+        lo, hi = float(spec["min"]), float(spec["max"])
+        if spec.get("type") == "int":
+            return int(self.np_rng.integers(int(lo), int(hi) + 1))
+        return float(self.np_rng.uniform(lo, hi))
+
+    def _split(self) -> Tuple[List[List[Any]], List[List[Any]]]:
+        ranked = sorted(self.observed, key=lambda o: o[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        return [o[0] for o in ranked[:n_good]], [o[0] for o in ranked[n_good:]]
+
+    def _categorical(self, spec: List[Any], d: int, good: List[List[Any]], bad: List[List[Any]]) -> Any:
+        def weights(obs: List[List[Any]]) -> np.ndarray:
+            counts = np.ones(len(spec))
+            for o in obs:
+                counts[spec.index(o[d])] += 1
+            return counts / counts.sum()
+
+        lw, gw = weights(good), weights(bad)
+        draws = self.np_rng.choice(len(spec), size=self.n_candidates, p=lw)
+        best = draws[int(np.argmax(lw[draws] / gw[draws]))]
+        return spec[int(best)]
+
+    def _numeric(self, spec: Dict[str, Any], d: int, good: List[List[Any]], bad: List[List[Any]]) -> Any:
+        lo, hi = float(spec["min"]), float(spec["max"])
+        span = max(hi - lo, 1e-12)
+
+        def mixture(obs: List[List[Any]]) -> Tuple[np.ndarray, float]:
+            centers = np.array([float(o[d]) for o in obs])
+            # Bandwidth shrinks as observations accumulate; the uniform prior keeps exploration alive
+            return centers, span / min(100.0, 1.0 + len(centers))
+
+        def density(x: np.ndarray, centers: np.ndarray, sigma: float) -> np.ndarray:
+            prior = np.full(len(x), 1.0 / span)
+            if not len(centers):
+                return prior
+            z = (x[:, None] - centers[None, :]) / sigma
+            kernels = np.exp(-0.5 * z * z) / (sigma * math.sqrt(2 * math.pi))
+            return (prior + kernels.sum(axis=1)) / (len(centers) + 1)
+
+        g_centers, g_sigma = mixture(good)
+        b_centers, b_sigma = mixture(bad)
+        pick = self.np_rng.integers(0, len(g_centers) + 1, size=self.n_candidates)
+        draws = np.where(
+            pick == len(g_centers),
+            self.np_rng.uniform(lo, hi, size=self.n_candidates),
+            self.np_rng.normal(g_centers[np.minimum(pick, len(g_centers) - 1)], g_sigma),
+        )
+        draws = np.clip(draws, lo, hi)
+        if spec.get("type") == "int":
+            draws = np.round(draws)
+        score = density(draws, g_centers, g_sigma) / density(draws, b_centers, b_sigma)
+        best = float(draws[int(np.argmax(score))])
+        return int(best) if spec.get("type") == "int" else best
+
+    def ask(self, n: int) -> List[Dict[str, Any]]:
+        candidates = []
+        for _ in range(n):
+            if len(self.observed) < self.n_startup:
+                values = [self._random_value(spec) for _, _, spec in self.dims]
+            else:
+                good, bad = self._split()
+                values = [
+                    self._categorical(spec, d, good, bad) if isinstance(spec, list) else self._numeric(spec, d, good, bad)
+                    for d, (_, _, spec) in enumerate(self.dims)
+                ]
+            params = assemble(self.dims, values)
+            self._pending[id(params)] = values
+            candidates.append(params)
+        return candidates
+
+    def tell(self, params: Dict[str, Any], value: float) -> None:
+        values = self._pending.pop(id(params), None)
+        if values is None:
+            return
+        if value is None or not math.isfinite(value):
+            value = -math.inf
+        self.observed.append((values, float(value)))
+
+
+SEARCH_STRATEGIES = {
+    "random": RandomSearch,
+    "tpe": TPESearch,
+    "bayesian": TPESearch,
+}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SharedFrameHandle:
+    """Picklable description of a frame living in a shared-memory block."""
+    name: str
+    rows: int
+    columns: Tuple[str, ...]
+    tz: Optional[str]
+    index_name: Optional[str]
+
+
+class SharedFrame:
+    """Numeric OHLCV frame copied once into shared memory so pool workers can map it without pickling.
+
+    Layout: int64 nanosecond index followed by the float64 columns stored column-major, which lets
+    ``attach`` rebuild the DataFrame over the shared buffer without copying.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: SharedFrameHandle, owner: bool):
+        self._shm = shm
+        self.handle = handle
+        self._owner = owner
+
+    @classmethod
+    def create(cls, df: pd.DataFrame) -> "SharedFrame":
+        rows = len(df)
+        columns = tuple(str(c) for c in df.columns)
+        idx = pd.DatetimeIndex(df.index)
+        tz = str(idx.tz) if idx.tz is not None else None
+        if tz is not None:
+            idx = idx.tz_convert("UTC").tz_localize(None)
+        size = max(8, rows * 8 * (1 + len(columns)))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        index_arr, values = _views(shm.buf, rows, len(columns))
+        index_arr[:] = idx.as_unit("ns").asi8
+        for j, col in enumerate(df.columns):
+            values[:, j] = df[col].to_numpy(dtype=float)
+        handle = SharedFrameHandle(shm.name, rows, columns, tz, df.index.name)
+        return cls(shm, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedFrameHandle) -> "SharedFrame":
+        return cls(shared_memory.SharedMemory(name=handle.name), handle, owner=False)
+
+    def frame(self) -> pd.DataFrame:
+        h = self.handle
+        index_arr, values = _views(self._shm.buf, h.rows, len(h.columns))
+        index = pd.DatetimeIndex(index_arr.view("datetime64[ns]"), name=h.index_name)
+        if h.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(h.tz)
+        return pd.DataFrame(values, index=index, columns=list(h.columns), copy=False)
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _views(buf: memoryview, rows: int, ncols: int) -> Tuple[np.ndarray, np.ndarray]:
+    index_arr = np.ndarray((rows,), dtype=np.int64, buffer=buf)
+    values = np.ndarray((rows, ncols), dtype=np.float64, buffer=buf, offset=rows * 8, order="F")
+    return index_arr, values
+
+
+# Per-process attachment used by pool workers (set by init_worker)
+_worker_frame: Optional[SharedFrame] = None
+_worker_df: Optional[pd.DataFrame] = None
+
+
+def init_worker(handle: SharedFrameHandle) -> None:
+    global _worker_frame, _worker_df
+    _worker_frame = SharedFrame.attach(handle)
+    _worker_df = _worker_frame.frame()
+
+
+def worker_frame() -> pd.DataFrame:
+    if _worker_df is None:
+        raise RuntimeError("shared frame not attached in this process")
+    return _worker_df
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import json
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# fetch(since_ms, until_ms) -> frame indexed by bar open time, covering [since_ms, until_ms)
+Fetcher = Callable[[int, int], pd.DataFrame]
+
+
+def default_root() -> Path:
+    return Path(os.getenv("ALGOEDGE_DATA_DIR") or Path.home() / ".algoedge" / "ohlcv")
+
+
+def _safe(part: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", part)
+
+
+def to_ms(index: pd.Index) -> np.ndarray:
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("ms").asi8
+
+
+class OHLCVStore:
+    """On-disk OHLCV cache, one directory of memory-mapped .npy columns per (market, exchange, symbol, timeframe).
+
+    Each partition keeps a ``meta.json`` with the synced range and the active column version; writes go
+    to a fresh version directory and are published by atomically replacing ``meta.json``. The version
+    just replaced is kept for readers that loaded the old ``meta.json``; older ones are pruned.
+    """
+
+    def __init__(self, root: Optional[Path | str] = None):
+        self.root = Path(root) if root is not None else default_root()
+
+    def partition(self, market: str, exchange: str, symbol: str, timeframe: str) -> Path:
+        return self.root / _safe(market) / _safe(exchange) / _safe(symbol) / _safe(timeframe)
+
+    def _meta(self, path: Path) -> Optional[dict]:
+        try:
+            with open(path / "meta.json") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def coverage(self, market: str, exchange: str, symbol: str, timeframe: str) -> Optional[Tuple[int, int]]:
+        meta = self._meta(self.partition(market, exchange, symbol, timeframe))
+        if meta is None:
+            return None
+        return int(meta["start_ms"]), int(meta["end_ms"])
+
+    def last_timestamp(self, market: str, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        meta = self._meta(self.partition(market, exchange, symbol, timeframe))
+        return meta.get("last_ms") if meta else None
+
+    def read(
+        self,
+        market: str,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> pd.DataFrame:
+        path = self.partition(market, exchange, symbol, timeframe)
+        try:
+            return self._read_version(path, self._meta(path), start_ms, end_ms)
+        except FileNotFoundError:
+            # A concurrent writer pruned the version between reading meta.json and opening it
+            return self._read_version(path, self._meta(path), start_ms, end_ms)
+
+    def _read_version(
+        self, path: Path, meta: Optional[dict], start_ms: Optional[int], end_ms: Optional[int]
+    ) -> pd.DataFrame:
+        if meta is None or meta.get("rows", 0) == 0:
+            return _empty_frame()
+        vdir = path / meta["version"]
+        ts = np.load(vdir / "timestamp.npy", mmap_mode="r")
+        lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, side="left"))
+        hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, side="left"))
+        # Only the requested slice is paged in from the mapped files
+        data = {c: np.array(np.load(vdir / f"{c}.npy", mmap_mode="r")[lo:hi]) for c in COLUMNS}
+        index = pd.to_datetime(np.array(ts[lo:hi]), unit="ms")
+        return pd.DataFrame(data, index=pd.DatetimeIndex(index, name="timestamp"))
+
+    def write(
+        self,
+        market: str,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        start_ms: int,
+        end_ms: int,
+    ) -> None:
+        """Merge ``df`` into the partition and extend the synced range to cover [start_ms, end_ms)."""
+        path = self.partition(market, exchange, symbol, timeframe)
+        path.mkdir(parents=True, exist_ok=True)
+        meta = self._meta(path)
+
+        merged = df
+        if meta is not None:
+            merged = pd.concat([self.read(market, exchange, symbol, timeframe), df])
+            start_ms = min(start_ms, int(meta["start_ms"]))
+            end_ms = max(end_ms, int(meta["end_ms"]))
+        ts = to_ms(merged.index)
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        # Later (freshly fetched) rows win over stored ones for the same bar
+        keep = np.ones(len(ts), dtype=bool)
+        keep[:-1] = ts[1:] != ts[:-1]
+
+        version = f"v-{uuid.uuid4().hex[:12]}"
+        vdir = path / version
+        vdir.mkdir()
+        np.save(vdir / "timestamp.npy", ts[keep])
+        for c in COLUMNS:
+            col = merged[c].to_numpy(dtype=float) if c in merged.columns else np.full(len(merged), np.nan)
+            np.save(vdir / f"{c}.npy", col[order][keep])
+
+        new_meta = {
+            "version": version,
+            "start_ms": int(start_ms),
+            "end_ms": int(end_ms),
+            "rows": int(keep.sum()),
+            "last_ms": int(ts[keep][-1]) if keep.any() else None,
+        }
+        tmp = path / f"meta.{version}.json"
+        with open(tmp, "w") as fh:
+            json.dump(new_meta, fh)
+        os.replace(tmp, path / "meta.json")
+        # Readers may still hold the version just replaced, so only versions before it are removed
+        keep_dirs = {version, meta["version"]} if meta is not None else {version}
+        for old in path.glob("v-*"):
+            if old.is_dir() and old.name not in keep_dirs:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def sync(
+        self,
+        market: str,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        fetch: Fetcher,
+        step_ms: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Serve [start_ms, end_ms) from disk, fetching only the head/tail ranges not synced yet.
+
+        With ``step_ms``, a tail range is only marked synced up to one bar past the last row fetched, so
+        bars the source had not published yet are requested again on the next sync.
+        """
+        cov = self.coverage(market, exchange, symbol, timeframe)
+        if cov is None:
+            missing = [(start_ms, end_ms)]
+        else:
+            missing = []
+            if start_ms < cov[0]:
+                missing.append((start_ms, cov[0]))
+            if end_ms > cov[1]:
+                missing.append((cov[1], end_ms))
+        for lo, hi in missing:
+            if hi <= lo:
+                continue
+            fetched = fetch(lo, hi)
+            if fetched is None:
+                fetched = _empty_frame()
+            synced = hi
+            if step_ms is not None and (cov is None or lo == cov[1]):
+                synced = min(hi, int(to_ms(fetched.index).max()) + step_ms) if len(fetched) else lo
+            if synced <= lo and not len(fetched):
+                # Nothing new (e.g. outside trading hours); leave the partition as it is
+                continue
+            self.write(market, exchange, symbol, timeframe, fetched, lo, synced)
+        return self.read(market, exchange, symbol, timeframe, start_ms, end_ms)
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {c: np.array([], dtype=float) for c in COLUMNS},
+        index=pd.DatetimeIndex([], name="timestamp"),
+    )
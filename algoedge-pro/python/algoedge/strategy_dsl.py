@@ -1,5 +1,11 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
 
 """
 Strategy DSL (v0.1)
@@ -17,6 +23,15 @@ Example:
     {"id": "risk", "type": "risk", "params": {"stop_loss_pct": 0.02, "take_profit_pct": 0.04, "risk_per_trade_pct": 1.0}}
   ]
 }
+
+Shorts: "entry_short" / "exit_short" blocks take the same logic as "entry" / "exit".
+
+Optional risk params:
+  "max_positions": 1 (default)  lots one side may hold at once; entries add lots up to it (pyramiding)
+  "stop_fill": "intrabar" (default: stops/targets trigger on the bar's low/high) | "close"
+  "sizing": "notional" (default: risk_per_trade_pct of equity is invested) | "risk" (that much is lost at the stop)
+  "commission": {"model": "percent" | "fixed" | "per_unit", "value": 0.1}  (per fill; a bare number is a percent)
+  "slippage": {"model": "percent" | "fixed", "value": 0.05}  (against every market fill; take-profits are limits)
 """
 
 
@@ -24,7 +39,8 @@ def normalize_strategy(strategy: Dict[str, Any]) -> Dict[str, Any]:
     strategy = dict(strategy)
     strategy.setdefault("version", "0.1")
     strategy.setdefault("name", "Unnamed Strategy")
-    blocks = strategy.get("blocks", [])
+    # Copy blocks so callers' strategies are never mutated (trials are compared and returned as-is)
+    blocks = [dict(b) for b in strategy.get("blocks", [])]
 
     # Auto-complete: add default risk if missing
     if not any(b.get("type") == "risk" for b in blocks):
@@ -37,8 +53,12 @@ def normalize_strategy(strategy: Dict[str, Any]) -> Dict[str, Any]:
     # Auto-complete: add trend filter if only one condition
     has_entry = next((b for b in blocks if b.get("type") == "entry"), None)
     if has_entry and len(has_entry.get("logic", [])) < 1:
-        has_entry.setdefault("logic", [])
+        has_entry["logic"] = list(has_entry.get("logic", []))
         has_entry["logic"].append({"op": "gt", "a": "EMA(length=50)", "b": "EMA(length=200)"})
+    has_short = next((b for b in blocks if b.get("type") == "entry_short"), None)
+    if has_short and len(has_short.get("logic", [])) < 1:
+        has_short["logic"] = list(has_short.get("logic", []))
+        has_short["logic"].append({"op": "lt", "a": "EMA(length=50)", "b": "EMA(length=200)"})
 
     strategy["blocks"] = blocks
     return strategy
@@ -52,4 +72,282 @@ def get_block_by_id(strategy: Dict[str, Any], block_id: str) -> Dict[str, Any] |
     for b in strategy.get("blocks", []):
         if b.get("id") == block_id:
             return b
-    return None
\ No newline at end of file
+    return None
+
+
+# Indicator schema: canonical name -> (param, type, default). Defaults mirror indicators.py.
+INDICATOR_PARAMS: Dict[str, Tuple[Tuple[str, type, Any], ...]] = {
+    "EMA": (("length", int, 20), ("source", str, "close")),
+    "SMA": (("length", int, 20), ("source", str, "close")),
+    "RSI": (("length", int, 14), ("source", str, "close")),
+    "MACD": (("fast", int, 12), ("slow", int, 26), ("signal", int, 9), ("source", str, "close")),
+    "BBANDS": (("length", int, 20), ("std", float, 2.0), ("source", str, "close")),
+    "VWAP": (),
+}
+INDICATOR_ALIASES = {"BOLLINGER": "BBANDS", "BOLLINGER BANDS": "BBANDS"}
+LOGIC_OPS = ("gt", "lt", "cross_over", "cross_under")
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+STOP_FILLS = ("intrabar", "close")
+SIZING_MODES = ("notional", "risk")
+COMMISSION_MODELS = ("percent", "fixed", "per_unit")
+SLIPPAGE_MODELS = ("percent", "fixed")
+
+Params = Tuple[Tuple[str, Any], ...]
+
+
+def normalize_indicator(name: str, params: Dict[str, Any]) -> Tuple[str, Params] | None:
+    """Canonical (name, params) with defaults filled in and numbers coerced; None if unknown."""
+    name = (name or "").upper()
+    name = INDICATOR_ALIASES.get(name, name)
+    if name not in INDICATOR_PARAMS:
+        return None
+    normalized = []
+    for key, kind, default in INDICATOR_PARAMS[name]:
+        value = params.get(key, default)
+        if kind is int and isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        normalized.append((key, value))
+    return name, tuple(normalized)
+
+
+def indicator_outputs(name: str, params: Params) -> Tuple[str, ...]:
+    """Column names of multi-output indicators (pandas_ta naming); () for single-series ones."""
+    p = dict(params)
+    if name == "MACD":
+        fast, slow, signal = p["fast"], p["slow"], p["signal"]
+        if slow < fast:
+            fast, slow = slow, fast
+        return tuple(f"{c}_{fast}_{slow}_{signal}" for c in ("MACD", "MACDh", "MACDs"))
+    if name == "BBANDS":
+        return tuple(f"{c}_{p['length']}_{p['std']}" for c in ("BBL", "BBM", "BBU", "BBB", "BBP"))
+    return ()
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    key: str
+    name: str  # canonical name; unknown indicators keep theirs and yield an empty column
+    params: Params
+    outputs: Tuple[str, ...] = ()
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(f"{self.key}_{c}" for c in self.outputs) if self.outputs else (self.key,)
+
+
+class Condition(NamedTuple):
+    op: str
+    a: Union[str, float]  # str -> operand column, number -> constant
+    b: Union[str, float]
+
+
+@dataclass(frozen=True)
+class StrategyPlan:
+    """Validated, immutable form of a DSL strategy, shared by the backtester, optimizer and live paths."""
+    digest: str
+    name: str
+    indicators: Tuple[IndicatorSpec, ...]
+    entry: Optional[Tuple[Condition, ...]]  # None when the strategy has no entry block
+    exit: Optional[Tuple[Condition, ...]]
+    stop_loss_pct: float
+    take_profit_pct: float
+    risk_per_trade_pct: float
+    columns: FrozenSet[str]
+    lagged: FrozenSet[str] = frozenset()  # columns whose previous-bar value the logic reads
+    entry_short: Optional[Tuple[Condition, ...]] = None
+    exit_short: Optional[Tuple[Condition, ...]] = None
+    max_positions: int = 1  # open lots per side
+    stop_fill: str = "intrabar"
+    sizing: str = "notional"
+    commission: Tuple[str, float] = ("percent", 0.0)  # (model, value) per fill
+    slippage: Tuple[str, float] = ("percent", 0.0)
+
+
+_EXPRESSION = re.compile(r"^\s*([A-Za-z][A-Za-z ]*?)\s*\((.*)\)\s*$")
+
+
+def _parse_literal(text: str) -> Any:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _parse_expression(operand: str) -> IndicatorSpec | None:
+    # "EMA(length=50)" -> an implicit indicator keyed by its canonical expression
+    match = _EXPRESSION.match(operand)
+    if not match:
+        return None
+    params: Dict[str, Any] = {}
+    args = match.group(2).strip()
+    for arg in filter(None, (a.strip() for a in args.split(","))) if args else []:
+        if "=" not in arg:
+            raise ValueError(f"Indicator expression arguments must be keyword=value: {operand}")
+        key, value = arg.split("=", 1)
+        params[key.strip()] = _parse_literal(value)
+    resolved = normalize_indicator(match.group(1), params)
+    if resolved is None:
+        raise ValueError(f"Unknown indicator in expression: {operand}")
+    name, norm = resolved
+    unknown = set(params) - {k for k, _ in norm}
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {sorted(unknown)} in expression: {operand}")
+    if indicator_outputs(name, norm):
+        raise ValueError(f"{name} has several outputs; reference a named block column instead of {operand}")
+    key = f"{name}({','.join(f'{k}={v}' for k, v in norm)})"
+    return IndicatorSpec(key=key, name=name, params=norm)
+
+
+def _cost_model(value: Any, models: Tuple[str, ...], what: str) -> Tuple[str, float]:
+    # {"model": ..., "value": ...}; a bare number is a percent
+    if value is None:
+        return models[0], 0.0
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = {"model": "percent", "value": value}
+    if not isinstance(value, dict):
+        raise ValueError(f"Invalid {what} model: {value!r}")
+    model = value.get("model", "percent")
+    if model not in models:
+        raise ValueError(f"Unknown {what} model '{model}'; expected one of {list(models)}")
+    amount = float(value.get("value", 0.0))
+    if amount < 0:
+        raise ValueError(f"{what} must not be negative")
+    return model, amount
+
+
+def _strategy_digest(strategy: Dict[str, Any]) -> str:
+    payload = json.dumps(strategy, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def strategy_hash(strategy: Dict[str, Any]) -> str:
+    """Content hash of what a strategy trades: its normalized DSL, ignoring the display name."""
+    normalized = normalize_strategy(strategy)
+    normalized.pop("name", None)
+    return _strategy_digest(normalized)
+
+
+def _compile(strategy: Dict[str, Any], digest: str) -> StrategyPlan:
+    strategy = normalize_strategy(strategy)
+    blocks = strategy.get("blocks", [])
+    indicators: List[IndicatorSpec] = []
+    for node in blocks:
+        if node.get("type") != "indicator":
+            continue
+        key = node.get("id") or node.get("indicator")
+        resolved = normalize_indicator(node.get("indicator", ""), node.get("params", {}))
+        if resolved is None:
+            indicators.append(IndicatorSpec(key=key, name=str(node.get("indicator", "")), params=()))
+        else:
+            indicators.append(IndicatorSpec(key=key, name=resolved[0], params=resolved[1], outputs=indicator_outputs(*resolved)))
+
+    columns = set(PRICE_COLUMNS)
+    for spec in indicators:
+        columns.update(spec.columns)
+    implicit: Dict[str, IndicatorSpec] = {}
+
+    def operand(value: Any, where: str) -> Union[str, float]:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid operand {value!r} in {where} logic")
+        base = value[: -len("_prev")] if value.endswith("_prev") else value
+        if value in columns or base in columns:
+            return value
+        spec = _parse_expression(value)
+        if spec is None:
+            raise ValueError(f"Unknown operand '{value}' in {where} logic")
+        implicit.setdefault(spec.key, spec)
+        return spec.key
+
+    def conditions(kind: str) -> Optional[Tuple[Condition, ...]]:
+        node = next((b for b in blocks if b.get("type") == kind), None)
+        if node is None:
+            return None
+        out = []
+        for cond in node.get("logic", []):
+            op = cond.get("op")
+            if op not in LOGIC_OPS:
+                raise ValueError(f"Unknown logic op '{op}' in {kind} logic")
+            out.append(Condition(op, operand(cond.get("a"), kind), operand(cond.get("b"), kind)))
+        return tuple(out)
+
+    entry = conditions("entry")
+    exit_ = conditions("exit")
+    entry_short = conditions("entry_short")
+    exit_short = conditions("exit_short")
+    # Implicit indicators from expressions are computed after the declared blocks
+    indicators.extend(spec for key, spec in implicit.items() if key not in columns)
+    columns.update(implicit)
+
+    lagged = set()
+    for cond in (entry or ()) + (exit_ or ()) + (entry_short or ()) + (exit_short or ()):
+        for value in (cond.a, cond.b):
+            if not isinstance(value, str):
+                continue
+            if cond.op in ("cross_over", "cross_under"):
+                lagged.add(value)
+            if value.endswith("_prev"):
+                lagged.add(value[: -len("_prev")])
+
+    risk = next((b for b in blocks if b.get("type") == "risk"), {"params": {}}).get("params", {})
+    stop_fill = risk.get("stop_fill", "intrabar")
+    if stop_fill not in STOP_FILLS:
+        raise ValueError(f"Unknown stop_fill '{stop_fill}'; expected one of {list(STOP_FILLS)}")
+    max_positions = risk.get("max_positions", 1)
+    if isinstance(max_positions, float) and max_positions.is_integer():
+        max_positions = int(max_positions)
+    if not isinstance(max_positions, int) or isinstance(max_positions, bool) or max_positions < 1:
+        raise ValueError(f"max_positions must be a positive integer, got {max_positions!r}")
+    sizing = risk.get("sizing", "notional")
+    if sizing not in SIZING_MODES:
+        raise ValueError(f"Unknown sizing '{sizing}'; expected one of {list(SIZING_MODES)}")
+    return StrategyPlan(
+        digest=digest,
+        name=str(strategy.get("name", "Unnamed Strategy")),
+        indicators=tuple(indicators),
+        entry=entry,
+        exit=exit_,
+        stop_loss_pct=float(risk.get("stop_loss_pct", 0.02)),
+        take_profit_pct=float(risk.get("take_profit_pct", 0.04)),
+        risk_per_trade_pct=float(risk.get("risk_per_trade_pct", 1.0)),
+        columns=frozenset(columns),
+        lagged=frozenset(lagged),
+        entry_short=entry_short,
+        exit_short=exit_short,
+        max_positions=max_positions,
+        stop_fill=stop_fill,
+        sizing=sizing,
+        commission=_cost_model(risk.get("commission"), COMMISSION_MODELS, "commission"),
+        slippage=_cost_model(risk.get("slippage"), SLIPPAGE_MODELS, "slippage"),
+    )
+
+
+_PLAN_CACHE_SIZE = 1024
+_plans: "OrderedDict[str, StrategyPlan]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def compile_strategy(strategy: Dict[str, Any] | StrategyPlan) -> StrategyPlan:
+    """Validate ``strategy`` and resolve its operands into a ``StrategyPlan``, cached by content hash."""
+    if isinstance(strategy, StrategyPlan):
+        return strategy
+    digest = _strategy_digest(strategy)
+    with _plans_lock:
+        plan = _plans.get(digest)
+        if plan is not None:
+            _plans.move_to_end(digest)
+            return plan
+    plan = _compile(strategy, digest)
+    with _plans_lock:
+        _plans[digest] = plan
+        while len(_plans) > _PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from algoedge import data as Data
+from algoedge import indicators as I
+from algoedge import native as N
+
+CASES = {
+    "EMA": lambda df: I.ema(df, length=50),
+    "SMA": lambda df: I.sma(df, length=50),
+    "RSI": lambda df: I.rsi(df, length=14),
+    "MACD": lambda df: I.macd(df),
+    "BBANDS": lambda df: I.bollinger_bands(df, length=20),
+    "VWAP": lambda df: I.vwap(df),
+}
+
+_COLD_START = "import time; t0 = time.perf_counter(); from algoedge import indicators as I, data as D; import pandas as pd; " \
+    "I.ema(D._synthetic_ohlcv(start=pd.Timestamp('2020-01-01'), periods=1000, minutes=1), length=20); " \
+    "print(time.perf_counter() - t0)"
+
+
+def _run(backend: str, fn, df: pd.DataFrame, repeat: int):
+    I.set_backend(backend)
+    out = fn(df)  # warm-up (numba compiles on first call)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def _max_rel_err(ref, got) -> float:
+    ref_arr = np.asarray(ref, dtype=float).reshape(len(ref), -1)
+    got_arr = np.asarray(got, dtype=float).reshape(len(got), -1)
+    assert ref_arr.shape == got_arr.shape, "output shapes differ"
+    assert np.array_equal(np.isnan(ref_arr), np.isnan(got_arr)), "NaN positions differ"
+    finite = np.isfinite(ref_arr)
+    if not finite.any():
+        return 0.0
+    return float(np.max(np.abs(got_arr[finite] - ref_arr[finite])) / np.max(np.abs(ref_arr[finite])))
+
+
+def _cold_start(backend: str) -> float:
+    env = {**os.environ, "ALGOEDGE_INDICATOR_BACKEND": backend}
+    out = subprocess.run([sys.executable, "-c", _COLD_START], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pandas_ta vs native indicator backend: speed and agreement")
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 100_000, 5_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="max error relative to the largest value")
+    args = parser.parse_args()
+
+    print(f"native backend: {'numba' if N.HAVE_NUMBA else 'numpy'}")
+    for backend in I.BACKENDS:
+        print(f"cold start (import + first EMA) {backend}: {_cold_start(backend) * 1e3:.0f}ms")
+
+    for bars in args.bars:
+        df = Data._synthetic_ohlcv(start=pd.Timestamp("2015-01-01"), periods=bars, minutes=1)
+        gappy = df.copy()
+        # A few missing closes exercise the NaN-aware paths
+        gappy.iloc[np.arange(bars // 3, bars, max(bars // 7, 1)), gappy.columns.get_loc("close")] = np.nan
+        for name, fn in CASES.items():
+            ref, t_ref = _run("pandas_ta", fn, df, args.repeat)
+            got, t_native = _run("native", fn, df, args.repeat)
+            err = _max_rel_err(ref, got)
+            gap_err = _max_rel_err(_run("pandas_ta", fn, gappy, 0)[0], _run("native", fn, gappy, 0)[0])
+            assert err <= args.tolerance and gap_err <= args.tolerance, f"{name}: native differs from pandas_ta"
+            print(
+                f"{name:7s} bars={bars:>8d} pandas_ta={t_ref * 1e3:9.2f}ms native={t_native * 1e3:9.2f}ms "
+                f"speedup={t_ref / t_native:6.1f}x max_rel_err={max(err, gap_err):.1e}"
+            )
+    I.set_backend("pandas_ta")
+
+
+if __name__ == "__main__":
+    main()
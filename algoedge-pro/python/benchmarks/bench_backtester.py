@@ -0,0 +1,48 @@
+from __future__ import annotations
+import argparse
+import time
+
+import pandas as pd
+
+from algoedge import data as Data
+from algoedge.backtester import run_backtest
+
+STRATEGY = {
+    "name": "EMA Cross + RSI Filter",
+    "blocks": [
+        {"id": "ema_fast", "type": "indicator", "indicator": "EMA", "params": {"length": 20, "source": "close"}},
+        {"id": "ema_slow", "type": "indicator", "indicator": "EMA", "params": {"length": 50, "source": "close"}},
+        {"id": "rsi", "type": "indicator", "indicator": "RSI", "params": {"length": 14}},
+        {"id": "entry", "type": "entry", "logic": [{"op": "cross_over", "a": "ema_fast", "b": "ema_slow"}, {"op": "lt", "a": "rsi", "b": 70}]},
+        {"id": "exit", "type": "exit", "logic": [{"op": "cross_under", "a": "ema_fast", "b": "ema_slow"}]},
+        {"id": "risk", "type": "risk", "params": {"stop_loss_pct": 0.02, "take_profit_pct": 0.04, "risk_per_trade_pct": 1.0}},
+    ],
+}
+
+
+def _timed(engine: str, df: pd.DataFrame):
+    t0 = time.perf_counter()
+    result = run_backtest(STRATEGY, ohlcv=df, engine=engine)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Loop vs vectorized backtest engine")
+    parser.add_argument("--bars", type=int, default=500_000)
+    parser.add_argument("--min-speedup", type=float, default=50.0)
+    args = parser.parse_args()
+
+    df = Data._synthetic_ohlcv(start=pd.Timestamp("2015-01-01"), periods=args.bars, minutes=1)
+    fast, t_fast = _timed("vectorized", df)
+    slow, t_slow = _timed("loop", df)
+
+    assert fast.trades.equals(slow.trades), "vectorized trades differ from loop"
+    assert fast.equity_curve.equals(slow.equity_curve), "vectorized equity differs from loop"
+    speedup = t_slow / t_fast
+    print(f"bars={args.bars} trades={len(fast.trades)} loop={t_slow:.2f}s vectorized={t_fast:.3f}s speedup={speedup:.0f}x")
+    if speedup < args.min_speedup:
+        raise SystemExit(f"speedup {speedup:.1f}x below {args.min_speedup}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from algoedge.connectors.alpaca import AlpacaConnector
+from algoedge.connectors.binance import BinanceConnector
+from algoedge.connectors.fakes import FakeAlpacaREST, FakeExchange, FakeIB
+from algoedge.connectors.ib import IBConnector
+from algoedge.connectors.registry import ConnectorRegistry
+
+ORDERS: Dict[str, Callable[[Any], Any]] = {
+    "binance": lambda conn: conn.create_order("BTC/USDT", "buy", "market", 0.01),
+    "alpaca": lambda conn: conn.submit_order("AAPL", 1, "buy"),
+    "ib": lambda conn: conn.place_market_order("AAPL", qty=1, side="BUY"),
+}
+
+
+def _fakes(args: argparse.Namespace) -> Dict[str, Callable[..., Any]]:
+    # One fake broker per venue; each factory call is a fresh session (handshake / load_markets) against it
+    exchange = FakeExchange(connect_latency=args.connect_ms / 1e3, latency=args.order_ms / 1e3)
+    rest = FakeAlpacaREST(connect_latency=0.0, latency=args.order_ms / 1e3)
+    ib = FakeIB(connect_latency=args.connect_ms / 1e3, latency=args.order_ms / 1e3)
+    return {
+        "binance": lambda **creds: BinanceConnector(client=exchange),
+        "alpaca": lambda **creds: AlpacaConnector("", "", client=rest),
+        "ib": lambda **creds: IBConnector(ib=ib),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-order latency: a new connector per order vs pooled registry sessions")
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--connect-ms", type=float, default=150.0, help="simulated handshake / load_markets time")
+    parser.add_argument("--order-ms", type=float, default=5.0, help="simulated order round-trip")
+    args = parser.parse_args()
+
+    factories = _fakes(args)
+    registry = ConnectorRegistry(factories=factories, health_interval=30.0)
+    for broker, place in ORDERS.items():
+        cold = []
+        for _ in range(args.orders):
+            t0 = time.perf_counter()
+            place(factories[broker]())
+            cold.append(time.perf_counter() - t0)
+        pooled = []
+        for _ in range(args.orders):
+            t0 = time.perf_counter()
+            with registry.order(broker) as conn:
+                place(conn)
+            pooled.append(time.perf_counter() - t0)
+        cold_ms, pooled_ms = np.asarray(cold) * 1e3, np.asarray(pooled) * 1e3
+        print(
+            f"{broker}: per-order connector p50={np.median(cold_ms):.1f}ms, "
+            f"registry p50={np.median(pooled_ms):.1f}ms (first {pooled_ms[0]:.1f}ms)"
+        )
+
+    # Drop the IB session mid-stream: the failed order marks it unhealthy and the next one reconnects
+    registry.acquire("ib").connector.ib.down = True
+    try:
+        with registry.order("ib") as conn:
+            ORDERS["ib"](conn)
+    except ConnectionError:
+        pass
+    with registry.order("ib") as conn:
+        ORDERS["ib"](conn)
+    print("after a dropped IB session:", registry.metrics()["ib"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+from typing import List
+
+from algoedge.connectors.binance import BinanceConnector
+from algoedge.connectors.fakes import SimulatedExchange
+from algoedge.connectors.registry import ConnectorRegistry
+from algoedge.execution import BrokerLimits, ExecutionService, OrderRequest
+
+# Perpetuals, since the batch endpoint only takes contract markets
+SYMBOLS = [f"SYM{i}/USDT:USDT" for i in range(50)]
+
+
+def _orders(n: int) -> List[OrderRequest]:
+    # A signal fan-out: every symbol, round after round
+    return [OrderRequest("sim", SYMBOLS[i % len(SYMBOLS)], "buy" if i % 2 else "sell", 1.0) for i in range(n)]
+
+
+def _venue(args: argparse.Namespace, lost_ack_rate: float = 0.0) -> SimulatedExchange:
+    return SimulatedExchange(
+        latency=args.latency_ms / 1e3,
+        weight_limit=args.venue_limit,
+        window=1.0,
+        max_batch=5,
+        lost_ack_rate=lost_ack_rate,
+    )
+
+
+def _sequential(args: argparse.Namespace) -> None:
+    venue = _venue(args)
+    conn = BinanceConnector(client=venue)
+    failed = 0
+    t0 = time.perf_counter()
+    for order in _orders(args.orders):
+        try:
+            conn.create_order(order.symbol, order.side, "market", order.qty, client_order_id=order.client_order_id)
+        except Exception:
+            failed += 1
+    _report("sequential connector calls", args.orders, time.perf_counter() - t0, failed, venue)
+
+
+async def _service(name: str, args: argparse.Namespace, limits: BrokerLimits, lost_ack_rate: float = 0.0) -> None:
+    venue = _venue(args, lost_ack_rate)
+    registry = ConnectorRegistry(factories={"sim": lambda **creds: BinanceConnector(client=venue)})
+    service = ExecutionService(registry, limits={"sim": limits}, retries=5, backoff=0.02)
+    orders = _orders(args.orders)
+    t0 = time.perf_counter()
+    results = await service.submit_many(orders)
+    elapsed = time.perf_counter() - t0
+    # Re-submitting the same intents must not reach the venue again
+    await service.submit_many(orders)
+    _report(name, len(orders), elapsed, sum(not r.ok for r in results), venue, service.metrics()["sim"])
+    service.shutdown()
+
+
+def _report(name: str, n: int, elapsed: float, failed: int, venue: SimulatedExchange, stats: dict = None) -> None:
+    line = (
+        f"{name}: {n} orders in {elapsed:.2f}s ({n / elapsed:.0f}/s), failed={failed}, "
+        f"venue requests={venue.requests} rejected={venue.rejected} fills={len(venue.orders)}"
+    )
+    if stats:
+        line += f", retries={stats['retries']} throttled={stats['throttled_ms'] / 1e3:.1f}s"
+    print(line)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    # burst + rate over the venue's 1s window equals its limit
+    rate, burst = 0.9 * args.venue_limit, 0.1 * args.venue_limit
+    await _service("async, no rate limiting", args, BrokerLimits(concurrency=16, rate=1e9, burst=1e9))
+    await _service("async, token bucket", args, BrokerLimits(concurrency=16, rate=rate, burst=burst))
+    batched = BrokerLimits(concurrency=16, rate=rate, burst=burst, max_batch=5)
+    await _service("async, token bucket + batches of 5", args, batched)
+    await _service("async, batches, 10% lost acks (retried)", args, batched, lost_ack_rate=0.1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order throughput against a simulated rate-limited exchange")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--venue-limit", type=int, default=100, help="request weight per second")
+    args = parser.parse_args()
+    _sequential(args)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from algoedge import data as Data
+from algoedge import indicators as I
+
+CASES = {
+    "EMA": (lambda df, ls: [I.ema(df, length=n) for n in ls], I.ema_batch),
+    "SMA": (lambda df, ls: [I.sma(df, length=n) for n in ls], I.sma_batch),
+    "RSI": (lambda df, ls: [I.rsi(df, length=n) for n in ls], I.rsi_batch),
+    "BBANDS": (lambda df, ls: [I.bollinger_bands(df, length=n) for n in ls], I.bollinger_bands_batch),
+}
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call pandas_ta indicators vs batched kernels")
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 17_520, 500_000])
+    parser.add_argument("--lengths", type=int, default=50, help="number of lengths in the grid (5, 10, ...)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lengths = list(range(5, 5 * args.lengths + 1, 5))
+    for bars in args.bars:
+        df = Data._synthetic_ohlcv(start=pd.Timestamp("2015-01-01"), periods=bars, minutes=1)
+        for name, (per_call, batch) in CASES.items():
+            t_call = _best_of(lambda: per_call(df, lengths), args.repeat)
+            t_batch = _best_of(lambda: batch(df, lengths), args.repeat)
+            ref = per_call(df, lengths[-1:])[0]
+            got = batch(df, lengths[-1:])
+            ref_arr = ref.iloc[:, 0].to_numpy() if isinstance(ref, pd.DataFrame) else ref.to_numpy()
+            got_arr = got["BBL"][:, 0] if isinstance(got, dict) else got[:, 0]
+            err = float(np.nanmax(np.abs(got_arr - ref_arr)) / np.nanmax(np.abs(ref_arr)))
+            print(
+                f"{name:7s} bars={bars:>8d} lengths={len(lengths)} per-call={t_call * 1e3:9.1f}ms "
+                f"batch={t_batch * 1e3:9.1f}ms speedup={t_call / t_batch:5.1f}x max_rel_err={err:.1e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import argparse
+import time
+
+import pandas as pd
+
+from algoedge import data as Data
+from algoedge.backtester import run_backtest
+from algoedge.live import replay
+
+STRATEGIES = {
+    "ema_cross_rsi": {
+        "blocks": [
+            {"id": "ema_fast", "type": "indicator", "indicator": "EMA", "params": {"length": 20}},
+            {"id": "ema_slow", "type": "indicator", "indicator": "EMA", "params": {"length": 50}},
+            {"id": "rsi", "type": "indicator", "indicator": "RSI", "params": {"length": 14}},
+            {"id": "entry", "type": "entry", "logic": [{"op": "cross_over", "a": "ema_fast", "b": "ema_slow"}, {"op": "lt", "a": "rsi", "b": 70}]},
+            {"id": "exit", "type": "exit", "logic": [{"op": "cross_under", "a": "ema_fast", "b": "ema_slow"}]},
+        ],
+    },
+    "sma_trend": {
+        "blocks": [
+            {"id": "sma", "type": "indicator", "indicator": "SMA", "params": {"length": 30}},
+            {"id": "entry", "type": "entry", "logic": [{"op": "cross_over", "a": "close", "b": "sma"}]},
+            {"id": "exit", "type": "exit", "logic": [{"op": "cross_under", "a": "close", "b": "sma"}]},
+        ],
+    },
+    "macd_bbands_vwap": {
+        "blocks": [
+            {"id": "macd", "type": "indicator", "indicator": "MACD", "params": {}},
+            {"id": "bb", "type": "indicator", "indicator": "BBANDS", "params": {"length": 20}},
+            {"id": "vwap", "type": "indicator", "indicator": "VWAP"},
+            {"id": "entry", "type": "entry", "logic": [{"op": "cross_over", "a": "macd_MACD_12_26_9", "b": "macd_MACDs_12_26_9"}, {"op": "gt", "a": "close", "b": "vwap"}]},
+            {"id": "exit", "type": "exit", "logic": [{"op": "gt", "a": "close", "b": "bb_BBU_20_2.0"}]},
+        ],
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay bars through the live engine and compare with run_backtest")
+    parser.add_argument("--bars", type=int, default=20_000)
+    args = parser.parse_args()
+
+    df = Data._synthetic_ohlcv(start=pd.Timestamp("2021-01-01"), periods=args.bars, minutes=60)
+    for name, strategy in STRATEGIES.items():
+        t0 = time.perf_counter()
+        _, live = replay(strategy, df)
+        elapsed = time.perf_counter() - t0
+        ref = run_backtest(strategy, ohlcv=df)
+        assert live.trades.equals(ref.trades), f"{name}: live trades differ from run_backtest"
+        assert live.equity_curve.equals(ref.equity_curve), f"{name}: live equity differs from run_backtest"
+        print(f"{name}: bars={args.bars} trades={len(live.trades)} {elapsed / args.bars * 1e6:.1f}us/bar, matches run_backtest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+import argparse
+import time
+
+import pandas as pd
+
+from algoedge import data as Data
+from algoedge.backtester import run_backtest
+
+INDICATORS = [
+    {"id": "ema_fast", "type": "indicator", "indicator": "EMA", "params": {"length": 20}},
+    {"id": "ema_slow", "type": "indicator", "indicator": "EMA", "params": {"length": 50}},
+    {"id": "rsi", "type": "indicator", "indicator": "RSI", "params": {"length": 14}},
+]
+LONG = [
+    {"id": "entry", "type": "entry", "logic": [{"op": "gt", "a": "ema_fast", "b": "ema_slow"}, {"op": "cross_over", "a": "rsi", "b": 50}]},
+    {"id": "exit", "type": "exit", "logic": [{"op": "cross_under", "a": "ema_fast", "b": "ema_slow"}]},
+]
+SHORT = [
+    {"id": "entry_short", "type": "entry_short", "logic": [{"op": "lt", "a": "ema_fast", "b": "ema_slow"}, {"op": "cross_under", "a": "rsi", "b": 50}]},
+    {"id": "exit_short", "type": "exit_short", "logic": [{"op": "cross_over", "a": "ema_fast", "b": "ema_slow"}]},
+]
+
+
+def _strategy(blocks: list, max_positions: int) -> dict:
+    risk = {"stop_loss_pct": 0.01, "take_profit_pct": 0.02, "risk_per_trade_pct": 10.0, "max_positions": max_positions}
+    return {"name": "EMA trend, RSI pullbacks", "blocks": INDICATORS + blocks + [{"id": "risk", "type": "risk", "params": risk}]}
+
+
+def _timed(strategy: dict, df: pd.DataFrame, engine: str = "vectorized"):
+    t0 = time.perf_counter()
+    result = run_backtest(strategy, ohlcv=df, engine=engine, use_cache=False)
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Long/short pyramiding in one pass vs one run per side")
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--max-positions", type=int, default=3)
+    parser.add_argument("--loop-bars", type=int, default=50_000, help="bars for the loop engine parity check")
+    args = parser.parse_args()
+
+    df = Data._synthetic_ohlcv(start=pd.Timestamp("2015-01-01"), periods=args.bars, minutes=1)
+    both, t_both = _timed(_strategy(LONG + SHORT, args.max_positions), df)
+    sides = both.trades["side"].value_counts().to_dict()
+    print(f"one pass: bars={args.bars} trades={len(both.trades)} {sides} {t_both:.2f}s")
+    _, t_long = _timed(_strategy(LONG, args.max_positions), df)
+    _, t_short = _timed(_strategy(SHORT, args.max_positions), df)
+    print(f"one run per side: {t_long + t_short:.2f}s ({(t_long + t_short) / t_both:.1f}x the single pass)")
+
+    sample = df.iloc[: args.loop_bars]
+    strategy = _strategy(LONG + SHORT, args.max_positions)
+    slow, t_slow = _timed(strategy, sample, "loop")
+    fast, t_fast = _timed(strategy, sample)
+    assert fast.trades.equals(slow.trades), "vectorized trades differ from loop"
+    assert fast.equity_curve.equals(slow.equity_curve), "vectorized equity differs from loop"
+    print(f"loop: bars={args.loop_bars} {t_slow:.2f}s vs vectorized {t_fast:.3f}s, trades match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The engine is imported as ``algoedge``, as the benchmarks do with PYTHONPATH=python
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
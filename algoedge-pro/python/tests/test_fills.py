@@ -0,0 +1,215 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from algoedge.backtester import run_backtest
+
+# Signals ride on the volume column, so no indicator backend is involved:
+# 1 enters long, 2 exits longs, 3 enters short, 4 exits shorts
+LONG, EXIT_LONG, SHORT, EXIT_SHORT = 1, 2, 3, 4
+ENGINES = ("vectorized", "loop")
+
+
+def _when(code: int) -> List[Dict[str, Any]]:
+    return [{"op": "gt", "a": "volume", "b": code - 0.5}, {"op": "lt", "a": "volume", "b": code + 0.5}]
+
+
+def _strategy(shorts: bool = False, **risk: Any) -> Dict[str, Any]:
+    blocks = [
+        {"id": "entry", "type": "entry", "logic": _when(LONG)},
+        {"id": "exit", "type": "exit", "logic": _when(EXIT_LONG)},
+        {"id": "risk", "type": "risk", "params": {
+            "stop_loss_pct": 0.02, "take_profit_pct": 0.04, "risk_per_trade_pct": 100.0, **risk,
+        }},
+    ]
+    if shorts:
+        blocks += [
+            {"id": "entry_short", "type": "entry_short", "logic": _when(SHORT)},
+            {"id": "exit_short", "type": "exit_short", "logic": _when(EXIT_SHORT)},
+        ]
+    return {"name": "volume-coded signals", "blocks": blocks}
+
+
+def _frame(bars: Sequence[Tuple[float, float, float, float]], signals: Sequence[int]) -> pd.DataFrame:
+    df = pd.DataFrame(bars, columns=["open", "high", "low", "close"], dtype=float)
+    df["volume"] = np.asarray(signals, dtype=float)
+    df.index = pd.date_range("2024-01-01", periods=len(df), freq="h")
+    return df
+
+
+def _flat(price: float) -> Tuple[float, float, float, float]:
+    return price, price, price, price
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_gap_through_stop_fills_at_open(engine):
+    # Entry at 100 puts the stop at 98; bar 2 opens at 95, below it
+    df = _frame([_flat(100), (101, 102, 99, 101), (95, 96, 94, 95), _flat(95)], [LONG, 0, 0, 0])
+    trades = run_backtest(_strategy(), ohlcv=df, engine=engine, use_cache=False).trades
+    assert len(trades) == 1
+    trade = trades.iloc[0]
+    assert trade["exit_reason"] == "stop_loss"
+    assert trade["exit_price"] == pytest.approx(95.0)
+    assert trade["exit_time"] == df.index[2]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_gap_through_target_fills_at_open(engine):
+    df = _frame([_flat(100), (106, 107, 105, 106), _flat(106)], [LONG, 0, 0])
+    trade = run_backtest(_strategy(), ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert (trade["exit_reason"], trade["exit_price"]) == ("take_profit", pytest.approx(106.0))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bar_spanning_stop_and_target_hits_stop_first(engine):
+    # Bar 1 trades through both 98 and 104 without gapping past either
+    df = _frame([_flat(100), (100, 105, 97, 101), _flat(101)], [LONG, 0, 0])
+    trade = run_backtest(_strategy(), ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert (trade["exit_reason"], trade["exit_price"]) == ("stop_loss", pytest.approx(98.0))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_close_stop_fill_ignores_the_wick(engine):
+    df = _frame([_flat(100), (100, 101, 97, 99), (99, 99, 97.5, 97.5), _flat(97.5)], [LONG, 0, 0, 0])
+    trade = run_backtest(_strategy(stop_fill="close"), ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert trade["exit_time"] == df.index[2]
+    assert (trade["exit_reason"], trade["exit_price"]) == ("stop_loss", pytest.approx(97.5))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize(
+    "commission, fee",
+    [
+        ({"model": "percent", "value": 0.1}, lambda price, qty: price * qty * 0.001),
+        ({"model": "fixed", "value": 2.0}, lambda price, qty: 2.0),
+        ({"model": "per_unit", "value": 0.01}, lambda price, qty: qty * 0.01),
+    ],
+)
+def test_commission_and_slippage(engine, commission, fee):
+    df = _frame([_flat(100), _flat(105), _flat(110), _flat(110)], [LONG, 0, EXIT_LONG, 0])
+    strategy = _strategy(
+        take_profit_pct=0.5,
+        risk_per_trade_pct=50.0,
+        commission=commission,
+        slippage={"model": "percent", "value": 0.05},
+    )
+    result = run_backtest(strategy, ohlcv=df, engine=engine, use_cache=False)
+    trade = result.trades.iloc[0]
+
+    # Both market fills slip 0.05% against the trade; half the equity is invested at the slipped entry
+    entry, exit_ = 100 * 1.0005, 110 * (1 - 0.0005)
+    qty = 10_000 * 0.5 / entry
+    pnl = (exit_ - entry) * qty - fee(entry, qty) - fee(exit_, qty)
+    assert trade["exit_reason"] == "signal"
+    assert trade["entry_price"] == pytest.approx(entry)
+    assert trade["exit_price"] == pytest.approx(exit_)
+    assert trade["qty"] == pytest.approx(qty)
+    assert trade["entry_fee"] == pytest.approx(fee(entry, qty))
+    assert trade["exit_fee"] == pytest.approx(fee(exit_, qty))
+    assert trade["pnl"] == pytest.approx(pnl)
+    assert result.metrics["final_equity"] == pytest.approx(10_000 + pnl)
+    assert result.equity_curve.iloc[-1] == pytest.approx(10_000 + pnl)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_take_profit_is_not_slipped(engine):
+    df = _frame([_flat(100), (100, 105, 100, 104.5), _flat(104.5)], [LONG, 0, 0])
+    strategy = _strategy(slippage={"model": "fixed", "value": 0.25})
+    trade = run_backtest(strategy, ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert trade["entry_price"] == pytest.approx(100.25)
+    assert (trade["exit_reason"], trade["exit_price"]) == ("take_profit", pytest.approx(104.0))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_risk_sizing_loses_the_budget_at_the_stop(engine):
+    df = _frame([_flat(100), (99, 99, 97, 97), _flat(97)], [LONG, 0, 0])
+    strategy = _strategy(risk_per_trade_pct=1.0, sizing="risk")
+    trade = run_backtest(strategy, ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert trade["exit_reason"] == "stop_loss"
+    assert trade["qty"] == pytest.approx(100 / 2)
+    assert trade["pnl"] == pytest.approx(-100.0)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_short_round_trip(engine):
+    # Short at 100 (stop 102, target 96), covered on the exit signal at 97, then a target fill
+    df = _frame(
+        [_flat(100), (100, 101, 99, 99), (98, 98, 96.5, 97), _flat(97), (96, 97, 92, 93), _flat(93)],
+        [SHORT, 0, EXIT_SHORT, SHORT, 0, 0],
+    )
+    result = run_backtest(_strategy(shorts=True), ohlcv=df, engine=engine, use_cache=False)
+    first, second = result.trades.iloc[0], result.trades.iloc[1]
+    assert len(result.trades) == 2
+    assert (first["side"], first["exit_reason"]) == ("short", "signal")
+    assert first["qty"] == pytest.approx(-100.0)
+    assert first["pnl"] == pytest.approx(300.0)
+    assert second["qty"] == pytest.approx(-10_300 / 97)
+    # Bar 4 opens at 96, above the 93.12 target, and trades through it
+    assert (second["exit_reason"], second["exit_price"]) == ("take_profit", pytest.approx(97 * 0.96))
+    assert result.metrics["final_equity"] == pytest.approx(10_300 + 10_300 * 0.04)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_short_stop_gap_fills_at_open(engine):
+    df = _frame([_flat(100), (105, 106, 104, 105), _flat(105)], [SHORT, 0, 0])
+    trade = run_backtest(_strategy(shorts=True), ohlcv=df, engine=engine, use_cache=False).trades.iloc[0]
+    assert (trade["side"], trade["exit_reason"], trade["exit_price"]) == ("short", "stop_loss", pytest.approx(105.0))
+    assert trade["pnl"] == pytest.approx(-500.0)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("max_positions, expected", [(1, [0]), (3, [0, 1, 2])])
+def test_pyramiding_up_to_max_positions(engine, max_positions, expected):
+    prices = [100, 101, 102, 103, 104, 105, 106, 106]
+    signals = [LONG, LONG, LONG, LONG, LONG, 0, EXIT_LONG, 0]
+    df = _frame([_flat(p) for p in prices], signals)
+    strategy = _strategy(stop_loss_pct=0.5, take_profit_pct=1.0, risk_per_trade_pct=10.0, max_positions=max_positions)
+    trades = run_backtest(strategy, ohlcv=df, engine=engine, use_cache=False).trades
+    assert list(df.index.get_indexer(trades["entry_time"])) == expected
+    assert (trades["exit_time"] == df.index[6]).all()
+    assert (trades["exit_reason"] == "signal").all()
+    assert (trades["qty"] > 0).all()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_no_short_while_long_is_open(engine):
+    df = _frame([_flat(100), _flat(100.5), (101, 101, 101, 101), _flat(101), _flat(101)], [LONG, SHORT, EXIT_LONG, SHORT, 0])
+    trades = run_backtest(_strategy(shorts=True), ohlcv=df, engine=engine, use_cache=False).trades
+    assert list(trades["side"]) == ["long", "short"]
+    assert list(df.index.get_indexer(trades["entry_time"])) == [0, 3]
+
+
+def _random_frame(seed: int, n: int = 1500) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.6, n))
+    open_ = np.concatenate([[close[0]], close[:-1]]) + rng.normal(0, 0.3, n)
+    high = np.maximum(open_, close) + rng.exponential(0.4, n)
+    low = np.minimum(open_, close) - rng.exponential(0.4, n)
+    signals = rng.choice([0, LONG, EXIT_LONG, SHORT, EXIT_SHORT], size=n, p=[0.6, 0.1, 0.1, 0.1, 0.1])
+    return _frame(list(zip(open_, high, low, close)), signals)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_loop_and_vectorized_engines_agree(seed):
+    rng = np.random.default_rng(1000 + seed)
+    strategy = _strategy(
+        shorts=True,
+        stop_loss_pct=float(rng.uniform(0.003, 0.03)),
+        take_profit_pct=float(rng.uniform(0.005, 0.05)),
+        risk_per_trade_pct=float(rng.choice([10.0, 40.0])),
+        max_positions=int(rng.integers(1, 4)),
+        stop_fill=str(rng.choice(["intrabar", "close"])),
+        sizing=str(rng.choice(["notional", "risk"])),
+        commission={"model": "percent", "value": 0.05},
+        slippage={"model": "fixed", "value": 0.01},
+    )
+    df = _random_frame(seed)
+    vectorized = run_backtest(strategy, ohlcv=df, engine="vectorized", use_cache=False)
+    loop = run_backtest(strategy, ohlcv=df, engine="loop", use_cache=False)
+    assert len(vectorized.trades) > 10
+    pd.testing.assert_frame_equal(vectorized.trades, loop.trades)
+    pd.testing.assert_series_equal(vectorized.equity_curve, loop.equity_curve)
+    assert vectorized.metrics == loop.metrics
@@ -0,0 +1,105 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+# A throwaway database, configured before the API modules read their settings
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_auth.sqlite3")
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from services.api.core.database import async_engine, engine
+from services.api.core.user_cache import user_cache
+from services.api.models.base import Base
+from services.api.routers import auth, strategies
+
+PASSWORD = "bench-password"
+
+
+async def _inline_hash(fn: Callable[..., Any], *args: Any) -> Any:
+    # The previous behaviour: bcrypt on the event loop
+    return fn(*args)
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.include_router(strategies.router, prefix="/strategies")
+    return app
+
+
+async def _register(client: httpx.AsyncClient, n_users: int) -> List[Dict[str, str]]:
+    headers = []
+    for i in range(n_users):
+        email = f"bench{i}@example.com"
+        await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+        token = (await client.post("/auth/login", data={"username": email, "password": PASSWORD})).json()["access_token"]
+        headers.append({"Authorization": f"Bearer {token}"})
+    return headers
+
+
+async def _run(client: httpx.AsyncClient, headers: List[Dict[str, str]], args: argparse.Namespace) -> Dict[str, float]:
+    latencies: List[float] = []
+    remaining = iter(range(args.requests))
+
+    async def authenticated(worker: int) -> None:
+        for i in remaining:
+            path = "/auth/me" if i % 2 else "/strategies?limit=10"
+            t0 = time.perf_counter()
+            r = await client.get(path, headers=headers[(worker + i) % len(headers)])
+            latencies.append(time.perf_counter() - t0)
+            assert r.status_code == 200, r.text
+
+    async def login(i: int) -> None:
+        email = f"bench{i % len(headers)}@example.com"
+        r = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+        assert r.status_code == 200, r.text
+
+    t0 = time.perf_counter()
+    await asyncio.gather(
+        *(authenticated(w) for w in range(args.concurrency)),
+        *(login(i) for i in range(args.logins)),
+    )
+    elapsed = time.perf_counter() - t0
+    ms = np.asarray(latencies) * 1e3
+    return {"rps": len(ms) / elapsed, "p50": float(np.percentile(ms, 50)), "p99": float(np.percentile(ms, 99))}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    Base.metadata.create_all(bind=engine)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://bench") as client:
+        headers = await _register(client, args.users)
+        ttl, run_hash = user_cache.ttl, auth._run_hash
+        results = {}
+        for mode in ("before", "after"):
+            user_cache.clear()
+            user_cache.ttl, auth._run_hash = (0.0, _inline_hash) if mode == "before" else (ttl, run_hash)
+            results[mode] = await _run(client, headers, args)
+            r = results[mode]
+            print(f"{mode}: {args.requests} authenticated requests, {args.logins} logins, concurrency={args.concurrency}: "
+                  f"{r['rps']:.0f} req/s, p50={r['p50']:.1f}ms p99={r['p99']:.1f}ms")
+        print(f"throughput x{results['after']['rps'] / results['before']['rps']:.2f}, "
+              f"p99 x{results['before']['p99'] / results['after']['p99']:.2f} lower")
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Authenticated endpoint throughput during a login burst, without (before) and with (after) "
+        "the user cache and off-loop bcrypt. Run from the repo root: python -m services.api.benchmarks.bench_auth"
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from services.api.routers import webhooks
+from services.api.tasks.signals import Alert
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(50)]
+
+
+def _alert(i: int) -> Dict[str, Any]:
+    # 10 strategies x 50 symbols fire on every 1m bar
+    return {
+        "strategy": f"s{i // len(SYMBOLS) % 10}",
+        "ticker": SYMBOLS[i % len(SYMBOLS)],
+        "action": "buy",
+        "time": 1_700_000_000 + i // (10 * len(SYMBOLS)) * 60,
+        "contracts": 1,
+    }
+
+
+async def _fire(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    """Open-loop load: ``rate`` alerts per second for ``seconds``, whatever the response times."""
+    codes: Dict[int, int] = {}
+    latencies: List[float] = []
+    sent: List[Dict[str, Any]] = []
+
+    async def post(body: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        r = await client.post("/webhooks/tradingview", json=body)
+        latencies.append(time.perf_counter() - t0)
+        codes[r.status_code] = codes.get(r.status_code, 0) + 1
+
+    tick = 0.01
+    per_tick = max(1, int(args.rate * tick))
+    tasks = []
+    start = time.perf_counter()
+    n = 0
+    while time.perf_counter() - start < args.seconds:
+        for _ in range(per_tick):
+            # Re-send an earlier alert (TradingView retries, duplicate alert rules)
+            body = random.choice(sent) if sent and random.random() < args.dup_rate else _alert(n)
+            sent.append(body)
+            tasks.append(asyncio.ensure_future(post(body)))
+            n += 1
+        await asyncio.sleep(max(0.0, start + (n / per_tick) * tick - time.perf_counter()))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "sent": n,
+        "rate": n / elapsed,
+        "codes": codes,
+        "ack_p50_ms": float(np.percentile(ms, 50)),
+        "ack_p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    metrics: Optional[Dict[str, Any]] = None
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=httpx.Limits(max_connections=args.connections)) as client:
+            result = await _fire(client, args)
+            metrics = (await client.get("/metrics/webhooks")).json()
+    else:
+        async def simulated_execution(alerts: List[Alert]) -> None:
+            await asyncio.sleep(args.route_ms / 1e3)
+
+        webhooks.pipeline.route = simulated_execution
+        app = FastAPI()
+        app.include_router(webhooks.router, prefix="/webhooks")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            result = await _fire(client, args)
+        await webhooks.pipeline.drain()
+        metrics = webhooks.pipeline.metrics()
+    print(
+        f"sent {result['sent']} alerts at {result['rate']:.0f}/s, responses {result['codes']}, "
+        f"ack p50={result['ack_p50_ms']:.2f}ms p99={result['ack_p99_ms']:.2f}ms"
+    )
+    print(
+        f"pipeline: accepted={metrics['accepted']} rejected={metrics['rejected']} duplicates={metrics['duplicates']} "
+        f"routed={metrics['routed']} batches={metrics['batches']} avg_batch={metrics['avg_batch']:.1f} "
+        f"peak_depth={metrics['peak_depth']}/{metrics['capacity']} lag avg={metrics['lag_avg_ms']:.1f}ms max={metrics['lag_max_ms']:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fire TradingView alerts at the webhook and report acks, backpressure and routing. "
+        "Without --url the router runs in-process with a simulated execution stage. "
+        "Run from the repo root: python -m services.api.benchmarks.bench_webhooks"
+    )
+    parser.add_argument("--url", default=None, help="base URL of a running API, e.g. http://localhost:8000")
+    parser.add_argument("--rate", type=int, default=3000, help="alerts per second")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--dup-rate", type=float, default=0.2, help="fraction of alerts that repeat an earlier one")
+    parser.add_argument("--route-ms", type=float, default=5.0, help="simulated execution time per batch")
+    parser.add_argument("--connections", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,49 @@
 from __future__ import annotations
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./db.sqlite3"
+    # API requests use an async engine; derived from database_url (asyncpg / aiosqlite) unless set
+    async_database_url: Optional[str] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_timeout: float = 30.0
     redis_url: str = "redis://localhost:6379/0"
     secret_key: str = "dev"
     allowed_origins: List[str] = ["*"]
+    # Background jobs: "local" runs everything on the API's process pool; "celery" sends optimizations
+    # and backtests longer than jobs_local_max_years to the Celery worker
+    jobs_backend: str = "local"
+    jobs_local_workers: int = 2
+    jobs_local_max_years: int = 3
+    jobs_retained: int = 1000
+    # Upper bound on the trial processes one optimization or walk-forward may start
+    jobs_trial_workers: int = 2
+    # Backtest results keyed by strategy hash + data fingerprint: "memory" (per process) or "redis"
+    result_cache_backend: str = "memory"
+    result_cache_entries: int = 4096
+    result_cache_ttl: int = 7 * 24 * 3600
+    # Authenticated users are cached per process for auth_cache_ttl seconds (0 disables)
+    auth_cache_ttl: float = 30.0
+    auth_cache_entries: int = 10_000
+    # Threads for bcrypt hashing / verification, kept off the event loop
+    auth_hash_workers: int = 2
+    # TradingView alerts: bounded per-process queue, batched and de-duplicated before execution
+    webhook_queue_size: int = 10_000
+    webhook_batch_size: int = 200
+    webhook_flush_ms: float = 20.0
+    webhook_dedupe_window: int = 50_000
+    # Alerts must carry this as "passphrase" when set; alerts that route to a broker are refused without it
+    webhook_passphrase: Optional[str] = None
+    # Live strategy sessions: at most this many per user, and sessions without a bar for
+    # live_session_idle seconds are dropped
+    live_sessions_per_user: int = 5
+    live_session_idle: float = 3600.0
+    # Broker sessions idle longer than this are pinged (and rebuilt if dead) before the next order
+    connector_health_interval: float = 30.0
 
     class Config:
         env_prefix = ""
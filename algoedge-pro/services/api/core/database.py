@@ -1,7 +1,103 @@
 from __future__ import annotations
+import threading
+import time
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..core.config import settings
 
+# Sync engine: Celery / process-pool jobs, migrations and create_all
 engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async drivers for the sync URLs the deployment is configured with
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_backend_name() not in _ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=_ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+class PoolStats:
+    """Checkout counts and wait times for the async pool (time spent in pool.connect)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": self.wait_total / self.checkouts * 1e3 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1e3,
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _TimedPool(AsyncAdaptedQueuePool):
+    def connect(self):  # type: ignore[override]
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except PoolTimeout:
+            timed_out = True
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - start, timed_out)
+
+
+async_engine = create_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url),
+    poolclass=_TimedPool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    # Shared request dependency: queries await the driver instead of blocking the event loop
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_metrics() -> Dict[str, Any]:
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        **pool_stats.snapshot(),
+    }
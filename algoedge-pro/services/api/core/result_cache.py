@@ -0,0 +1,70 @@
+from __future__ import annotations
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+try:
+    import redis
+except ImportError:  # optional: results then stay in process memory
+    redis = None
+
+_PREFIX = "algoedge:backtest:"
+
+
+class ResultCache:
+    """Content-addressed backtest results in Redis, falling back to an in-process LRU.
+
+    Redis is used when ``backend == "redis"`` and the client is installed; if a Redis call fails the
+    entry is read from / written to process memory instead, so an outage only costs hit rate.
+    """
+
+    def __init__(self, backend: str = "memory", redis_url: str = "", max_entries: int = 4096, ttl: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if backend == "redis" and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(_PREFIX + key)
+                if raw is not None:
+                    return json.loads(raw)
+            except redis.RedisError:
+                pass
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.set(_PREFIX + key, json.dumps(value), ex=self.ttl or None)
+                return
+            except redis.RedisError:
+                pass
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+result_cache = ResultCache(
+    backend=settings.result_cache_backend,
+    redis_url=settings.redis_url,
+    max_entries=settings.result_cache_entries,
+    ttl=settings.result_cache_ttl,
+)
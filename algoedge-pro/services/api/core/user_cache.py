@@ -0,0 +1,61 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from .config import settings
+
+
+class UserCache:
+    """Short-lived in-process cache of authenticated users by id.
+
+    Entries expire after ``ttl`` seconds and are dropped as soon as the user row is updated or deleted
+    in this process; other API processes see such changes once their entry expires. ``ttl <= 0``
+    disables caching.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a load that raced an update is not cached
+        self.version = 0
+
+    def get(self, user_id: int) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._items.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id: int, user: Any, version: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            self._items[user_id] = (time.monotonic() + self.ttl, user)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self.version += 1
+            self._items.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._items.clear()
+
+
+user_cache = UserCache(ttl=settings.auth_cache_ttl, max_entries=settings.auth_cache_entries)
@@ -2,9 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers import strategies, webhooks, live, leaderboard, auth, marketplace, payments
-from .core.database import engine
+from .core.database import async_engine, engine, pool_metrics
 from .models import base  # noqa: F401 - ensures Base is imported
 from .models.base import Base
+from .tasks.dispatch import job_manager
 
 app = FastAPI(title="AlgoEdge Pro API", version="0.1.0")
 
@@ -14,12 +15,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor of GET /strategies, readable by browser clients
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.on_event("startup")
 async def on_startup():
     Base.metadata.create_all(bind=engine)
 
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await webhooks.pipeline.drain()
+    job_manager.shutdown()
+    live.execution.shutdown()
+    live.connectors.close_all()
+    await async_engine.dispose()
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(strategies.router, prefix="/strategies", tags=["strategies"])
 app.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
@@ -31,4 +43,28 @@ app.include_router(payments.router, prefix="/payments", tags=["payments"])
 
 @app.get("/")
 async def root():
-    return {"status": "ok", "service": "algoedge-pro-api"}
\ No newline at end of file
+    return {"status": "ok", "service": "algoedge-pro-api"}
+
+
+@app.get("/metrics/db")
+async def db_metrics():
+    # Async pool occupancy plus checkout counts and wait times since startup
+    return pool_metrics()
+
+
+@app.get("/metrics/webhooks")
+async def webhook_metrics():
+    # Alert queue depth, rejections (backpressure), duplicates, batch sizes and enqueue-to-route lag
+    return webhooks.pipeline.metrics()
+
+
+@app.get("/metrics/connectors")
+async def connector_metrics():
+    # Broker sessions, (re)connects, health-check failures and per-order latency percentiles
+    return live.connectors.metrics()
+
+
+@app.get("/metrics/execution")
+async def execution_metrics():
+    # Orders, batches, retries, idempotent duplicates, rate-limit wait and latency per broker
+    return live.execution.metrics()
@@ -0,0 +1,72 @@
+"""Baseline: the schema Base.metadata.create_all produced before migrations were introduced
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by create_all already have these tables; only missing ones are created
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("is_active", sa.Boolean),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+    if "strategies" not in existing:
+        op.create_table(
+            "strategies",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("dsl", sa.JSON, nullable=False),
+            sa.Column("is_public", sa.Boolean),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_strategies_user_id", "strategies", ["user_id"])
+    if "backtest_runs" not in existing:
+        op.create_table(
+            "backtest_runs",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("strategy_id", sa.Integer, sa.ForeignKey("strategies.id"), nullable=False),
+            sa.Column("symbol", sa.String(100), nullable=False),
+            sa.Column("market", sa.String(50), nullable=False),
+            sa.Column("timeframe", sa.String(20), nullable=False),
+            sa.Column("years", sa.Integer, nullable=False),
+            sa.Column("metrics", sa.JSON, nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if "marketplace_listings" not in existing:
+        op.create_table(
+            "marketplace_listings",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("strategy_id", sa.Integer, sa.ForeignKey("strategies.id"), nullable=False),
+            sa.Column("price_usd", sa.Numeric(10, 2), nullable=False),
+            sa.Column("is_active", sa.Boolean),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_marketplace_listings_strategy_id", "marketplace_listings", ["strategy_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("marketplace_listings")
+    op.drop_table("backtest_runs")
+    op.drop_table("strategies")
+    op.drop_table("users")
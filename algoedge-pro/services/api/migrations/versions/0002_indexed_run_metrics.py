@@ -0,0 +1,198 @@
+"""Typed, indexed run metrics; strategy/run listing indexes; result-cache columns; leaderboard table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Databases that ran create_all after these columns were added to the models already have some of
+them, so every column, index and table is only added when missing. The upgrade backfills the metric
+columns and runs.user_id from existing rows and rebuilds the leaderboard from them.
+"""
+from __future__ import annotations
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+METRIC_COLUMNS = {
+    "roi_pct": sa.Float,
+    "sharpe_ratio": sa.Float,
+    "max_drawdown": sa.Float,
+    "win_rate": sa.Float,
+    "profit_factor": sa.Float,
+    "num_trades": sa.Integer,
+}
+RANKED = ("roi_pct", "sharpe_ratio", "max_drawdown")
+BATCH = 1000
+
+STRATEGY_INDEXES = {
+    "ix_strategies_dsl_hash": ["dsl_hash"],
+    "ix_strategies_is_public": ["is_public"],
+    "ix_strategies_created_at": ["created_at"],
+    "ix_strategies_user_id_id": ["user_id", "id"],
+}
+RUN_INDEXES = {
+    "ix_backtest_runs_cache_key": ["cache_key"],
+    "ix_backtest_runs_sharpe_ratio": ["sharpe_ratio"],
+    "ix_backtest_runs_user_id_id": ["user_id", "id"],
+    "ix_backtest_runs_user_symbol_timeframe": ["user_id", "symbol", "timeframe", "id"],
+    "ix_backtest_runs_strategy_id_id": ["strategy_id", "id"],
+}
+LEADERBOARD_INDEXES = {
+    "ix_leaderboard_metric_public_rank": ["metric", "is_public", "rank_value", "strategy_id"],
+}
+
+
+def _columns(table: str) -> set:
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _create_indexes(table: str, indexes: dict) -> None:
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+    for name, cols in indexes.items():
+        if name not in existing:
+            op.create_index(name, table, cols)
+
+
+def _metric_values(metrics) -> dict:
+    out = {}
+    for name in METRIC_COLUMNS:
+        value = (metrics or {}).get(name)
+        finite = isinstance(value, (int, float)) and math.isfinite(value)
+        out[name] = (int(value) if name == "num_trades" else float(value)) if finite else None
+    return out
+
+
+def _backfill_runs() -> None:
+    bind = op.get_bind()
+    runs = sa.table(
+        "backtest_runs",
+        sa.column("id", sa.Integer),
+        sa.column("strategy_id", sa.Integer),
+        sa.column("user_id", sa.Integer),
+        sa.column("metrics", sa.JSON),
+        *(sa.column(name, type_) for name, type_ in METRIC_COLUMNS.items()),
+    )
+    strategies = sa.table("strategies", sa.column("id", sa.Integer), sa.column("user_id", sa.Integer))
+    update = (
+        runs.update()
+        .where(runs.c.id == sa.bindparam("run_id"))
+        .values(user_id=sa.bindparam("owner_id"), **{name: sa.bindparam(f"v_{name}") for name in METRIC_COLUMNS})
+    )
+    last_id = 0
+    while True:
+        # Walk the primary key in batches so large tables are never loaded at once
+        rows = bind.execute(
+            sa.select(runs.c.id, runs.c.metrics, strategies.c.user_id)
+            .select_from(runs.join(strategies, strategies.c.id == runs.c.strategy_id))
+            .where(runs.c.id > last_id)
+            .order_by(runs.c.id)
+            .limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        params = [
+            {
+                "run_id": run_id,
+                "owner_id": owner_id,
+                **{f"v_{name}": value for name, value in _metric_values(metrics).items()},
+            }
+            for run_id, metrics, owner_id in rows
+        ]
+        bind.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def _rebuild_leaderboard() -> None:
+    runs = sa.table("backtest_runs", sa.column("id"), sa.column("strategy_id"), *(sa.column(name) for name in RANKED))
+    strategies = sa.table(
+        "strategies", sa.column("id"), sa.column("user_id"), sa.column("name"), sa.column("is_public", sa.Boolean)
+    )
+    columns = ["strategy_id", "metric", "run_id", "user_id", "strategy_name", "is_public", "rank_value", *RANKED, "runs"]
+    leaderboard = sa.table("leaderboard", *(sa.column(name) for name in columns))
+    selects = []
+    for name in RANKED:
+        # Each strategy's best run by this metric (NULLs last, earliest on ties), with that run's metrics
+        ranked = sa.select(
+            runs.c.id,
+            runs.c.strategy_id,
+            *(runs.c[m] for m in RANKED),
+            sa.func.row_number()
+            .over(partition_by=runs.c.strategy_id, order_by=(runs.c[name].is_(None), runs.c[name].desc(), runs.c.id))
+            .label("position"),
+            sa.func.count().over(partition_by=runs.c.strategy_id).label("runs"),
+        ).subquery()
+        selects.append(
+            sa.select(
+                strategies.c.id,
+                sa.literal(name),
+                ranked.c.id,
+                strategies.c.user_id,
+                strategies.c.name,
+                sa.func.coalesce(strategies.c.is_public, sa.false()),
+                ranked.c[name],
+                *(ranked.c[m] for m in RANKED),
+                ranked.c.runs,
+            )
+            .select_from(strategies.join(ranked, ranked.c.strategy_id == strategies.c.id))
+            .where(ranked.c.position == 1)
+        )
+    op.execute(leaderboard.delete())
+    op.execute(leaderboard.insert().from_select(columns, sa.union_all(*selects)))
+
+
+def upgrade() -> None:
+    strategy_columns = _columns("strategies")
+    if "dsl_hash" not in strategy_columns:
+        op.add_column("strategies", sa.Column("dsl_hash", sa.String(64)))
+    _create_indexes("strategies", STRATEGY_INDEXES)
+
+    run_columns = _columns("backtest_runs")
+    with op.batch_alter_table("backtest_runs") as batch:
+        if "user_id" not in run_columns:
+            batch.add_column(sa.Column("user_id", sa.Integer))
+            batch.create_foreign_key("fk_backtest_runs_user_id_users", "users", ["user_id"], ["id"])
+        if "cache_key" not in run_columns:
+            batch.add_column(sa.Column("cache_key", sa.String(64)))
+        for name, type_ in METRIC_COLUMNS.items():
+            if name not in run_columns:
+                batch.add_column(sa.Column(name, type_))
+    _create_indexes("backtest_runs", RUN_INDEXES)
+    _backfill_runs()
+
+    if "leaderboard" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "leaderboard",
+            sa.Column("strategy_id", sa.Integer, sa.ForeignKey("strategies.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("metric", sa.String(32), primary_key=True),
+            sa.Column("run_id", sa.Integer, sa.ForeignKey("backtest_runs.id", ondelete="SET NULL")),
+            sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("strategy_name", sa.String(255), nullable=False),
+            sa.Column("is_public", sa.Boolean, nullable=False),
+            sa.Column("rank_value", sa.Float),
+            sa.Column("roi_pct", sa.Float),
+            sa.Column("sharpe_ratio", sa.Float),
+            sa.Column("max_drawdown", sa.Float),
+            sa.Column("runs", sa.Integer, nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    _create_indexes("leaderboard", LEADERBOARD_INDEXES)
+    _rebuild_leaderboard()
+
+
+def downgrade() -> None:
+    op.drop_table("leaderboard")
+    for name in RUN_INDEXES:
+        op.drop_index(name, table_name="backtest_runs")
+    # Dropping user_id drops its foreign key with it
+    with op.batch_alter_table("backtest_runs") as batch:
+        for name in ("user_id", "cache_key", *METRIC_COLUMNS):
+            batch.drop_column(name)
+    for name in STRATEGY_INDEXES:
+        op.drop_index(name, table_name="strategies")
+    op.drop_column("strategies", "dsl_hash")
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    and_,
+    case,
+    event,
+    func,
+    inspect,
+    literal,
+    null,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .base import Base
+from .runs import BacktestRun
+from .strategy import Strategy
+
+
+class LeaderboardEntry(Base):
+    """A strategy's best run by one ranked metric, with that run's own metrics, kept current as runs are inserted.
+
+    Each strategy has one row per metric in ``RANKED``; the row's ``run_id`` is the run with the highest
+    ``rank_value`` (the earliest such run on ties), so the metrics shown next to a rank all come from it.
+    """
+
+    __tablename__ = "leaderboard"
+
+    strategy_id = Column(Integer, ForeignKey("strategies.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String(32), primary_key=True)
+    run_id = Column(Integer, ForeignKey("backtest_runs.id", ondelete="SET NULL"))
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    strategy_name = Column(String(255), nullable=False)
+    is_public = Column(Boolean, nullable=False, default=False)
+    rank_value = Column(Float)
+    roi_pct = Column(Float)
+    sharpe_ratio = Column(Float)
+    max_drawdown = Column(Float)
+    runs = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Top-N pages walk this from the top for one metric; strategy_id breaks ties for keyset cursors
+    __table_args__ = (Index("ix_leaderboard_metric_public_rank", "metric", "is_public", "rank_value", "strategy_id"),)
+
+
+# Ranked metric columns; higher is better for all of them (drawdowns are negative fractions)
+RANKED = ("roi_pct", "sharpe_ratio", "max_drawdown")
+
+
+def _scores(metrics: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    out = {}
+    for name in RANKED:
+        value = (metrics or {}).get(name)
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            out[name] = float(value)
+    return out
+
+
+def record_run(connection: Connection, strategy_id: int, run_id: int, metrics: Optional[Dict[str, Any]]) -> None:
+    """Fold one run into its strategy's leaderboard rows (O(1), no scan of other runs).
+
+    On each metric's row the run replaces the current best, all of its columns together, when its value
+    for that metric is higher.
+    """
+    table = LeaderboardEntry.__table__
+    scores = _scores(metrics)
+    run_values = {"run_id": run_id, **{name: scores.get(name) for name in RANKED}}
+    values: Dict[str, Any] = {"runs": table.c.runs + 1}
+    if scores:
+        # The run's value for the metric each row ranks by
+        candidate = case(*((table.c.metric == name, literal(value)) for name, value in scores.items()), else_=null())
+        better = and_(candidate.isnot(None), or_(table.c.rank_value.is_(None), table.c.rank_value < candidate))
+        values["rank_value"] = case((better, candidate), else_=table.c.rank_value)
+        values.update({name: case((better, value), else_=table.c[name]) for name, value in run_values.items()})
+    update = table.update().where(table.c.strategy_id == strategy_id).values(**values)
+    if connection.execute(update).rowcount:
+        return
+    strat = connection.execute(
+        select(Strategy.user_id, Strategy.name, Strategy.is_public).where(Strategy.id == strategy_id)
+    ).first()
+    if strat is None:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(
+                table.insert(),
+                [
+                    {
+                        "strategy_id": strategy_id,
+                        "metric": name,
+                        "user_id": strat.user_id,
+                        "strategy_name": strat.name,
+                        "is_public": bool(strat.is_public),
+                        "rank_value": scores.get(name),
+                        "runs": 1,
+                        **run_values,
+                    }
+                    for name in RANKED
+                ],
+            )
+    except IntegrityError:
+        # A concurrent first run created the rows; merge into them instead
+        connection.execute(update)
+
+
+_REBUILD_COLUMNS = ["strategy_id", "metric", "run_id", "user_id", "strategy_name", "is_public", "rank_value", *RANKED, "runs"]
+
+
+def _rebuild_select():
+    runs = BacktestRun.__table__
+    strategies = Strategy.__table__
+    selects = []
+    for name in RANKED:
+        # Each strategy's best run by this metric: highest value first, NULLs last, earliest run on ties
+        order = func.row_number().over(
+            partition_by=runs.c.strategy_id, order_by=(runs.c[name].is_(None), runs.c[name].desc(), runs.c.id)
+        )
+        ranked = select(
+            runs.c.id,
+            runs.c.strategy_id,
+            *(runs.c[m] for m in RANKED),
+            order.label("position"),
+            func.count().over(partition_by=runs.c.strategy_id).label("runs"),
+        ).subquery()
+        selects.append(
+            select(
+                strategies.c.id,
+                literal(name),
+                ranked.c.id,
+                strategies.c.user_id,
+                strategies.c.name,
+                func.coalesce(strategies.c.is_public, False),
+                ranked.c[name],
+                *(ranked.c[m] for m in RANKED),
+                ranked.c.runs,
+            )
+            .select_from(strategies.join(ranked, ranked.c.strategy_id == strategies.c.id))
+            .where(ranked.c.position == 1)
+        )
+    return union_all(*selects)
+
+
+def rebuild_leaderboard(db: Session) -> int:
+    """Recompute every row from the runs' metric columns (backfill for existing databases)."""
+    table = LeaderboardEntry.__table__
+    db.execute(table.delete())
+    count = db.execute(table.insert().from_select(_REBUILD_COLUMNS, _rebuild_select())).rowcount
+    db.commit()
+    return count
+
+
+@event.listens_for(BacktestRun, "after_insert")
+def _run_inserted(mapper: Any, connection: Connection, run: BacktestRun) -> None:
+    record_run(connection, run.strategy_id, run.id, {name: getattr(run, name) for name in RANKED})
+
+
+@event.listens_for(Strategy, "after_update")
+def _strategy_updated(mapper: Any, connection: Connection, strat: Strategy) -> None:
+    state = inspect(strat)
+    if not (state.attrs.is_public.history.has_changes() or state.attrs.name.history.has_changes()):
+        return
+    table = LeaderboardEntry.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.strategy_id == strat.id)
+        .values(is_public=bool(strat.is_public), strategy_name=strat.name)
+    )
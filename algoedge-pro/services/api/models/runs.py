@@ -1,18 +1,56 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, DateTime, func, ForeignKey, JSON, String
-from sqlalchemy.orm import relationship
+import math
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Integer, DateTime, Float, func, ForeignKey, Index, JSON, String
+from sqlalchemy.orm import relationship, validates
 from .base import Base
 
+# Metrics promoted out of the JSON blob into typed columns, so runs can be filtered and sorted by them
+METRIC_COLUMNS = ("roi_pct", "sharpe_ratio", "max_drawdown", "win_rate", "profit_factor", "num_trades")
+
+
+def metric_values(metrics: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # NaN / inf (e.g. profit_factor without losing trades) are stored as NULL
+    out: Dict[str, Any] = {}
+    for name in METRIC_COLUMNS:
+        value = (metrics or {}).get(name)
+        finite = isinstance(value, (int, float)) and math.isfinite(value)
+        out[name] = (int(value) if name == "num_trades" else float(value)) if finite else None
+    return out
+
+
 class BacktestRun(Base):
     __tablename__ = "backtest_runs"
 
     id = Column(Integer, primary_key=True)
     strategy_id = Column(Integer, ForeignKey("strategies.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))  # owner of the strategy, denormalized for listing
     symbol = Column(String(100), nullable=False)
     market = Column(String(50), nullable=False)
     timeframe = Column(String(20), nullable=False)
     years = Column(Integer, nullable=False)
     metrics = Column(JSON, nullable=False)
+    roi_pct = Column(Float)
+    sharpe_ratio = Column(Float, index=True)
+    max_drawdown = Column(Float)
+    win_rate = Column(Float)
+    profit_factor = Column(Float)
+    num_trades = Column(Integer)
+    cache_key = Column(String(64), index=True)  # strategy hash + data fingerprint (see tasks.jobs)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    strategy = relationship("Strategy", backref="runs")
\ No newline at end of file
+    strategy = relationship("Strategy", backref="runs")
+
+    # Run history pages are keyset scans on id within one user's (or strategy's) runs
+    __table_args__ = (
+        Index("ix_backtest_runs_user_id_id", "user_id", "id"),
+        Index("ix_backtest_runs_user_symbol_timeframe", "user_id", "symbol", "timeframe", "id"),
+        Index("ix_backtest_runs_strategy_id_id", "strategy_id", "id"),
+    )
+
+    @validates("metrics")
+    def _sync_metric_columns(self, key: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        for name, value in metric_values(metrics).items():
+            setattr(self, name, value)
+        return metrics
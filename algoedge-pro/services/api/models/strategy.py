@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Index, JSON, Boolean
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -10,7 +10,11 @@ class Strategy(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     dsl = Column(JSON, nullable=False)
-    is_public = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    dsl_hash = Column(String(64), index=True)  # strategy_dsl.strategy_hash, to reuse rows for resubmitted DSL
+    is_public = Column(Boolean, default=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
-    owner = relationship("User", backref="strategies")
\ No newline at end of file
+    owner = relationship("User", backref="strategies")
+
+    # Keyset pages of a user's strategies, newest first
+    __table_args__ = (Index("ix_strategies_user_id_id", "user_id", "id"),)
\ No newline at end of file
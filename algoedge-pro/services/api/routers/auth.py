@@ -1,15 +1,20 @@
 from __future__ import annotations
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 
-from ..core.database import SessionLocal
+from ..core.database import get_db
 from ..core.config import settings
+from ..core.user_cache import user_cache
 from ..models.user import User
 from ..schemas.user import UserCreate, UserOut, Token
 
@@ -23,14 +28,6 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -39,6 +36,15 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt is deliberately slow: run it on a few threads so a login burst neither blocks the
+# event loop nor takes every core from the other requests
+_hash_pool = ThreadPoolExecutor(max_workers=settings.auth_hash_workers, thread_name_prefix="bcrypt")
+
+
+async def _run_hash(fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -46,40 +52,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = int(payload.get("sub"))
     except Exception:
         raise credentials_exception
-    user = db.get(User, user_id)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    version = user_cache.version
+    user = await db.get(User, user_id)
     if not user:
         raise credentials_exception
+    # Cached detached, so requests sharing it never touch each other's sessions
+    db.expunge(user)
+    user_cache.set(user_id, user, version)
     return user
 
 
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper: Any, connection: Any, user: User) -> None:
+    user_cache.invalidate(user.id)
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _users_committed(session: Session) -> None:
+    # Again on commit: a request may have re-cached the old row between the flush and the commit
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _users_rolled_back(session: Session) -> None:
+    session.info.pop("changed_users", None)
+
+
 @router.post("/register", response_model=UserOut)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_in.email).first()
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing = await db.scalar(select(User).where(User.email == user_in.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(email=user_in.email, hashed_password=get_password_hash(user_in.password))
+    user = User(email=user_in.email, hashed_password=await _run_hash(get_password_hash, user_in.password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user or not await _run_hash(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     token = create_access_token({"sub": str(user.id)})
     return {"access_token": token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
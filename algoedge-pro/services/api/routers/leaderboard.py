@@ -1,15 +1,73 @@
 from __future__ import annotations
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_db
+from ..models.leaderboard import LeaderboardEntry
 
 router = APIRouter()
 
+# Query value of ``sort`` -> ranked metric (rows per metric, walked down the (metric, is_public, rank_value) index)
+SORTS = {
+    "roi_pct": "roi_pct",
+    "sharpe": "sharpe_ratio",
+    "drawdown": "max_drawdown",
+}
+
+
+def _parse_cursor(cursor: str):
+    try:
+        value, strategy_id = cursor.rsplit(":", 1)
+        return float(value), int(strategy_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.get("")
-async def get_leaderboard():
-    # TODO: fetch from DB aggregated performance of public strategies
+async def get_leaderboard(
+    sort: str = "roi_pct",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Public strategies ranked by their best run on ``sort``, with that run's metrics; pass ``next_cursor``
+    back as ``cursor`` for the next page."""
+    metric = SORTS.get(sort)
+    if metric is None:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {sorted(SORTS)}")
+    column = LeaderboardEntry.rank_value
+    q = select(LeaderboardEntry).where(
+        LeaderboardEntry.metric == metric,
+        LeaderboardEntry.is_public == True,  # noqa: E712
+        column.isnot(None),
+    )
+    if cursor is not None:
+        # Keyset pagination: continue below the last row returned, straight down the index
+        q = q.where(tuple_(column, LeaderboardEntry.strategy_id) < _parse_cursor(cursor))
+    rows = (await db.scalars(q.order_by(column.desc(), LeaderboardEntry.strategy_id.desc()).limit(limit + 1))).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = f"{last.rank_value!r}:{last.strategy_id}"
     return {
+        "sort": sort,
         "leaders": [
-            {"user": "alice", "roi_pct": 124.5},
-            {"user": "bob", "roi_pct": 98.1},
-        ]
-    }
\ No newline at end of file
+            {
+                "rank_value": row.rank_value,
+                "strategy_id": row.strategy_id,
+                "run_id": row.run_id,
+                "strategy": row.strategy_name,
+                "user_id": row.user_id,
+                "roi_pct": row.roi_pct,
+                "sharpe_ratio": row.sharpe_ratio,
+                "max_drawdown": row.max_drawdown,
+                "runs": row.runs,
+            }
+            for row in page
+        ],
+        "next_cursor": next_cursor,
+    }
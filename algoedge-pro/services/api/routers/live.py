@@ -1,42 +1,129 @@
 from __future__ import annotations
-from typing import Any, Dict
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
-from python.algoedge.connectors.binance import BinanceConnector
-from python.algoedge.connectors.alpaca import AlpacaConnector
-from python.algoedge.connectors.ib import IBConnector
+from python.algoedge.live import LiveStrategy
+from python.algoedge.connectors.registry import ConnectorRegistry
+from python.algoedge.execution import ExecutionService, OrderRequest
+
+from ..core.config import settings
+from .auth import get_current_user
 
 router = APIRouter()
 
 
+@dataclass
+class LiveSession:
+    owner_id: int
+    strategy: LiveStrategy
+    last_used: float = field(default_factory=time.monotonic)
+
+
+# session_id -> incremental strategy runtime (per API process)
+_sessions: Dict[str, LiveSession] = {}
+
+
+def _evict_idle() -> None:
+    cutoff = time.monotonic() - settings.live_session_idle
+    for session_id in [k for k, s in _sessions.items() if s.last_used < cutoff]:
+        del _sessions[session_id]
+
+
+def _owned_session(session_id: str, user: Any) -> LiveSession:
+    session = _sessions.get(session_id)
+    # Someone else's session looks the same as a missing one
+    if session is None or session.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Unknown session")
+    session.last_used = time.monotonic()
+    return session
+
+
+def _signal_out(signal: Any) -> Dict[str, Any]:
+    out = asdict(signal)
+    out["time"] = str(out["time"])
+    return out
+
+
 @router.post("/start")
-async def start_live(payload: Dict[str, Any]):
-    return {"ok": True, "session_id": "demo-session"}
+async def start_live(payload: Dict[str, Any], user=Depends(get_current_user)):
+    """Start a session for ``strategy``; optional ``warmup`` bars prime the indicators without trading."""
+    _evict_idle()
+    if sum(s.owner_id == user.id for s in _sessions.values()) >= settings.live_sessions_per_user:
+        raise HTTPException(status_code=429, detail="Too many live sessions; stop one first")
+    try:
+        session = LiveStrategy(payload.get("strategy", {}))
+        for bar in payload.get("warmup", []):
+            session.on_bar(bar.get("time"), bar)
+        # Warm-up only builds indicator state
+        session.reset_positions()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session_id = uuid.uuid4().hex
+    _sessions[session_id] = LiveSession(owner_id=user.id, strategy=session)
+    return {"ok": True, "session_id": session_id}
+
+
+@router.post("/{session_id}/bar")
+async def push_bar(session_id: str, bar: Dict[str, Any], user=Depends(get_current_user)):
+    """Feed one closed bar ({"time", "open", "high", "low", "close", "volume"}); returns its signals."""
+    session = _owned_session(session_id, user).strategy
+    try:
+        signals = session.on_bar(bar.get("time"), bar)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "signals": [_signal_out(s) for s in signals],
+        "position_open": session.position_open,
+        "position": session.position,
+    }
 
 
 @router.post("/stop")
-async def stop_live(payload: Dict[str, Any]):
+async def stop_live(payload: Dict[str, Any], user=Depends(get_current_user)):
+    session_id = payload.get("session_id", "")
+    _owned_session(session_id, user)
+    del _sessions[session_id]
     return {"ok": True}
 
 
+BROKERS = ("binance", "alpaca", "ib")
+
+# Broker sessions shared by every order from this process
+connectors = ConnectorRegistry(health_interval=settings.connector_health_interval)
+
+
+def _credentials(broker: str) -> Dict[str, Any]:
+    if broker == "binance":
+        return {"api_key": os.getenv("BINANCE_API_KEY"), "api_secret": os.getenv("BINANCE_API_SECRET")}
+    if broker == "alpaca":
+        return {"api_key": os.getenv("ALPACA_API_KEY", ""), "api_secret": os.getenv("ALPACA_API_SECRET", "")}
+    return {"host": os.getenv("IB_GATEWAY_HOST", "127.0.0.1"), "port": int(os.getenv("IB_GATEWAY_PORT", "4002"))}
+
+
+# Rate-limited, idempotent order submission over those sessions
+execution = ExecutionService(connectors, credentials=_credentials)
+
+
 @router.post("/order")
-async def place_order(broker: str, symbol: str, side: str, qty: float):
-    try:
-        if broker == "binance":
-            import os
-            conn = BinanceConnector(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_API_SECRET"))
-            order = conn.create_order(symbol=symbol, side=side, type_="market", amount=qty)
-            return {"ok": True, "order": order}
-        if broker == "alpaca":
-            import os
-            conn = AlpacaConnector(api_key=os.getenv("ALPACA_API_KEY", ""), api_secret=os.getenv("ALPACA_API_SECRET", ""))
-            order = conn.submit_order(symbol=symbol, qty=qty, side=side)
-            return {"ok": True, "order": str(order.id) if hasattr(order, 'id') else True}
-        if broker == "ib":
-            conn = IBConnector()
-            status = conn.place_market_order(symbol=symbol, qty=qty, side=side.upper())
-            return {"ok": True, "status": status}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    raise HTTPException(status_code=400, detail="Unknown broker")
\ No newline at end of file
+async def place_order(broker: str, symbol: str, side: str, qty: float, client_order_id: Optional[str] = None):
+    """Market order; resending with the same ``client_order_id`` returns the first outcome instead of a second fill."""
+    if broker not in BROKERS:
+        raise HTTPException(status_code=400, detail="Unknown broker")
+    order = OrderRequest(broker, symbol, side.lower(), qty)
+    if client_order_id:
+        order.client_order_id = client_order_id
+    result = await execution.submit(order)
+    if not result.ok:
+        raise HTTPException(status_code=400, detail=result.error)
+    return {
+        "ok": True,
+        "order": result.response,
+        "client_order_id": result.client_order_id,
+        "attempts": result.attempts,
+        "latency_ms": {"total": result.latency_ms, "throttled": result.throttled_ms},
+    }
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.database import SessionLocal
+from ..core.database import get_db
 from ..models.marketplace import MarketplaceListing
 from ..models.strategy import Strategy
 from .auth import get_current_user
@@ -11,27 +12,19 @@ from .auth import get_current_user
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get("/listings")
-def list_listings(db: Session = Depends(get_db)):
-    listings = db.query(MarketplaceListing).filter(MarketplaceListing.is_active == True).all()  # noqa: E712
+async def list_listings(db: AsyncSession = Depends(get_db)):
+    listings = (await db.scalars(select(MarketplaceListing).where(MarketplaceListing.is_active == True))).all()  # noqa: E712
     return [{"id": l.id, "strategy_id": l.strategy_id, "price_usd": str(l.price_usd)} for l in listings]
 
 
 @router.post("/listings")
-def create_listing(strategy_id: int, price_usd: float, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    strat = db.get(Strategy, strategy_id)
+async def create_listing(strategy_id: int, price_usd: float, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    strat = await db.get(Strategy, strategy_id)
     if not strat or strat.user_id != user.id:
         raise HTTPException(status_code=404, detail="Strategy not found or not owned")
     listing = MarketplaceListing(strategy_id=strategy_id, price_usd=Decimal(str(price_usd)))
     db.add(listing)
-    db.commit()
-    db.refresh(listing)
-    return {"id": listing.id, "strategy_id": listing.strategy_id, "price_usd": str(listing.price_usd)}
\ No newline at end of file
+    await db.commit()
+    await db.refresh(listing)
+    return {"id": listing.id, "strategy_id": listing.strategy_id, "price_usd": str(listing.price_usd)}
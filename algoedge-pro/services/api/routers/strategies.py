@@ -1,18 +1,23 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+import asyncio
+import json
+import math
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from python.algoedge.backtester import run_backtest
-from python.algoedge.optimizer import optimize_strategy
-from python.algoedge.strategy_dsl import normalize_strategy
+from python.algoedge.strategy_dsl import compile_strategy, normalize_strategy, strategy_hash
 
-from ..core.database import SessionLocal
-from ..models.strategy import Strategy
+from ..core.database import get_db
 from ..models.runs import BacktestRun
-from ..schemas.strategy import StrategyIn, StrategyOut
+from ..models.strategy import Strategy
+from ..schemas.strategy import BacktestRunOut, BacktestRunPage, StrategyIn, StrategyOut
+from ..tasks.dispatch import FINISHED, Job, job_manager
+from ..tasks.jobs import run_backtest_job, run_optimize_job, run_walk_forward_job
 from .auth import get_current_user
 
 router = APIRouter()
@@ -35,80 +40,191 @@ class OptimizePayload(BaseModel):
     timeframe: str = "1h"
     years: int = 2
     samples: int = 20
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    workers: int = 1
+    seed: Optional[int] = None
+    search: str = "random"
+    max_trials: Optional[int] = None
+    time_budget: Optional[float] = None
 
 
 @router.post("/validate")
 async def validate_strategy(payload: StrategyPayload):
     try:
         normalized = normalize_strategy(payload.strategy)
-        return {"ok": True, "strategy": normalized}
+        # Compiling checks ops and operands, so a strategy that validates will also run
+        plan = compile_strategy(normalized)
+        return {"ok": True, "strategy": normalized, "digest": plan.digest}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/backtest")
-async def backtest_strategy(payload: StrategyPayload, db: Session = Depends(get_db), user=Depends(get_current_user)):
+async def backtest_strategy(payload: StrategyPayload, user=Depends(get_current_user)):
     try:
-        result = run_backtest(
-            payload.strategy,
-            symbol=payload.symbol,
-            market=payload.market,
-            timeframe=payload.timeframe,
-            years=payload.years,
-        )
-        # Persist a run linked to a temporary strategy record for user
-        strat = Strategy(user_id=user.id, name=payload.strategy.get("name", "Untitled"), dsl=payload.strategy, is_public=False)
-        db.add(strat)
-        db.flush()
-        run = BacktestRun(strategy_id=strat.id, symbol=payload.symbol, market=payload.market, timeframe=payload.timeframe, years=payload.years, metrics=result.metrics)
-        db.add(run)
-        db.commit()
-        return {
-            "metrics": result.metrics,
-            "num_trades": len(result.trades),
-            "run_id": run.id,
-            "strategy_id": strat.id,
-        }
+        # Runs on the job pool so the event loop keeps serving other requests meanwhile
+        return await job_manager.run(run_backtest_job, {**payload.model_dump(), "user_id": user.id})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/optimize")
-async def optimize(payload: OptimizePayload):
+async def optimize(payload: OptimizePayload, user=Depends(get_current_user)):
+    try:
+        return await job_manager.run(run_optimize_job, payload.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class WalkForwardPayload(OptimizePayload):
+    folds: int = 5
+    train_bars: Optional[int] = None
+    test_bars: Optional[int] = None
+    anchored: bool = False
+
+
+@router.post("/walk-forward")
+async def walk_forward_strategy(payload: WalkForwardPayload, user=Depends(get_current_user)):
+    try:
+        return _jsonable(await job_manager.run(run_walk_forward_job, payload.model_dump()))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jobs/backtest")
+async def submit_backtest_job(payload: StrategyPayload, user=Depends(get_current_user)):
+    try:
+        job = await job_manager.submit("backtest", {**payload.model_dump(), "user_id": user.id}, user_id=user.id)
+        return job.to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jobs/optimize")
+async def submit_optimize_job(payload: OptimizePayload, user=Depends(get_current_user)):
     try:
-        best_strategy, best_metrics = optimize_strategy(
-            payload.strategy,
-            param_space=payload.param_space,
-            objective=payload.objective,
-            symbol=payload.symbol,
-            market=payload.market,
-            timeframe=payload.timeframe,
-            years=payload.years,
-            samples=payload.samples,
-        )
-        return {"best_strategy": best_strategy, "metrics": best_metrics}
+        job = await job_manager.submit("optimize", payload.model_dump(), user_id=user.id)
+        return job.to_dict()
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _owned_job(job_id: str, user) -> Job:
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _jsonable(value: Any) -> Any:
+    # SSE payloads and walk-forward results must be strict JSON: NaN/inf metrics become null
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(_jsonable(data))}\n\n"
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, user=Depends(get_current_user)):
+    return _owned_job(job_id, user).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str, user=Depends(get_current_user)):
+    """Server-Sent Events: one ``trial`` event per completed trial, then a final ``done`` event."""
+    job = _owned_job(job_id, user)
+
+    async def events():
+        sent = 0
+        while True:
+            job.refresh()
+            # Snapshot the status first so trials appended meanwhile are still flushed before "done"
+            finished = job.status in FINISHED
+            while sent < len(job.events):
+                yield _sse("trial", job.events[sent])
+                sent += 1
+            if finished:
+                yield _sse("done", job.to_dict())
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, user=Depends(get_current_user)):
+    _owned_job(job_id, user)
+    return job_manager.cancel(job_id).to_dict()
+
+
 @router.post("")
-async def create_strategy(body: StrategyIn, db: Session = Depends(get_db), user=Depends(get_current_user)) -> StrategyOut:
-    strat = Strategy(user_id=user.id, name=body.name, dsl=body.dsl, is_public=body.is_public)
+async def create_strategy(body: StrategyIn, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)) -> StrategyOut:
+    strat = Strategy(
+        user_id=user.id, name=body.name, dsl=body.dsl, dsl_hash=strategy_hash(body.dsl), is_public=body.is_public
+    )
     db.add(strat)
-    db.commit()
-    db.refresh(strat)
+    await db.commit()
+    await db.refresh(strat)
     return StrategyOut.model_validate(strat)
 
 
+async def _keyset_page(db: AsyncSession, q, id_column, limit: int, cursor: Optional[int]):
+    # Newest first by id; ``cursor`` is the last id of the previous page
+    if cursor is not None:
+        q = q.where(id_column < cursor)
+    rows = (await db.scalars(q.order_by(id_column.desc()).limit(limit + 1))).all()
+    return rows[:limit], rows[limit - 1].id if len(rows) > limit else None
+
+
 @router.get("")
-async def list_strategies(db: Session = Depends(get_db), user=Depends(get_current_user)) -> List[StrategyOut]:
-    items = db.query(Strategy).filter(Strategy.user_id == user.id).all()
-    return [StrategyOut.model_validate(i) for i in items]
\ No newline at end of file
+async def list_strategies(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    is_public: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> List[StrategyOut]:
+    """One page of the user's strategies, newest first. The body stays a plain list; the cursor for the
+    next page, if any, is in the ``X-Next-Cursor`` header."""
+    q = select(Strategy).where(Strategy.user_id == user.id)
+    if is_public is not None:
+        q = q.where(Strategy.is_public == is_public)
+    items, next_cursor = await _keyset_page(db, q, Strategy.id, limit, cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return [StrategyOut.model_validate(i) for i in items]
+
+
+@router.get("/runs")
+async def list_runs(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    strategy_id: Optional[int] = None,
+    symbol: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    min_sharpe: Optional[float] = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+) -> BacktestRunPage:
+    """The user's backtest runs, newest first, filtered on the indexed metric columns."""
+    q = select(BacktestRun).where(BacktestRun.user_id == user.id)
+    if strategy_id is not None:
+        q = q.where(BacktestRun.strategy_id == strategy_id)
+    if symbol is not None:
+        q = q.where(BacktestRun.symbol == symbol)
+    if timeframe is not None:
+        q = q.where(BacktestRun.timeframe == timeframe)
+    if min_sharpe is not None:
+        q = q.where(BacktestRun.sharpe_ratio >= min_sharpe)
+    items, next_cursor = await _keyset_page(db, q, BacktestRun.id, limit, cursor)
+    return BacktestRunPage(
+        items=[BacktestRunOut.model_validate(r).model_copy(update={"metrics": _jsonable(r.metrics)}) for r in items],
+        next_cursor=next_cursor,
+    )
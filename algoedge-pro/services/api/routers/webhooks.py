@@ -1,13 +1,69 @@
 from __future__ import annotations
-from typing import Any, Dict
+import hmac
+from collections import deque
+from typing import Any, Deque, List, Tuple
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from python.algoedge.execution import OrderRequest, client_order_id
+
+from ..core.config import settings
+from ..tasks.signals import Alert, SignalPipeline, parse_alert
+from .live import BROKERS, execution
 
 router = APIRouter()
 
+# Latest routed alerts, for clients that act on signals themselves (no ``broker`` in the alert)
+recent: Deque[Alert] = deque(maxlen=1000)
+
+
+async def execute_alerts(alerts: List[Alert]) -> List[Tuple[Alert, str]]:
+    """Place orders for broker alerts and return the ones that failed, so only those are retried."""
+    # The alert's key is the client order id, so a re-fired alert can never fill twice
+    to_execute = [a for a in alerts if a.broker]
+    orders = [OrderRequest(a.broker, a.symbol, a.side, a.qty, client_order_id=client_order_id(*a.key)) for a in to_execute]
+    results = await execution.submit_many(orders)
+    failed = [(a, r.error or "order failed") for a, r in zip(to_execute, results) if not r.ok]
+    failed_keys = {a.key for a, _ in failed}
+    recent.extend(a for a in alerts if a.key not in failed_keys)
+    return failed
+
 
-@router.post("/tradingview")
+pipeline = SignalPipeline(
+    route=execute_alerts,
+    max_size=settings.webhook_queue_size,
+    batch_size=settings.webhook_batch_size,
+    flush_interval=settings.webhook_flush_ms / 1e3,
+    dedupe_window=settings.webhook_dedupe_window,
+)
+
+
+@router.post("/tradingview", status_code=202)
 async def tradingview_webhook(request: Request):
-    payload: Dict[str, Any] = await request.json()
-    # TODO: Map payload to strategy signals and enqueue execution
-    return {"ok": True, "received": payload.get("ticker") or payload.get("symbol")}
\ No newline at end of file
+    """Validate and enqueue an alert; it is routed to execution in the background."""
+    try:
+        payload: Any = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    try:
+        alert = parse_alert(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    secret = settings.webhook_passphrase
+    if secret:
+        given = str(payload.get("passphrase") or "")
+        if not hmac.compare_digest(given.encode(), secret.encode()):
+            raise HTTPException(status_code=401, detail="Invalid passphrase")
+    elif alert.broker is not None:
+        # Broker alerts place orders with the server's credentials, so never accept them unauthenticated
+        raise HTTPException(status_code=403, detail="Broker routing requires WEBHOOK_PASSPHRASE")
+    if alert.broker is not None and alert.broker not in BROKERS:
+        raise HTTPException(status_code=422, detail=f"broker must be one of {list(BROKERS)}")
+    if not pipeline.offer(alert):
+        raise HTTPException(status_code=429, detail="Signal queue full", headers={"Retry-After": "1"})
+    return {"ok": True, "received": alert.symbol}
+
+
+@router.get("/signals")
+async def recent_signals(limit: int = Query(100, ge=1, le=1000)):
+    return {"signals": [alert.__dict__ for alert in list(recent)[-limit:]]}
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class StrategyIn(BaseModel):
@@ -11,6 +12,7 @@ class StrategyOut(BaseModel):
     id: int
     name: str
     is_public: bool
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -18,7 +20,23 @@ class StrategyOut(BaseModel):
 class BacktestRunOut(BaseModel):
     id: int
     strategy_id: int
-    metrics: Dict[str, float]
+    symbol: str
+    market: str
+    timeframe: str
+    years: int
+    roi_pct: Optional[float] = None
+    sharpe_ratio: Optional[float] = None
+    max_drawdown: Optional[float] = None
+    win_rate: Optional[float] = None
+    profit_factor: Optional[float] = None
+    num_trades: Optional[int] = None
+    created_at: Optional[datetime] = None
+    metrics: Dict[str, Optional[float]]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Keyset pages: pass next_cursor back as ``cursor`` for the following page (None on the last one)
+class BacktestRunPage(BaseModel):
+    items: List[BacktestRunOut]
+    next_cursor: Optional[int] = None
@@ -3,6 +3,16 @@ import os
 from celery import Celery
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-celery_app = Celery("algoedge", broker=redis_url, backend=redis_url)
+# CELERY_BROKER_URL=memory:// with CELERY_RESULT_BACKEND=cache+memory:// and CELERY_TASK_ALWAYS_EAGER=1
+# runs jobs in-process without Redis (tests, local dev)
+celery_app = Celery(
+    "algoedge",
+    broker=os.getenv("CELERY_BROKER_URL", redis_url),
+    backend=os.getenv("CELERY_RESULT_BACKEND", redis_url),
+)
 
-celery_app.conf.update(task_always_eager=False)
\ No newline at end of file
+celery_app.conf.update(
+    task_always_eager=os.getenv("CELERY_TASK_ALWAYS_EAGER", "0") == "1",
+    task_store_eager_result=True,
+    task_track_started=True,
+)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import asyncio
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from .jobs import job_events, run_backtest_job, run_optimize_job, task_backtest, task_optimize
+
+_LOCAL = {"backtest": run_backtest_job, "optimize": run_optimize_job}
+_CELERY = {"backtest": task_backtest, "optimize": task_optimize}
+_CELERY_STATES = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "running",
+    "RETRY": "running",
+    "PROGRESS": "running",
+    "SUCCESS": "succeeded",
+}
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+def _init_pool_worker() -> None:
+    # Forked children inherit the parent's pooled connections; drop them without closing the parent's sockets
+    from ..core.database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def _run_local_optimize(payload: Dict[str, Any], events: Any, cancel: Any) -> Dict[str, Any]:
+    # Runs in a pool process; events/cancel are multiprocessing.Manager proxies owned by the API
+    def report(event: Dict[str, Any]) -> bool:
+        events.put(event)
+        return not cancel.is_set()
+
+    try:
+        return run_optimize_job(payload, progress=report)
+    finally:
+        events.put(None)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user_id: Optional[int]
+    backend: str
+    status: str = "queued"  # queued | running | succeeded | failed | cancelled
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    cancel_requested: bool = False
+    handle: Any = None  # local Future or Celery AsyncResult
+    cancel_event: Any = None
+    event_queue: Any = None
+    drain: Optional[threading.Thread] = None
+
+    def refresh(self) -> "Job":
+        if self.status in FINISHED or self.handle is None:
+            return self
+        if self.backend == "local":
+            if self.handle.running():
+                self.status = "running"
+            return self
+        state = self.handle.state
+        # Read after the state: every event is pushed before the task finishes, so none is missed
+        events = job_events(self.id, len(self.events)) if self.kind == "optimize" else []
+        if events is not None:
+            self.events.extend(events)
+        elif state == "PROGRESS":
+            # Without Redis only the latest trial is visible; trials between two polls are skipped
+            event = self.handle.info or {}
+            if not self.events or event.get("trial") != self.events[-1].get("trial"):
+                self.events.append(event)
+        if state == "SUCCESS":
+            self.result, self.status = self.handle.result, "succeeded"
+        elif state == "REVOKED":
+            self.status = "cancelled"
+        elif state == "FAILURE":
+            self.error, self.status = str(self.handle.result), "failed"
+        else:
+            self.status = _CELERY_STATES.get(state, self.status)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"job_id": self.id, "kind": self.kind, "status": self.status, "backend": self.backend}
+        if self.events:
+            out["trials_completed"] = self.events[-1].get("trial", len(self.events))
+            out["best_metrics"] = self.events[-1].get("best_metrics")
+        if self.result is not None:
+            out["result"] = self.result
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class JobManager:
+    """Runs backtests/optimizations off the event loop and tracks them by job id.
+
+    Short work goes to a process pool owned by the API process (CPU-bound code would hold the GIL
+    in a thread pool); with ``jobs_backend="celery"`` long work is sent to the Celery worker instead.
+    Local optimizations stream per-trial events back through a ``multiprocessing.Manager`` queue.
+    """
+
+    def __init__(self, workers: int = 2, retained: int = 1000):
+        self.workers = workers
+        self.retained = retained
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager: Any = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_pool_worker)
+            return self._pool
+
+    def _sync_manager(self) -> Any:
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager
+
+    async def run(self, fn: Callable[[Dict[str, Any]], Dict[str, Any]], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Await ``fn(payload)`` on the local pool without blocking the event loop."""
+        return await asyncio.wrap_future(self._executor().submit(fn, payload))
+
+    def use_celery(self, kind: str, payload: Dict[str, Any]) -> bool:
+        if settings.jobs_backend != "celery":
+            return False
+        return kind == "optimize" or int(payload.get("years", 2)) > settings.jobs_local_max_years
+
+    async def submit(self, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None) -> Job:
+        if kind not in _LOCAL:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self.use_celery(kind, payload):
+            # apply_async runs the task inline when Celery is eager, so keep it off the loop too
+            handle = await asyncio.to_thread(_CELERY[kind].apply_async, args=[payload])
+            job = Job(id=handle.id, kind=kind, user_id=user_id, backend="celery", handle=handle)
+        else:
+            job = Job(id=uuid.uuid4().hex, kind=kind, user_id=user_id, backend="local")
+            if kind == "optimize":
+                manager = await asyncio.to_thread(self._sync_manager)
+                job.event_queue, job.cancel_event = manager.Queue(), manager.Event()
+                job.drain = threading.Thread(target=_drain_events, args=(job, job.event_queue), daemon=True)
+                job.drain.start()
+                job.handle = self._executor().submit(_run_local_optimize, payload, job.event_queue, job.cancel_event)
+            else:
+                job.handle = self._executor().submit(_LOCAL[kind], payload)
+            job.handle.add_done_callback(lambda f, job=job: _finish_local(job, f))
+        self._remember(job)
+        return job.refresh()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.refresh() if job is not None else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        job.cancel_requested = True
+        if job.backend == "celery":
+            job.handle.revoke(terminate=True)
+            job.status = "cancelled"
+        elif job.handle.cancel():
+            # Never started; the done callback records the cancellation
+            pass
+        elif job.cancel_event is not None:
+            # Running optimizations stop after the current batch and keep their best-so-far result
+            job.cancel_event.set()
+        return job
+
+    def _remember(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs once over the retention limit
+            for old_id in list(self._jobs):
+                if len(self._jobs) <= self.retained:
+                    break
+                if self._jobs[old_id].status in FINISHED:
+                    del self._jobs[old_id]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+
+def _drain_events(job: Job, events: Any) -> None:
+    while True:
+        try:
+            event = events.get()
+        except (EOFError, OSError):
+            return
+        if event is None:
+            return
+        job.events.append(event)
+
+
+def _finish_local(job: Job, future: Future) -> None:
+    if job.drain is not None:
+        if future.cancelled():
+            # The task never ran, so nothing else will end the drain thread
+            job.event_queue.put(None)
+        # Every event is queued before the result, so the stream never ends ahead of its trials
+        job.drain.join(timeout=5)
+    if future.cancelled():
+        job.status, job.error = "cancelled", "cancelled before start"
+    elif future.exception() is not None:
+        job.status, job.error = "failed", str(future.exception())
+    else:
+        job.result = future.result()
+        job.status = "cancelled" if job.cancel_requested else "succeeded"
+
+
+job_manager = JobManager(workers=settings.jobs_local_workers, retained=settings.jobs_retained)
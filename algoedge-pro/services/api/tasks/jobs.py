@@ -1,25 +1,87 @@
 from __future__ import annotations
-from typing import Any, Dict
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import redis
+except ImportError:  # optional: Celery jobs then only report their latest progress
+    redis = None
 
 from .celery_app import celery_app
+from ..core.config import settings
+from ..core.result_cache import result_cache
 from python.algoedge.backtester import run_backtest
-from python.algoedge.optimizer import optimize_strategy
+from python.algoedge.cache import frame_fingerprint
+from python.algoedge.data import load_ohlcv
+from python.algoedge.indicators import get_backend
+from python.algoedge.metrics import METRICS_VERSION
+from python.algoedge.optimizer import optimize_strategy, walk_forward
+from python.algoedge.strategy_dsl import strategy_hash
 
+_EVENTS_PREFIX = "algoedge:job-events:"
+_EVENTS_TTL = 24 * 3600
+_events_redis: Any = None
 
-@celery_app.task(name="backtest.run")
-def task_backtest(payload: Dict[str, Any]) -> Dict[str, Any]:
-    result = run_backtest(
-        payload.get("strategy", {}),
+
+def backtest_cache_key(payload: Dict[str, Any], ohlcv: pd.DataFrame) -> str:
+    # Same DSL on the same bars and indicator backend gives the same result. The bars are fingerprinted
+    # after loading, so a store sync during the load cannot leave the key pointing at older data.
+    parts = [
+        strategy_hash(payload.get("strategy", {})),
+        payload.get("symbol", "BTC/USDT"),
+        payload.get("market", "crypto"),
+        payload.get("timeframe", "1h"),
+        frame_fingerprint(ohlcv),
+        get_backend(),
+        METRICS_VERSION,
+    ]
+    return hashlib.blake2b(json.dumps(parts).encode(), digest_size=16).hexdigest()
+
+
+def run_backtest_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    ohlcv = load_ohlcv(
         symbol=payload.get("symbol", "BTC/USDT"),
         market=payload.get("market", "crypto"),
         timeframe=payload.get("timeframe", "1h"),
         years=int(payload.get("years", 2)),
     )
-    return {"metrics": result.metrics, "num_trades": len(result.trades)}
+    key = backtest_cache_key(payload, ohlcv)
+    user_id = payload.get("user_id")
+    out = result_cache.get(key)
+    if out is None and user_id is not None:
+        out = lookup_backtest(key)
+        if out is not None:
+            result_cache.set(key, out)
+    cached = out is not None
+    if out is None:
+        result = run_backtest(
+            payload.get("strategy", {}),
+            symbol=payload.get("symbol", "BTC/USDT"),
+            market=payload.get("market", "crypto"),
+            timeframe=payload.get("timeframe", "1h"),
+            years=int(payload.get("years", 2)),
+            ohlcv=ohlcv,
+        )
+        out = {"metrics": result.metrics, "num_trades": len(result.trades)}
+        result_cache.set(key, out)
+    out = {**out, "cached": cached}
+    if user_id is not None:
+        out.update(persist_backtest(int(user_id), payload, out["metrics"], cache_key=key))
+    return out
+
+
+def _trial_workers(payload: Dict[str, Any]) -> int:
+    # Jobs already run on a worker pool; each may add at most jobs_trial_workers trial processes
+    return max(1, min(int(payload.get("workers", 1)), settings.jobs_trial_workers))
 
 
-@celery_app.task(name="optimize.run")
-def task_optimize(payload: Dict[str, Any]) -> Dict[str, Any]:
+def run_optimize_job(
+    payload: Dict[str, Any],
+    progress: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> Dict[str, Any]:
     best_strategy, best_metrics = optimize_strategy(
         payload.get("strategy", {}),
         param_space=payload.get("param_space", {}),
@@ -29,5 +91,161 @@ def task_optimize(payload: Dict[str, Any]) -> Dict[str, Any]:
         timeframe=payload.get("timeframe", "1h"),
         years=int(payload.get("years", 2)),
         samples=int(payload.get("samples", 20)),
+        workers=_trial_workers(payload),
+        seed=payload.get("seed"),
+        search=payload.get("search", "random"),
+        max_trials=payload.get("max_trials"),
+        time_budget=payload.get("time_budget"),
+        progress=progress,
+    )
+    return {"best_strategy": best_strategy, "metrics": best_metrics}
+
+
+def run_walk_forward_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = walk_forward(
+        payload.get("strategy", {}),
+        param_space=payload.get("param_space", {}),
+        objective=payload.get("objective", "roi_pct"),
+        symbol=payload.get("symbol", "BTC/USDT"),
+        market=payload.get("market", "crypto"),
+        timeframe=payload.get("timeframe", "1h"),
+        years=int(payload.get("years", 2)),
+        folds=int(payload.get("folds", 5)),
+        train_bars=payload.get("train_bars"),
+        test_bars=payload.get("test_bars"),
+        anchored=bool(payload.get("anchored", False)),
+        samples=int(payload.get("samples", 20)),
+        workers=_trial_workers(payload),
+        seed=payload.get("seed"),
+        search=payload.get("search", "random"),
+        max_trials=payload.get("max_trials"),
+        time_budget=payload.get("time_budget"),
     )
-    return {"best_strategy": best_strategy, "metrics": best_metrics}
\ No newline at end of file
+    oos = result.out_of_sample
+    return {
+        "metrics": oos.metrics,
+        "equity_curve": [{"time": ts.isoformat(), "equity": float(v)} for ts, v in oos.equity_curve.items()],
+        "folds": [
+            {
+                "train_start": f.train_start.isoformat(),
+                "test_start": f.test_start.isoformat(),
+                "test_end": f.test_end.isoformat(),
+                "best_strategy": f.best_strategy,
+                "train_metrics": f.train_metrics,
+                "test_metrics": f.test_metrics,
+            }
+            for f in result.folds
+        ],
+    }
+
+
+def lookup_backtest(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Metrics of any stored run with ``cache_key``, so results survive restarts and span workers."""
+    from ..core.database import SessionLocal
+    from ..models.runs import BacktestRun
+
+    db = SessionLocal()
+    try:
+        run = db.query(BacktestRun).filter(BacktestRun.cache_key == cache_key).first()
+        if run is None:
+            return None
+        return {"metrics": run.metrics, "num_trades": int(run.metrics.get("num_trades", 0))}
+    finally:
+        db.close()
+
+
+def persist_backtest(
+    user_id: int,
+    payload: Dict[str, Any],
+    metrics: Dict[str, float],
+    cache_key: Optional[str] = None,
+) -> Dict[str, int]:
+    # Imported lazily so pure-compute workers do not need a database configured
+    from ..core.database import SessionLocal
+    from ..models import leaderboard  # noqa: F401 - registers the hook that folds new runs into the leaderboard
+    from ..models.runs import BacktestRun
+    from ..models.strategy import Strategy
+
+    strategy = payload.get("strategy", {})
+    name = strategy.get("name", "Untitled")
+    dsl_hash = strategy_hash(strategy)
+    db = SessionLocal()
+    try:
+        # Resubmitting the same DSL reuses the user's strategy record, and its run for the same data
+        strat = (
+            db.query(Strategy)
+            .filter(Strategy.user_id == user_id, Strategy.dsl_hash == dsl_hash, Strategy.name == name)
+            .first()
+        )
+        if strat is None:
+            strat = Strategy(user_id=user_id, name=name, dsl=strategy, dsl_hash=dsl_hash, is_public=False)
+            db.add(strat)
+            db.flush()
+        run = None
+        if cache_key is not None:
+            run = (
+                db.query(BacktestRun)
+                .filter(BacktestRun.strategy_id == strat.id, BacktestRun.cache_key == cache_key)
+                .first()
+            )
+        if run is None:
+            run = BacktestRun(
+                strategy_id=strat.id,
+                user_id=user_id,
+                symbol=payload.get("symbol", "BTC/USDT"),
+                market=payload.get("market", "crypto"),
+                timeframe=payload.get("timeframe", "1h"),
+                years=int(payload.get("years", 2)),
+                metrics=metrics,
+                cache_key=cache_key,
+            )
+            db.add(run)
+        db.commit()
+        return {"run_id": run.id, "strategy_id": strat.id}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="backtest.run")
+def task_backtest(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return run_backtest_job(payload)
+
+
+def _events_client() -> Any:
+    global _events_redis
+    if _events_redis is None and redis is not None:
+        _events_redis = redis.Redis.from_url(settings.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _events_redis
+
+
+def push_job_event(job_id: str, event: Dict[str, Any]) -> None:
+    """Append a progress event to the job's Redis list; dropped if Redis is unavailable."""
+    client = _events_client()
+    if client is None:
+        return
+    try:
+        key = _EVENTS_PREFIX + job_id
+        client.pipeline().rpush(key, json.dumps(event, default=str)).expire(key, _EVENTS_TTL).execute()
+    except redis.RedisError:
+        pass
+
+
+def job_events(job_id: str, start: int = 0) -> Optional[List[Dict[str, Any]]]:
+    """Events of a job from index ``start`` on, or None when Redis cannot be read."""
+    client = _events_client()
+    if client is None:
+        return None
+    try:
+        return [json.loads(raw) for raw in client.lrange(_EVENTS_PREFIX + job_id, start, -1)]
+    except redis.RedisError:
+        return None
+
+
+@celery_app.task(name="optimize.run", bind=True)
+def task_optimize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def report(event: Dict[str, Any]) -> None:
+        # Every trial goes to the job's event list; the task state only carries the latest one
+        push_job_event(self.request.id, event)
+        self.update_state(state="PROGRESS", meta=event)
+
+    return run_optimize_job(payload, progress=report)
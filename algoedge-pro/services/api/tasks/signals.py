@@ -0,0 +1,211 @@
+from __future__ import annotations
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SIDES = {"buy": "buy", "long": "buy", "sell": "sell", "short": "sell", "exit": "sell", "close": "sell"}
+
+
+@dataclass(frozen=True)
+class Alert:
+    strategy: str
+    symbol: str
+    side: str  # buy | sell
+    bar_time: int  # bar open, epoch milliseconds
+    qty: float
+    broker: Optional[str] = None
+    price: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[str, str, int, str]:
+        # A reversal legitimately sends a sell and a buy on the same bar, so the side is part of the key
+        return (self.strategy, self.symbol, self.bar_time, self.side)
+
+
+def parse_alert(payload: Dict[str, Any]) -> Alert:
+    """Validate a TradingView alert body (``ticker``/``symbol``, ``action``/``side``, ``time``, ...)."""
+    if not isinstance(payload, dict):
+        raise ValueError("Alert must be a JSON object")
+    symbol = payload.get("ticker") or payload.get("symbol")
+    if not symbol:
+        raise ValueError("ticker is required")
+    side = SIDES.get(str(payload.get("action") or payload.get("side") or "").lower())
+    if side is None:
+        raise ValueError(f"action must be one of {sorted(SIDES)}")
+    raw_time = payload.get("time") or payload.get("bar_time")
+    if raw_time is None:
+        raise ValueError("time is required")
+    try:
+        # {{time}} is ISO-8601; numbers are epoch seconds or milliseconds
+        if isinstance(raw_time, (int, float)):
+            stamp = pd.Timestamp(raw_time, unit="ms" if raw_time > 1e11 else "s")
+        else:
+            stamp = pd.Timestamp(raw_time)
+        qty = float(payload.get("qty") or payload.get("contracts") or 1.0)
+        price = float(payload["price"]) if payload.get("price") is not None else None
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid alert: {e}")
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert("UTC").tz_localize(None)
+    if qty <= 0:
+        raise ValueError("qty must be positive")
+    return Alert(
+        strategy=str(payload.get("strategy") or payload.get("strategy_id") or ""),
+        symbol=str(symbol).upper(),
+        side=side,
+        bar_time=stamp.value // 1_000_000,
+        qty=qty,
+        broker=payload.get("broker"),
+        price=price,
+    )
+
+
+# route(alerts) -> the alerts it could not route, with the reason; None when all were routed
+Route = Callable[[List[Alert]], Awaitable[Optional[List[Tuple[Alert, str]]]]]
+
+
+class SignalPipeline:
+    """Bounded in-process alert queue with a batching, de-duplicating consumer.
+
+    ``offer`` never waits: it enqueues or reports the queue full, so the webhook can answer at once and
+    shed load visibly (429) instead of stalling TradingView. One consumer task collects up to
+    ``batch_size`` alerts (or whatever arrives within ``flush_interval`` of the first), drops alerts
+    already routed within the last ``dedupe_window`` keys, and awaits ``route`` with the rest in arrival
+    order. Only routed alerts are remembered, so a failed alert can be re-sent. The queue is per API process.
+    """
+
+    def __init__(
+        self,
+        route: Route,
+        max_size: int = 10_000,
+        batch_size: int = 200,
+        flush_interval: float = 0.02,
+        dedupe_window: int = 50_000,
+    ):
+        self.route = route
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._queue: "asyncio.Queue[Tuple[float, Alert]]" = asyncio.Queue(maxsize=max_size)
+        self._seen: "OrderedDict[Tuple[str, str, int, str], None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.routed = 0
+        self.route_errors = 0
+        self.last_error: Optional[str] = None
+        self.peak_depth = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._consume())
+
+    def offer(self, alert: Alert) -> bool:
+        self.start()
+        try:
+            self._queue.put_nowait((time.perf_counter(), alert))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.accepted += 1
+        self.peak_depth = max(self.peak_depth, self._queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[Tuple[float, Alert]]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    def _dedupe(self, batch: List[Tuple[float, Alert]]) -> List[Alert]:
+        fresh: List[Alert] = []
+        keys = set()
+        for _, alert in batch:
+            if alert.key in self._seen or alert.key in keys:
+                self.duplicates += 1
+                continue
+            keys.add(alert.key)
+            fresh.append(alert)
+        return fresh
+
+    def _remember(self, alerts: List[Alert]) -> None:
+        for alert in alerts:
+            self._seen[alert.key] = None
+        while len(self._seen) > self.dedupe_window:
+            self._seen.popitem(last=False)
+
+    async def _consume(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            fresh = self._dedupe(batch)
+            try:
+                if fresh:
+                    failed = await self.route(fresh) or []
+                    failed_keys = {alert.key for alert, _ in failed}
+                    self._remember([alert for alert in fresh if alert.key not in failed_keys])
+                    self.routed += len(fresh) - len(failed_keys)
+                    self.route_errors += len(failed_keys)
+                    if failed:
+                        self.last_error = failed[0][1]
+            except Exception as e:  # keep consuming; failures show up in metrics
+                self.route_errors += len(fresh)
+                self.last_error = str(e)
+            finally:
+                self.batches += 1
+                now = time.perf_counter()
+                for queued_at, _ in batch:
+                    self.lag_total += now - queued_at
+                    self.lag_max = max(self.lag_max, now - queued_at)
+                    self._queue.task_done()
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Wait until everything queued so far has been routed, then stop the consumer."""
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task.cancel()
+        self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        depth = self._queue.qsize()
+        handled = self.routed + self.route_errors + self.duplicates
+        return {
+            "depth": depth,
+            "capacity": self.max_size,
+            "utilization": depth / self.max_size if self.max_size else 0.0,
+            "peak_depth": self.peak_depth,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "avg_batch": handled / self.batches if self.batches else 0.0,
+            "routed": self.routed,
+            "route_errors": self.route_errors,
+            "last_error": self.last_error,
+            "lag_avg_ms": self.lag_total / handled * 1e3 if handled else 0.0,
+            "lag_max_ms": self.lag_max * 1e3,
+        }